@@ -0,0 +1,98 @@
+#Load test for the fetch and render paths, against the stand-in API in stub_api.py, so it needs no network.
+#Run it from the repository root with: python benchmarks/bench_load.py
+#    --games 15,100,300      slate sizes to build a page for
+#    --error-rates 0,0.05    503 rates to try at each size (--throttle-rate and --timeout-rate add 429s and hangs)
+#    --latency 0.05          seconds per request, --jitter to vary it
+#    --workers 8             fetch workers, --single-feed for one request per game, --render-workers for the pool
+#    --http                  go through a real local HTTP server rather than the in-process fake transport
+#Every slate has --long-games 20-inning games, --suspended suspended games, --doubleheaders doubleheaders and
+#--bench-size bench players a side. For each run it prints the wall time, the games per second, the requests
+#the stub served and the retries and failures the page saw.
+import argparse
+import builtins
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import box_score_maker
+from box_score_maker import FetchOptions, build_box_score_page, start_transport
+from box_score_metrics import start_metrics, stop_metrics
+from stub_api import Slate, StubStatsAPI, add_fault_arguments, add_slate_arguments, install_stub, point_statsapi_at, start_server
+
+#The page prints its progress, which we don't want in the middle of the table.
+def run_quietly(function):
+    realPrint = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        return function()
+    finally:
+        builtins.print = realPrint
+
+#Builds one page against whatever statsapi is pointed at. Returns the seconds it took, the run's counters
+#and the error, if it failed.
+def run_page(gameDate, options):
+    #Every run is a different slate for the same date, so schedules the last run kept in memory don't apply.
+    box_score_maker.openSchedules.clear()
+    metrics = start_metrics('load')
+    startTime = time.perf_counter()
+    error = None
+    try:
+        run_quietly(lambda: build_box_score_page(gameDate, options=options))
+    except Exception as pageError:
+        error = pageError
+    elapsed = time.perf_counter() - startTime
+    stop_metrics()
+    return elapsed, metrics.counters, error
+
+def print_row(gameCount, errorRate, elapsed, apiCounters, runCounters, error):
+    gamesPerSecond = gameCount / elapsed if elapsed > 0 else float('inf')
+    result = 'ok' if error is None else type(error).__name__
+    print(f"  {gameCount:>6} {errorRate:>7.2f} {elapsed:>9.2f} {gamesPerSecond:>8.1f} {apiCounters.get('requests', 0):>9}"
+          f" {apiCounters.get('errors', 0) + apiCounters.get('throttled', 0) + apiCounters.get('timeouts', 0):>8}"
+          f" {runCounters.get('httpRetries', 0):>8}  {result}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds pages against the stand-in API at several sizes and error rates.")
+    parser.add_argument('--games', default='15,100,300', help="comma-separated slate sizes")
+    parser.add_argument('--error-rates', default='0,0.05', help="comma-separated 503 rates")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--render-workers', type=int, default=0)
+    parser.add_argument('--single-feed', action='store_true')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=5)
+    parser.add_argument('--rate-limit', type=float, default=None)
+    parser.add_argument('--http', action='store_true', help="serve the stub over local HTTP")
+    add_slate_arguments(parser)
+    add_fault_arguments(parser)
+    arguments = parser.parse_args()
+
+    options = FetchOptions(fetchWorkers=arguments.workers, singleFeed=arguments.single_feed, httpTimeout=arguments.timeout,
+                           httpRetries=arguments.retries, rateLimit=arguments.rate_limit, renderWorkers=arguments.render_workers)
+    start_transport(options)
+    print(f"  {'games':>6} {'errors':>7} {'wall (s)':>9} {'games/s':>8} {'requests':>9} {'failed':>8} {'retries':>8}  result")
+    for gameCount in [int(games) for games in arguments.games.split(',')]:
+        slate = Slate(arguments.date, gameCount, arguments.seed, arguments.long_games, arguments.long_innings,
+                      arguments.suspended, arguments.doubleheaders, arguments.sub_rate, arguments.bench_size)
+        for errorRate in [float(rate) for rate in arguments.error_rates.split(',')]:
+            api = StubStatsAPI([slate], arguments.latency, arguments.jitter, errorRate, arguments.throttle_rate,
+                               arguments.timeout_rate, arguments.hang_seconds, arguments.seed)
+            server = None
+            if arguments.http:
+                server = start_server(api)
+                point_statsapi_at('http://127.0.0.1:' + str(server.server_address[1]) + '/api/')
+            else:
+                install_stub(api)
+            try:
+                elapsed, runCounters, error = run_page(slate.gameDate, options)
+            finally:
+                if server is not None:
+                    server.shutdown()
+                    server.server_close()
+            print_row(gameCount, errorRate, elapsed, api.counters, runCounters, error)
+    for renderPool in box_score_maker.renderPools.values():
+        renderPool.shutdown()
+
+if __name__ == '__main__':
+    main()
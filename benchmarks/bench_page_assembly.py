@@ -0,0 +1,94 @@
+#Benchmark for page assembly: the old merge_html loop against BoxScoreDocument.
+#Run it from the repository root with: python benchmarks/bench_page_assembly.py
+#It uses made-up tables shaped like our box scores, so it doesn't touch the API.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from box_score_document import BoxScoreDocument, merge_html
+
+pageHead = """
+        <html>
+        <head>
+            <style>
+                table { border-collapse: collapse; width: 100%}
+                .indented-cell { padding-left: 10px;}
+            </style>
+        </head>
+        <body>
+        <h2>MLB Standings</h2>
+        <br>
+        </body>
+        </html>
+        """
+
+#Makes a table about the size of one team's batting box.
+def make_fake_table(rows, columns):
+    html = '<table>\n<thead>\n<tr>'
+    for j in range(columns):
+        html += f'<th style="text-align: right;">C{j}</th>'
+    html += '</tr>\n</thead>\n<tbody>\n'
+    for i in range(rows):
+        html += '<tr>'
+        for j in range(columns):
+            html += f'<td style="text-align: right;">{i * j}</td>'
+        html += '</tr>\n'
+    html += '</tbody>\n</table>'
+    return html
+
+#Makes one two-game section, wrapped the same way the main script wraps them.
+def make_fake_section():
+    tables = ''
+    for i in range(5):
+        tables += f'<tr><td class="nested-table">{make_fake_table(14, 10)}</td></tr>\n'
+    return f"""
+        <html>
+        <head></head>
+        <body>
+        <div class="table-container">
+        <table>
+        {tables}
+        </table>
+        <table>
+        {tables}
+        </table>
+        </div>
+        </body>
+        </html>
+        """
+
+def time_merge_html(sections):
+    startTime = time.perf_counter()
+    boxScoreHTML = pageHead
+    for section in sections:
+        boxScoreHTML = merge_html(boxScoreHTML, section)
+    return time.perf_counter() - startTime, boxScoreHTML
+
+def time_document(sections):
+    startTime = time.perf_counter()
+    boxScoreDocument = BoxScoreDocument(pageHead)
+    for section in sections:
+        boxScoreDocument.append_html(section)
+    boxScoreHTML = boxScoreDocument.to_html()
+    return time.perf_counter() - startTime, boxScoreHTML
+
+def main():
+    gameCounts = [2, 4, 8, 16, 32, 64]
+    if len(sys.argv) > 1:
+        gameCounts = [int(x) for x in sys.argv[1:]]
+    section = make_fake_section()
+    print(f"{'games':>6} {'merge_html (s)':>15} {'ms/game':>9} {'document (s)':>13} {'ms/game':>9}")
+    for gameCount in gameCounts:
+        #Each section holds two games.
+        sections = [section] * max(1, gameCount // 2)
+        mergeTime, mergeHTML = time_merge_html(sections)
+        documentTime, documentHTML = time_document(sections)
+        if mergeHTML != documentHTML:
+            raise AssertionError(f"Output differs for {gameCount} games")
+        print(f"{gameCount:>6} {mergeTime:>15.3f} {mergeTime * 1000 / gameCount:>9.1f} "
+              f"{documentTime:>13.3f} {documentTime * 1000 / gameCount:>9.1f}")
+
+if __name__ == '__main__':
+    main()
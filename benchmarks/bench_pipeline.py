@@ -0,0 +1,170 @@
+#Benchmark for every stage of building a page, run offline on fixtures (see fixtures.py).
+#Run it from the repository root with: python benchmarks/bench_pipeline.py
+#    --fixtures DIR   use recorded <scenario>.json files from DIR where there are any
+#    --repeat N       time each stage N times and keep the best (default: 5)
+#    --scenario NAME  only run some of the scenarios (slate, extra-innings, doubleheader, week)
+#    --render-workers N  also time the whole page with the games rendered on N processes
+#For each scenario it prints every stage's best time, its throughput in games per second and its peak memory,
+#then the same for a whole page built by build_box_score_page from an offline response cache.
+import argparse
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import box_score_maker
+from box_score_cache import ResponseCache
+from box_score_document import BoxScoreDocument, merge_html
+from box_score_linescore import make_linescore_table
+from box_score_maker import FetchOptions, build_standings_tables, write_schedule, render_hitter_table, render_pitcher_table, \
+    add_totals_to_linescore, render_linescore_table, build_section_html, build_box_score_page
+from box_score_model import DateModel, build_game_model, pack_model, unpack_model
+from fixtures import get_scenario_fixtures, install_fixture_in_cache
+
+#The standings tables for one date, one per league.
+def run_standings(dateFixture):
+    return build_standings_tables(dateFixture['standings'])
+
+def run_schedule(dateFixture):
+    return write_schedule(dateFixture['tomorrow'],'eastern')
+
+#Pulling the game model out of the raw payload (notes and line score included).
+def run_game_model(game):
+    return build_game_model(game)
+
+#The four batting and pitching tables for one game, from its model.
+def run_game_tables(gameModel):
+    return [render_hitter_table(gameModel.away),
+            render_hitter_table(gameModel.home),
+            render_pitcher_table(gameModel.away),
+            render_pitcher_table(gameModel.home,gameModel.gameNotes)]
+
+def run_linescore(gameModel):
+    myLineScore = make_linescore_table(gameModel.away.inningRuns,gameModel.home.inningRuns,gameModel.away.shortName,gameModel.home.shortName)
+    return render_linescore_table(add_totals_to_linescore(myLineScore,gameModel))
+
+#Saving and loading a date's models.
+def run_model_round_trip(dateModel):
+    return unpack_model(pack_model(dateModel))
+
+#The sections of every page in the fixture, built ahead of time so the assembly stages only time the assembly.
+def make_page_sections(fixture):
+    pages = []
+    for dateFixture in fixture['dates']:
+        standingsHTML = ''.join(run_standings(dateFixture))
+        header = f"<html><head><style>table {{ border-collapse: collapse; }}</style></head><body>{standingsHTML}{run_schedule(dateFixture)}</body></html>"
+        gameTables = []
+        for game in dateFixture['games']:
+            gameModel = build_game_model(game)
+            roadBatting, homeBatting, roadPitching, homePitching = run_game_tables(gameModel)
+            gameTables.append([run_linescore(gameModel), roadBatting, homeBatting, roadPitching, homePitching])
+        sections = []
+        for j in range(0,len(gameTables),2):
+            sections.append(build_section_html(gameTables[j:j + 2]))
+        pages.append((header, sections))
+    return pages
+
+def run_merge_html(page):
+    boxScoreHTML = page[0]
+    for section in page[1]:
+        boxScoreHTML = merge_html(boxScoreHTML, section)
+    return boxScoreHTML
+
+def run_document(page):
+    boxScoreDocument = BoxScoreDocument(page[0])
+    for section in page[1]:
+        boxScoreDocument.append_html(section)
+    return boxScoreDocument.to_html()
+
+#The stages print their progress, which we don't want in the middle of the table.
+def run_quietly(function):
+    realPrint = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        return function()
+    finally:
+        builtins.print = realPrint
+
+def run_stage(stage, items):
+    for item in items:
+        stage(item)
+
+#Runs stage(item) for every item, repeat times, and returns the best time and the peak memory of one more run.
+#The memory run is separate because tracemalloc slows everything down.
+def measure(stage, items, repeat):
+    bestTime = None
+    for k in range(repeat):
+        startTime = time.perf_counter()
+        run_quietly(lambda: run_stage(stage, items))
+        elapsed = time.perf_counter() - startTime
+        if bestTime is None or elapsed < bestTime:
+            bestTime = elapsed
+    tracemalloc.start()
+    run_quietly(lambda: run_stage(stage, items))
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return bestTime, peakBytes
+
+def print_row(stageName, gameCount, elapsed, peakBytes):
+    gamesPerSecond = gameCount / elapsed if elapsed > 0 else float('inf')
+    print(f"  {stageName:<18} {elapsed * 1000:>10.1f} {gamesPerSecond:>10.1f} {peakBytes / (1024 * 1024):>10.2f}")
+
+#The whole page, through build_box_score_page, from a response cache holding the fixture, in offline mode.
+def measure_full_page(fixture, repeat, workers, renderWorkers=0):
+    cacheDir = tempfile.mkdtemp(prefix='bench_cache_')
+    try:
+        install_fixture_in_cache(fixture, ResponseCache(cacheDir))
+        options = FetchOptions(fetchWorkers=workers, cacheDir=cacheDir, offline=True, renderWorkers=renderWorkers)
+        gameDates = [dateFixture['date'] for dateFixture in fixture['dates']]
+        try:
+            return measure(lambda gameDate: build_box_score_page(gameDate, options=options), gameDates, repeat)
+        finally:
+            box_score_maker.openCaches.clear()
+    finally:
+        shutil.rmtree(cacheDir, ignore_errors=True)
+
+def run_scenario(fixture, repeat, workers, renderWorkers=0):
+    dates = fixture['dates']
+    games = [game for dateFixture in dates for game in dateFixture['games']]
+    gameCount = len(games)
+    source = 'recorded'
+    if not fixture.get('recorded'):
+        source = 'made up'
+    print(f"{fixture['name']}: {len(dates)} dates, {gameCount} games ({source})")
+    print(f"  {'stage':<18} {'best (ms)':>10} {'games/s':>10} {'peak (MB)':>10}")
+    print_row('standings', gameCount, *measure(run_standings, dates, repeat))
+    print_row('schedule', gameCount, *measure(run_schedule, dates, repeat))
+    print_row('game model', gameCount, *measure(run_game_model, games, repeat))
+    gameModels = [build_game_model(game) for game in games]
+    print_row('game tables', gameCount, *measure(run_game_tables, gameModels, repeat))
+    print_row('line score', gameCount, *measure(run_linescore, gameModels, repeat))
+    dateModels = [DateModel(dateFixture['date'], dateFixture['standings'], dateFixture['tomorrow'], [build_game_model(game) for game in dateFixture['games']])
+                  for dateFixture in dates]
+    print_row('model save/load', gameCount, *measure(run_model_round_trip, dateModels, repeat))
+    pages = run_quietly(lambda: make_page_sections(fixture))
+    print_row('merge_html', gameCount, *measure(run_merge_html, pages, max(1, repeat // 2)))
+    print_row('BoxScoreDocument', gameCount, *measure(run_document, pages, repeat))
+    print_row('whole page', gameCount, *measure_full_page(fixture, repeat, workers))
+    if renderWorkers > 1:
+        print_row('whole page, pool', gameCount, *measure_full_page(fixture, repeat, workers, renderWorkers))
+
+def main():
+    parser = argparse.ArgumentParser(description="Times each stage of building the box score page on offline fixtures.")
+    parser.add_argument('--fixtures', help="directory of recorded <scenario>.json fixtures")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=8, help="fetch workers for the whole-page run")
+    parser.add_argument('--scenario', action='append', help="only run this scenario (can be given more than once)")
+    parser.add_argument('--render-workers', type=int, default=0, help="also time the whole page rendered on this many processes")
+    arguments = parser.parse_args()
+    for fixture in get_scenario_fixtures(arguments.fixtures):
+        if arguments.scenario and fixture['name'] not in arguments.scenario:
+            continue
+        run_scenario(fixture, arguments.repeat, arguments.workers, arguments.render_workers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+#Fixtures for the benchmarks: whole dates of statsapi payloads, saved as JSON, so we can time the pipeline offline.
+#A fixture holds, for each date, exactly what the main script asks statsapi for:
+#  schedule  - statsapi.schedule for the date
+#  standings - statsapi.standings_data for the date
+#  tomorrow  - statsapi.schedule for the day after
+#  games     - boxscore_data, linescore and game_scoring_play_data for every game
+#
+#Record real ones (this needs the network):
+#    python benchmarks/fixtures.py record 07/30/2024 benchmarks/fixtures/slate.json
+#    python benchmarks/fixtures.py record 07/22/2024 benchmarks/fixtures/week.json --end-date 07/28/2024
+#Without recorded files the benchmarks make up the standard scenarios below. The made-up games are built as live feeds
+#and turned into payloads by box_score_feed, which gives the same dicts statsapi does, so every stage does real work.
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from box_score_cache import is_final_status
+from box_score_feed import boxscore_data_from_feed, scoring_play_data_from_feed
+from box_score_schedule import get_schedule_arguments, get_range_arguments
+
+#The six MLB divisions as the divisions endpoint has them: ID -> name, short name and league ID.
+mlbDivisions = {200: ('American League West', 'AL West', 103), 201: ('American League East', 'AL East', 103),
+                202: ('American League Central', 'AL Central', 103), 203: ('National League West', 'NL West', 104),
+                204: ('National League East', 'NL East', 104), 205: ('National League Central', 'NL Central', 104)}
+mlbLeagues = {103: ('American League', 'AL'), 104: ('National League', 'NL')}
+
+positions = ['C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF', 'DH']
+clubNames = ['Aces', 'Bears', 'Comets', 'Dukes', 'Eagles', 'Foxes', 'Giants', 'Hawks', 'Jays', 'Kings',
+             'Lions', 'Miners', 'Owls', 'Pilots', 'Rams', 'Sailors', 'Tigers', 'Vipers', 'Wolves', 'Yanks',
+             'Bison', 'Cougars', 'Dragons', 'Falcons', 'Grizzlies', 'Herons', 'Knights', 'Otters', 'Ravens', 'Sharks']
+
+#The standard scenarios: (name, first date, number of dates, games per date, {game number: innings}, doubleheader).
+scenarios = [('slate', '07/30/2024', 1, 15, {}, False),
+             ('extra-innings', '07/30/2024', 1, 1, {1: 14}, False),
+             ('doubleheader', '07/30/2024', 1, 16, {}, True),
+             ('week', '07/22/2024', 7, 15, {}, False)]
+
+def get_next_day(gameDate):
+    return (datetime.strptime(gameDate, "%m/%d/%Y") + timedelta(days=1)).strftime("%m/%d/%Y")
+
+def make_team(teamNumber):
+    clubName = clubNames[teamNumber % len(clubNames)]
+    return {'id': 108 + teamNumber, 'name': 'City ' + clubName, 'teamName': clubName, 'shortName': 'City ' + clubName[:3],
+            'abbreviation': clubName[:3].upper(), 'teamCode': clubName[:3].lower(), 'fileCode': clubName[:3].lower(),
+            'locationName': 'City'}
+
+#One team's side of a game feed: a lineup with a few substitutes, the bench, the bullpen and the box notes.
+#subRate is the chance each lineup spot has a substitute in it, and benchSize how many players sat.
+def make_feed_side(rng, team, players, nextID, runs, inningsPitched, outsRecorded, subRate=0.2, benchSize=4):
+    feedPlayers = {}
+    batters = []
+    pitchers = []
+    totals = {'atBats': 0, 'runs': runs, 'hits': 0, 'doubles': 0, 'triples': 0, 'homeRuns': 0, 'rbi': 0,
+              'stolenBases': 0, 'strikeOuts': 0, 'baseOnBalls': 0, 'leftOnBase': 0}
+    notes = []
+    for slot in range(1, 10):
+        for sub in range(1 + (rng.random() < subRate)):
+            nextID += 1
+            batters.append(nextID)
+            players['ID' + str(nextID)] = {'id': nextID, 'fullName': 'Player ' + str(nextID), 'boxscoreName': 'Player' + str(nextID)}
+            batting = {'atBats': rng.randint(1, 5), 'runs': 0, 'hits': rng.randint(0, 3), 'doubles': rng.randint(0, 1), 'triples': 0,
+                       'homeRuns': int(rng.random() < 0.1), 'rbi': rng.randint(0, 2), 'stolenBases': int(rng.random() < 0.05),
+                       'strikeOuts': rng.randint(0, 2), 'baseOnBalls': rng.randint(0, 1), 'leftOnBase': rng.randint(0, 3)}
+            position = positions[slot - 1]
+            if sub:
+                batting['note'] = chr(ord('a') + len(notes)) + '-'
+                notes.append({'label': chr(ord('a') + len(notes)), 'value': 'Pinch hit for Player' + str(nextID - 1) + ' in the ' + str(rng.randint(6, 9)) + 'th.'})
+                position = 'PH'
+            for key in totals:
+                if key != 'runs':
+                    totals[key] += batting[key]
+            feedPlayers['ID' + str(nextID)] = {'person': {'id': nextID}, 'battingOrder': str(slot * 100 + sub),
+                                               'position': {'abbreviation': position}, 'allPositions': [{'abbreviation': position}],
+                                               'stats': {'batting': batting},
+                                               'seasonStats': {'batting': {'avg': '.' + str(rng.randint(180, 330)), 'ops': '.' + str(rng.randint(550, 950)),
+                                                                           'obp': '.' + str(rng.randint(270, 400)), 'slg': '.' + str(rng.randint(300, 560))}}}
+    #Bench players show up in the feed with no batting order and no batting line.
+    for k in range(benchSize):
+        nextID += 1
+        batters.append(nextID)
+        players['ID' + str(nextID)] = {'id': nextID, 'fullName': 'Player ' + str(nextID), 'boxscoreName': 'Player' + str(nextID)}
+        feedPlayers['ID' + str(nextID)] = {'person': {'id': nextID}, 'position': {'abbreviation': 'C'}, 'allPositions': [],
+                                           'stats': {'batting': {}}, 'seasonStats': {'batting': {'avg': '.000', 'ops': '.000', 'obp': '.000', 'slg': '.000'}}}
+
+    #Split the outs between a starter and a few relievers.
+    outsLeft = outsRecorded
+    pitcherCount = rng.randint(3, 6)
+    for k in range(pitcherCount):
+        nextID += 1
+        pitchers.append(nextID)
+        players['ID' + str(nextID)] = {'id': nextID, 'fullName': 'Pitcher ' + str(nextID), 'boxscoreName': 'Pitcher' + str(nextID)}
+        if k == pitcherCount - 1:
+            outs = outsLeft
+        elif k == 0:
+            outs = min(outsLeft, rng.randint(12, 21))
+        else:
+            outs = min(outsLeft, rng.randint(1, 6))
+        outsLeft -= outs
+        pitching = {'inningsPitched': str(outs // 3) + '.' + str(outs % 3), 'hits': rng.randint(0, 6), 'runs': rng.randint(0, 3),
+                    'earnedRuns': rng.randint(0, 2), 'baseOnBalls': rng.randint(0, 3), 'strikeOuts': rng.randint(0, 8),
+                    'homeRuns': rng.randint(0, 1), 'pitchesThrown': 15 * outs // 3 + rng.randint(5, 20), 'strikes': 10 * outs // 3 + rng.randint(3, 12)}
+        if k == 0:
+            pitching['note'] = '(' + rng.choice(['W', 'L']) + ', ' + str(rng.randint(1, 12)) + '-' + str(rng.randint(1, 12)) + ')'
+        feedPlayers['ID' + str(nextID)] = {'person': {'id': nextID}, 'position': {'abbreviation': 'P'}, 'allPositions': [{'abbreviation': 'P'}],
+                                           'stats': {'pitching': pitching, 'batting': {}},
+                                           'seasonStats': {'pitching': {'era': str(rng.randint(1, 7)) + '.' + str(rng.randint(10, 99))}}}
+
+    info = [{'title': 'BATTING', 'fieldList': [{'label': '2B', 'value': 'Player' + str(batters[0]) + ' (21, Pitcher' + str(nextID) + ').'},
+                                               {'label': 'TB', 'value': 'Player' + str(batters[1]) + ' 2; Player' + str(batters[2]) + ' 3.'},
+                                               {'label': 'Team LOB', 'value': str(totals['leftOnBase']) + '.'}]}]
+    errors = rng.choice([0, 0, 0, 1, 1, 2])
+    if errors:
+        errorList = []
+        for k in range(errors):
+            errorList.append('Player' + str(batters[rng.randint(0, 8)]) + ' (' + str(rng.randint(1, 12)) + ', ' + rng.choice(['fielding', 'throw']) + ')')
+        info.append({'title': 'FIELDING', 'fieldList': [{'label': 'E', 'value': ', '.join(errorList) + '.'}]})
+    teamPitching = {'inningsPitched': inningsPitched, 'hits': totals['hits'], 'runs': runs, 'earnedRuns': runs,
+                    'baseOnBalls': totals['baseOnBalls'], 'strikeOuts': totals['strikeOuts'], 'homeRuns': totals['homeRuns']}
+    side = {'team': team, 'players': feedPlayers, 'batters': batters, 'pitchers': pitchers,
+            'teamStats': {'batting': totals, 'pitching': teamPitching, 'fielding': {'errors': errors}}, 'note': notes, 'info': info}
+    return side, nextID
+
+#Makes up how many runs score in a half inning.
+def make_half_inning_runs(rng):
+    return rng.choice([0, 0, 0, 0, 0, 0, 0, 1, 1, 2, 3])
+
+#Makes up one game's live feed. Runs are scored on scoring plays, half inning by half inning, so the line score,
+#the scoring plays and the pitchers' innings all agree, including walk-offs and extra innings.
+#innings past 9 makes the teams trade runs until then, so the game is tied going into extras.
+#A suspended game stops after lastInning whatever the score, with status e.g. 'Suspended: Rain'.
+def make_feed(gameID, seed, awayTeam, homeTeam, innings=9, subRate=0.2, benchSize=4, lastInning=None, status='Final'):
+    rng = random.Random(seed)
+    allPlays = []
+    scoringPlays = []
+    lineInnings = []
+    awayScore = 0
+    homeScore = 0
+    inning = 0
+    minute = 0
+    homeBatted = 0
+    while True:
+        inning += 1
+        lineInning = {'num': inning, 'away': {}, 'home': {}}
+        topRuns = make_half_inning_runs(rng)
+        if innings > 9 and inning >= 9:
+            topRuns = 0
+            if inning == innings:
+                topRuns = rng.randint(1, 3)
+        for halfInning in ['top', 'bottom']:
+            runs = topRuns
+            if halfInning == 'bottom':
+                #The home team doesn't bat in the bottom of the last inning if they're already ahead.
+                if inning >= 9 and homeScore > awayScore:
+                    break
+                homeBatted = inning
+                if innings > 9 and inning < innings:
+                    runs = topRuns
+                elif innings > 9:
+                    runs = 0
+                else:
+                    runs = make_half_inning_runs(rng)
+                    #A walk-off ends the game as soon as the home team goes ahead.
+                    if inning >= 9 and homeScore + runs > awayScore:
+                        runs = awayScore - homeScore + 1
+            atBats = rng.randint(3, 6)
+            scoringAtBat = rng.randint(0, atBats - 1)
+            if halfInning == 'bottom' and inning >= 9 and homeScore + runs > awayScore:
+                scoringAtBat = atBats - 1
+            for atBat in range(atBats):
+                minute += 3
+                scored = 0
+                if atBat == scoringAtBat:
+                    scored = runs
+                if halfInning == 'top':
+                    awayScore += scored
+                else:
+                    homeScore += scored
+                play = {'atBatIndex': len(allPlays), 'result': {'description': 'Player' + str(rng.randint(1000, 9999)) + ' singles on a line drive to left fielder.',
+                                                               'awayScore': awayScore, 'homeScore': homeScore},
+                        'about': {'halfInning': halfInning, 'inning': inning,
+                                  'endTime': '2024-07-30T' + str(20 + minute // 3600).zfill(2) + ':' + str(minute // 60 % 60).zfill(2) + ':' + str(minute % 60).zfill(2) + '.000Z'}}
+                allPlays.append(play)
+                if scored:
+                    scoringPlays.append(play['atBatIndex'])
+            if halfInning == 'top':
+                lineInning['away'] = {'runs': runs}
+            else:
+                lineInning['home'] = {'runs': runs}
+        lineInnings.append(lineInning)
+        if lastInning is not None and inning >= lastInning:
+            break
+        if inning >= max(innings, 9) and awayScore != homeScore:
+            break
+
+    players = {}
+    awaySide, nextID = make_feed_side(rng, awayTeam, players, gameID * 1000, awayScore, str(homeBatted) + '.0', homeBatted * 3, subRate, benchSize)
+    homeSide, nextID = make_feed_side(rng, homeTeam, players, nextID, homeScore, str(inning) + '.0', inning * 3, subRate, benchSize)
+    gameInfo = [{'label': 'WP', 'value': 'Pitcher' + str(nextID) + '.'},
+                {'label': 'HBP', 'value': 'Player' + str(gameID * 1000 + 3) + ' (by Pitcher' + str(nextID - 1) + ').'},
+                {'label': 'Umpires', 'value': 'HP: Ump One. 1B: Ump Two. 2B: Ump Three. 3B: Ump Four.'},
+                {'label': 'Weather', 'value': str(rng.randint(60, 95)) + ' degrees, Partly Cloudy.'},
+                {'label': 'Wind', 'value': str(rng.randint(0, 15)) + ' mph, Out To CF.'},
+                {'label': 'T', 'value': '2:' + str(rng.randint(20, 59)) + '.'},
+                {'label': 'Att', 'value': str(rng.randint(15, 45)) + ',' + str(rng.randint(100, 999)) + '.'},
+                {'label': 'July 30, 2024'}]
+    return {'gamePk': gameID,
+            'gameData': {'game': {'pk': gameID, 'id': '2024/07/30/' + str(gameID)},
+                         'status': {'abstractGameState': 'Final' if is_final_status(status) else 'Live', 'detailedState': status},
+                         'teams': {'away': awayTeam, 'home': homeTeam}, 'players': players},
+            'liveData': {'boxscore': {'teams': {'away': awaySide, 'home': homeSide}, 'info': gameInfo},
+                         'plays': {'allPlays': allPlays, 'scoringPlays': scoringPlays},
+                         'linescore': {'innings': lineInnings, 'currentInning': inning, 'inningState': 'End',
+                                       'teams': {'away': {'runs': awayScore, 'hits': awaySide['teamStats']['batting']['hits'], 'errors': awaySide['teamStats']['fielding']['errors']},
+                                                 'home': {'runs': homeScore, 'hits': homeSide['teamStats']['batting']['hits'], 'errors': homeSide['teamStats']['fielding']['errors']}}}}}
+
+#A schedule entry with the keys the main script reads.
+def make_schedule_item(gameID, gameDate, gameNumber, awayTeam, homeTeam, doubleheader, status):
+    isoDate = datetime.strptime(gameDate, "%m/%d/%Y").strftime("%Y-%m-%d")
+    return {'game_id': gameID, 'game_datetime': isoDate + 'T' + str(17 + gameNumber % 6).zfill(2) + ':' + ['05', '10', '40'][gameNumber % 3] + ':00Z',
+            'game_date': isoDate, 'game_type': 'R', 'status': status, 'away_name': awayTeam['name'], 'home_name': homeTeam['name'],
+            'away_id': awayTeam['id'], 'home_id': homeTeam['id'], 'doubleheader': doubleheader, 'game_num': 1,
+            'home_probable_pitcher': 'Starter ' + str(gameID % 97), 'away_probable_pitcher': ['', 'Starter ' + str(gameID % 89)][gameID % 2],
+            'venue_name': homeTeam['teamName'] + ' Park'}
+
+#standings_data for all six divisions, five teams each.
+def make_standings(rng):
+    standings = {}
+    teamNumber = 0
+    for division in mlbDivisions:
+        teams = []
+        wins = sorted([rng.randint(40, 70) for k in range(5)], reverse=True)
+        for k in range(5):
+            team = make_team(teamNumber)
+            teamNumber += 1
+            gamesBack = (wins[0] - wins[k]) * 1.0
+            teams.append({'name': team['name'], 'div_rank': str(k + 1), 'w': wins[k], 'l': 110 - wins[k] - rng.randint(0, 2),
+                          'gb': '-' if k == 0 else str(gamesBack), 'wc_rank': str(k), 'wc_gb': '+1.0' if k == 1 else str(gamesBack / 2),
+                          'elim_num': '-', 'wc_elim_num': '-', 'team_id': team['id'], 'league_rank': str(k + 1), 'sport_rank': str(k + 1)})
+        standings[division] = {'div_name': mlbDivisions[division][0], 'teams': teams}
+    return standings
+
+#One date's worth of payloads. The game IDs are unique across dates so a week doesn't reuse games.
+def make_date_fixture(gameDate, dateNumber, gameCount, extraInnings=None, doubleheader=False, seed=0):
+    rng = random.Random(seed * 1000 + dateNumber)
+    schedule = []
+    games = []
+    for k in range(gameCount):
+        gameID = 700000 + dateNumber * 100 + k
+        awayTeam = make_team(2 * k)
+        homeTeam = make_team(2 * k + 1)
+        doubleheaderCode = 'N'
+        #The last two games of a doubleheader day are the same two teams.
+        if doubleheader and k >= gameCount - 2:
+            awayTeam = make_team(2 * (gameCount - 2))
+            homeTeam = make_team(2 * (gameCount - 2) + 1)
+            doubleheaderCode = 'S'
+        scheduleItem = make_schedule_item(gameID, gameDate, k, awayTeam, homeTeam, doubleheaderCode, 'Final')
+        if doubleheaderCode == 'S':
+            scheduleItem['game_num'] = k - gameCount + 3
+        schedule.append(scheduleItem)
+        innings = (extraInnings or {}).get(k + 1, 9)
+        feed = make_feed(gameID, rng.randint(0, 10 ** 9), awayTeam, homeTeam, innings)
+        games.append({'gameID': gameID, 'boxscore': boxscore_data_from_feed(feed), 'linescore': '',
+                      'scoring': scoring_play_data_from_feed(feed)})
+    tomorrow = []
+    for k in range(15):
+        tomorrow.append(make_schedule_item(800000 + dateNumber * 100 + k, get_next_day(gameDate), k, make_team(2 * k + 1), make_team(2 * k), 'N', 'Scheduled'))
+    return {'date': gameDate, 'schedule': schedule, 'standings': make_standings(rng), 'tomorrow': tomorrow, 'games': games}
+
+def make_fixture(name, firstDate, dateCount, gameCount, extraInnings=None, doubleheader=False, seed=0):
+    dates = []
+    gameDate = firstDate
+    for dateNumber in range(dateCount):
+        dates.append(make_date_fixture(gameDate, dateNumber, gameCount, extraInnings, doubleheader, seed))
+        gameDate = get_next_day(gameDate)
+    return {'name': name, 'recorded': False, 'dates': dates}
+
+#JSON turns the standings' division IDs into strings, so they're turned back into ints on the way in.
+def load_fixture(path):
+    with open(path) as file:
+        fixture = json.load(file)
+    for dateFixture in fixture['dates']:
+        dateFixture['standings'] = {int(division): dateFixture['standings'][division] for division in dateFixture['standings']}
+    return fixture
+
+def save_fixture(fixture, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(fixture, file)
+
+#The standard scenarios, from recorded files in fixtureDir where we have them and made up where we don't.
+def get_scenario_fixtures(fixtureDir=None, seed=0):
+    fixtures = []
+    for name, firstDate, dateCount, gameCount, extraInnings, doubleheader in scenarios:
+        path = None
+        if fixtureDir is not None:
+            path = os.path.join(fixtureDir, name + '.json')
+        if path is not None and os.path.exists(path):
+            fixtures.append(load_fixture(path))
+        else:
+            fixtures.append(make_fixture(name, firstDate, dateCount, gameCount, extraInnings, doubleheader, seed))
+    return fixtures
+
+#Writes a fixture into a ResponseCache under the same calls build_box_score_page makes,
+#so the whole page can be built from it with FetchOptions(cacheDir=..., offline=True).
+#A page's schedule is one request for its date and the day after; when the day after is in the fixture too,
+#its games stand in for the made-up "tomorrow", the way the API would have it.
+def install_fixture_in_cache(fixture, responseCache):
+    schedulesByDate = {dateFixture['date']: dateFixture['schedule'] for dateFixture in fixture['dates']}
+    for dateFixture in fixture['dates']:
+        gameDate = dateFixture['date']
+        nextDay = get_next_day(gameDate)
+        rangeSchedule = dateFixture['schedule'] + schedulesByDate.get(nextDay, dateFixture['tomorrow'])
+        responseCache.save('schedule', get_range_arguments(gameDate, nextDay), rangeSchedule, None)
+        responseCache.save('standings_data', {'date': gameDate}, dateFixture['standings'], None)
+        for game in dateFixture['games']:
+            responseCache.save('boxscore_data', {'gamePk': game['gameID']}, game['boxscore'], None)
+            responseCache.save('linescore', {'gamePk': game['gameID']}, game['linescore'], None)
+            responseCache.save('game_scoring_play_data', {'gamePk': game['gameID']}, game['scoring'], None)
+
+#Records real dates from the API, the same calls the main script makes.
+def record_fixture(name, firstDate, lastDate):
+    import statsapi
+    dates = []
+    gameDate = firstDate
+    while datetime.strptime(gameDate, "%m/%d/%Y") <= datetime.strptime(lastDate, "%m/%d/%Y"):
+        nextDay = get_next_day(gameDate)
+        schedule = statsapi.schedule(**get_schedule_arguments(gameDate))
+        games = []
+        for item in schedule:
+            games.append({'gameID': item['game_id'],
+                          'boxscore': statsapi.boxscore_data(item['game_id']),
+                          'linescore': statsapi.linescore(item['game_id']),
+                          'scoring': statsapi.game_scoring_play_data(item['game_id'])})
+        dates.append({'date': gameDate, 'schedule': schedule, 'standings': statsapi.standings_data(date=gameDate),
+                      'tomorrow': statsapi.schedule(start_date=nextDay, end_date=nextDay), 'games': games})
+        print("Recorded " + gameDate + ": " + str(len(games)) + " games")
+        gameDate = nextDay
+    return {'name': name, 'recorded': True, 'dates': dates}
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Records or makes up statsapi fixtures for the benchmarks.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    recordParser = subparsers.add_parser('record', help="record real dates from the API")
+    recordParser.add_argument('date', help="first date, MM/DD/YYYY")
+    recordParser.add_argument('path', help="JSON file to write")
+    recordParser.add_argument('--end-date', help="last date (default: just the first one)")
+    generateParser = subparsers.add_parser('generate', help="write the made-up standard scenarios")
+    generateParser.add_argument('directory', help="directory to write <scenario>.json into")
+    generateParser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+    if arguments.command == 'record':
+        fixture = record_fixture(os.path.splitext(os.path.basename(arguments.path))[0], arguments.date, arguments.end_date or arguments.date)
+        save_fixture(fixture, arguments.path)
+    else:
+        for fixture in get_scenario_fixtures(seed=arguments.seed):
+            save_fixture(fixture, os.path.join(arguments.directory, fixture['name'] + '.json'))
+            print("Wrote " + fixture['name'])
+
+if __name__ == '__main__':
+    main()
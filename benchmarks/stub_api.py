@@ -0,0 +1,387 @@
+#A stand-in for the MLB Stats API, for load tests. It serves made-up slates (see fixtures.py) of any size:
+#the schedule, the standings and each game's live feed, which is where statsapi's boxscore_data, linescore
+#and game_scoring_play_data (and the single-feed mode) all get their data. Every request can be slowed down
+#and can fail, at rates we pick, so we can see how the fetch and render paths scale and how they hold up.
+#There are two ways to use it:
+#  - in the same process: install_stub(api) puts a FakeRequests in as statsapi's requests module, underneath
+#    the transport (box_score_transport.py) and the metrics, so pooling, retries and rate limits all still run;
+#  - over HTTP: run the server, then call point_statsapi_at() in the process under test:
+#        python benchmarks/stub_api.py serve --games 300 --long-games 3 --suspended 2 --doubleheaders 2 --latency 0.05 --error-rate 0.02
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from box_score_cache import is_final_status
+from box_score_transport import PooledRequests
+from fixtures import get_next_day, make_feed, make_standings, make_team, mlbDivisions, mlbLeagues
+
+#The divisions' abbreviations, for the standings records (the keys are fixtures.py's mlbDivisions).
+divisionAbbreviations = {200: 'ALW', 201: 'ALE', 202: 'ALC', 203: 'NLW', 204: 'NLE', 205: 'NLC'}
+
+#Takes either date format the API sees (MM/DD/YYYY from us, YYYY-MM-DD from elsewhere) and gives MM/DD/YYYY.
+def normalize_date(gameDate):
+    if '-' in gameDate:
+        return datetime.strptime(gameDate, "%Y-%m-%d").strftime("%m/%d/%Y")
+    return datetime.strptime(gameDate, "%m/%d/%Y").strftime("%m/%d/%Y")
+
+def get_iso_date(gameDate):
+    return datetime.strptime(gameDate, "%m/%d/%Y").strftime("%Y-%m-%d")
+
+#One game as the schedule endpoint has it. The score and inning come from the game's feed, if it has one.
+def make_schedule_game(gameID, gameDate, gameNumber, awayTeam, homeTeam, doubleheader='N', doubleheaderGame=1, status='Scheduled', feed=None):
+    isoDate = get_iso_date(gameDate)
+    abstractState = 'Final' if is_final_status(status) else 'Preview' if status == 'Scheduled' else 'Live'
+    game = {'gamePk': gameID, 'gameDate': isoDate + 'T' + str(17 + gameNumber % 6).zfill(2) + ':' + ['05', '10', '40'][gameNumber % 3] + ':00Z',
+            'gameType': 'R', 'status': {'abstractGameState': abstractState, 'detailedState': status},
+            'teams': {'away': {'team': {'id': awayTeam['id'], 'name': awayTeam['name']}, 'probablePitcher': {'fullName': 'Starter ' + str(gameID % 89)}},
+                      'home': {'team': {'id': homeTeam['id'], 'name': homeTeam['name']}, 'probablePitcher': {'fullName': 'Starter ' + str(gameID % 97)}}},
+            'doubleHeader': doubleheader, 'gameNumber': doubleheaderGame, 'venue': {'id': homeTeam['id'], 'name': homeTeam['teamName'] + ' Park'},
+            'content': {}}
+    if feed is not None:
+        linescore = feed['liveData']['linescore']
+        game['teams']['away']['score'] = linescore['teams']['away']['runs']
+        game['teams']['home']['score'] = linescore['teams']['home']['runs']
+        game['teams']['away']['isWinner'] = linescore['teams']['away']['runs'] > linescore['teams']['home']['runs']
+        game['linescore'] = {'currentInning': linescore['currentInning'], 'inningState': linescore['inningState']}
+    return game
+
+#The standings endpoint's records, from the standings_data dict fixtures.py makes.
+def make_standings_records(standings):
+    records = []
+    for division in standings:
+        teamRecords = []
+        for team in standings[division]['teams']:
+            teamRecords.append({'team': {'id': team['team_id'], 'name': team['name'],
+                                         'division': {'id': division, 'name': standings[division]['div_name'], 'abbreviation': divisionAbbreviations[division]}},
+                                'divisionRank': team['div_rank'], 'wins': team['w'], 'losses': team['l'], 'gamesBack': team['gb'],
+                                'wildCardRank': team['wc_rank'], 'wildCardGamesBack': team['wc_gb'], 'wildCardEliminationNumber': team['wc_elim_num'],
+                                'eliminationNumber': team['elim_num'], 'leagueRank': team['league_rank'], 'sportRank': team['sport_rank']})
+        records.append({'standingsType': 'regularSeason', 'teamRecords': teamRecords})
+    return {'records': records}
+
+#The divisions and league endpoints' answers, for box_score_divisions.py.
+def make_divisions_response():
+    return {'divisions': [{'id': division, 'name': name, 'nameShort': shortName, 'abbreviation': divisionAbbreviations[division],
+                           'league': {'id': leagueID}, 'sport': {'id': 1}, 'sortOrder': 0, 'active': True}
+                          for division, (name, shortName, leagueID) in mlbDivisions.items()]}
+
+def make_leagues_response():
+    return {'leagues': [{'id': leagueID, 'name': name, 'abbreviation': abbreviation} for leagueID, (name, abbreviation) in mlbLeagues.items()]}
+
+#One made-up date: gameCount games, of which longGames go longInnings innings, suspended are suspended
+#in the middle and the last doubleheaders pairs are doubleheaders. subRate and benchSize set how many
+#substitutes and bench players each side has (see make_feed_side). Teams repeat after 15 games.
+class Slate:
+    def __init__(self, gameDate, gameCount, seed=0, longGames=0, longInnings=20, suspended=0, doubleheaders=0, subRate=0.2, benchSize=4):
+        self.gameDate = normalize_date(gameDate)
+        rng = random.Random(seed)
+        specialGames = rng.sample(range(gameCount - 2 * doubleheaders), min(gameCount - 2 * doubleheaders, longGames + suspended))
+        longGameNumbers = set(specialGames[:longGames])
+        suspendedGameNumbers = set(specialGames[longGames:])
+        self.scheduleGames = []
+        self.feeds = {}
+        for k in range(gameCount):
+            gameID = 900000 + seed % 1000 * 1000 + k
+            teamNumber = 2 * k % 30
+            doubleheader = 'N'
+            doubleheaderGame = 1
+            if k >= gameCount - 2 * doubleheaders:
+                pairNumber = (k - gameCount + 2 * doubleheaders) // 2
+                teamNumber = 2 * pairNumber % 30
+                doubleheader = 'S'
+                doubleheaderGame = 1 + (k - gameCount) % 2
+            awayTeam = make_team(teamNumber)
+            homeTeam = make_team(teamNumber + 1)
+            innings = longInnings if k in longGameNumbers else 9
+            lastInning = None
+            status = 'Final'
+            if k in suspendedGameNumbers:
+                lastInning = rng.randint(4, 7)
+                status = 'Suspended: Rain'
+            feed = make_feed(gameID, rng.randint(0, 10 ** 9), awayTeam, homeTeam, innings, subRate, benchSize, lastInning, status)
+            self.feeds[gameID] = feed
+            self.scheduleGames.append(make_schedule_game(gameID, self.gameDate, k, awayTeam, homeTeam, doubleheader, doubleheaderGame, status, feed))
+        self.standings = make_standings_records(make_standings(rng))
+
+    def get_game_ids(self):
+        return list(self.feeds)
+
+#The stub itself: the slates it knows, and how slow and unreliable to be.
+#  latency, jitter    - every answer takes latency seconds, give or take up to jitter
+#  errorRate          - the share of requests answered with a 503
+#  throttleRate       - the share answered with a 429 and Retry-After: 1
+#  timeoutRate        - the share that hang for hangSeconds (or until the caller's timeout) and get no answer
+#A date with no slate gets an empty schedule, except that the day after a slate gets 15 scheduled games
+#for the "today's games" table. Counts of what was served are kept in counters.
+class StubStatsAPI:
+    def __init__(self, slates=(), latency=0.0, jitter=0.0, errorRate=0.0, throttleRate=0.0, timeoutRate=0.0, hangSeconds=60, seed=0):
+        self.slates = {}
+        self.feedBodies = {}
+        for slate in slates:
+            self.add_slate(slate)
+        self.latency = latency
+        self.jitter = jitter
+        self.errorRate = errorRate
+        self.throttleRate = throttleRate
+        self.timeoutRate = timeoutRate
+        self.hangSeconds = hangSeconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    #Feeds are turned into JSON once, up front, so the stub's own work doesn't show up in the timings.
+    def add_slate(self, slate):
+        self.slates[slate.gameDate] = slate
+        for gameID in slate.feeds:
+            self.feedBodies[gameID] = json.dumps(slate.feeds[gameID]).encode('utf-8')
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def get_schedule_games(self, gameDate):
+        if gameDate in self.slates:
+            return self.slates[gameDate].scheduleGames
+        previousDate = (datetime.strptime(gameDate, "%m/%d/%Y") - timedelta(days=1)).strftime("%m/%d/%Y")
+        if previousDate in self.slates:
+            return [make_schedule_game(800000 + k, gameDate, k, make_team(2 * k + 1), make_team(2 * k)) for k in range(15)]
+        return []
+
+    def get_schedule(self, query):
+        if 'date' in query:
+            gameDates = [normalize_date(query['date'])]
+        else:
+            gameDates = []
+            gameDate = normalize_date(query['startDate'])
+            while datetime.strptime(gameDate, "%m/%d/%Y") <= datetime.strptime(normalize_date(query['endDate']), "%m/%d/%Y"):
+                gameDates.append(gameDate)
+                gameDate = get_next_day(gameDate)
+        dates = []
+        for gameDate in gameDates:
+            games = self.get_schedule_games(gameDate)
+            if games:
+                dates.append({'date': get_iso_date(gameDate), 'games': games})
+        return {'totalItems': sum(len(date['games']) for date in dates), 'dates': dates}
+
+    #The standings for the slate on that date, or the first slate's if there isn't one.
+    def get_standings(self, query):
+        gameDate = normalize_date(query['date']) if 'date' in query else None
+        if gameDate in self.slates:
+            return self.slates[gameDate].standings
+        for slate in self.slates.values():
+            return slate.standings
+        return {'records': []}
+
+    #Works out the answer to one request: (status, headers, body, seconds to wait first, hang).
+    #Used by both FakeRequests and the HTTP server.
+    def respond(self, url):
+        parts = urlsplit(url)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        path = parts.path.rstrip('/')
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            draw = self.rng.random()
+        self.count('requests')
+        if draw < self.timeoutRate:
+            self.count('timeouts')
+            return 504, {}, b'', delay, True
+        draw -= self.timeoutRate
+        if draw < self.errorRate:
+            self.count('errors')
+            return 503, {}, b'{"message": "Service Unavailable"}', delay, False
+        draw -= self.errorRate
+        if draw < self.throttleRate:
+            self.count('throttled')
+            return 429, {'Retry-After': '1'}, b'{"message": "Too Many Requests"}', delay, False
+
+        if path.endswith('/feed/live'):
+            gameID = int(path.split('/')[-3])
+            if gameID not in self.feedBodies:
+                self.count('notFound')
+                return 404, {}, b'{"message": "Object not found"}', delay, False
+            self.count('feeds')
+            return 200, {}, self.feedBodies[gameID], delay, False
+        if path.endswith('/schedule'):
+            self.count('schedules')
+            return 200, {}, json.dumps(self.get_schedule(query)).encode('utf-8'), delay, False
+        if path.endswith('/standings'):
+            self.count('standings')
+            return 200, {}, json.dumps(self.get_standings(query)).encode('utf-8'), delay, False
+        if path.endswith('/divisions'):
+            return 200, {}, json.dumps(make_divisions_response()).encode('utf-8'), delay, False
+        if path.endswith('/league'):
+            return 200, {}, json.dumps(make_leagues_response()).encode('utf-8'), delay, False
+        self.count('notFound')
+        return 404, {}, b'{"message": "Unknown endpoint"}', delay, False
+
+#Just enough of a requests.Response for statsapi and the transport.
+class FakeResponse:
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code) + " Error for url: " + self.url, response=self)
+
+class FakeSession:
+    def __init__(self, fakeRequests):
+        self.fakeRequests = fakeRequests
+
+    def get(self, url, **kwargs):
+        return self.fakeRequests.get(url, **kwargs)
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        pass
+
+#Stands in for the requests module: answers from the stub, and raises requests' own exceptions,
+#so whatever wraps it can't tell the difference.
+class FakeRequests:
+    exceptions = requests.exceptions
+    adapters = requests.adapters
+
+    def __init__(self, api):
+        self.api = api
+
+    def get(self, url, timeout=None, **kwargs):
+        status, headers, body, delay, hang = self.api.respond(url)
+        if hang:
+            time.sleep(min(self.api.hangSeconds, timeout if timeout is not None else self.api.hangSeconds))
+            raise requests.exceptions.ReadTimeout("Read timed out for url: " + url)
+        time.sleep(delay)
+        return FakeResponse(url, status, headers, body)
+
+    def Session(self):
+        return FakeSession(self)
+
+#Puts FakeRequests(api) in as statsapi's requests, underneath the metrics and the transport if they're on.
+def install_stub(api):
+    import statsapi
+    fakeRequests = FakeRequests(api)
+    holder = statsapi
+    attribute = 'requests'
+    while 'requestsModule' in vars(getattr(holder, attribute)):
+        holder = getattr(holder, attribute)
+        attribute = 'requestsModule'
+    setattr(holder, attribute, fakeRequests)
+    #A transport that's already installed has a real session open; give it one from the stub instead.
+    if isinstance(holder, PooledRequests):
+        holder.session = fakeRequests.Session()
+    return fakeRequests
+
+#Sends statsapi's requests to baseURL (e.g. http://127.0.0.1:8765/api/) instead of statsapi.mlb.com.
+def point_statsapi_at(baseURL):
+    from statsapi import endpoints
+    for endpoint in endpoints.ENDPOINTS.values():
+        endpoint['url'] = endpoint['url'].replace(endpoints.BASE_URL, baseURL)
+    endpoints.BASE_URL = baseURL
+
+def make_request_handler(api):
+    class StubRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, headers, body, delay, hang = api.respond(self.path)
+            time.sleep(delay)
+            if hang:
+                time.sleep(api.hangSeconds)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name in headers:
+                self.send_header(name, headers[name])
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubRequestHandler
+
+#Starts the HTTP server on a background thread and returns it; server.shutdown() stops it.
+#Port 0 picks a free port, which is in server.server_address.
+def start_server(api, host='127.0.0.1', port=0):
+    server = ThreadingHTTPServer((host, port), make_request_handler(api))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def add_slate_arguments(parser):
+    parser.add_argument('--date', default='07/30/2024', help="first date of the slates, MM/DD/YYYY")
+    parser.add_argument('--long-games', type=int, default=2, help="games per date that go --long-innings innings")
+    parser.add_argument('--long-innings', type=int, default=20)
+    parser.add_argument('--suspended', type=int, default=2, help="suspended games per date")
+    parser.add_argument('--doubleheaders', type=int, default=2, help="doubleheaders per date")
+    parser.add_argument('--sub-rate', type=float, default=0.2, help="chance each lineup spot has a substitute")
+    parser.add_argument('--bench-size', type=int, default=4, help="bench players per side")
+    parser.add_argument('--seed', type=int, default=0)
+
+def add_fault_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds before each answer")
+    parser.add_argument('--jitter', type=float, default=0.0, help="give or take this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument('--hang-seconds', type=float, default=60, help="how long a hanging request hangs")
+
+def make_slates(arguments):
+    slates = []
+    gameDate = arguments.date
+    for dateNumber in range(arguments.dates):
+        slates.append(Slate(gameDate, arguments.games, arguments.seed + dateNumber, arguments.long_games, arguments.long_innings,
+                            arguments.suspended, arguments.doubleheaders, arguments.sub_rate, arguments.bench_size))
+        gameDate = get_next_day(gameDate)
+    return slates
+
+def make_stub(arguments, slates):
+    return StubStatsAPI(slates, arguments.latency, arguments.jitter, arguments.error_rate, arguments.throttle_rate,
+                        arguments.timeout_rate, arguments.hang_seconds, arguments.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves made-up MLB Stats API slates over HTTP for load tests.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serveParser = subparsers.add_parser('serve', help="run the stub server until interrupted")
+    serveParser.add_argument('--host', default='127.0.0.1')
+    serveParser.add_argument('--port', type=int, default=8765)
+    serveParser.add_argument('--dates', type=int, default=1, help="how many dates in a row to make")
+    serveParser.add_argument('--games', type=int, default=300, help="games per date")
+    add_slate_arguments(serveParser)
+    add_fault_arguments(serveParser)
+    arguments = parser.parse_args()
+    slates = make_slates(arguments)
+    api = make_stub(arguments, slates)
+    server = ThreadingHTTPServer((arguments.host, arguments.port), make_request_handler(api))
+    server.daemon_threads = True
+    print("Serving " + str(sum(len(slate.feeds) for slate in slates)) + " games on http://" + arguments.host + ":" + str(arguments.port) + "/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(api.counters, sort_keys=True))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from box_score_metrics import count
+
+#Schedule statuses that mean a game is over and its data won't change any more, so it's cached for good.
+finalStatuses = ('Final', 'Game Over', 'Completed Early')
+
+def is_final_status(status):
+    return status.startswith(finalStatuses)
+
+#A postponed or cancelled game won't be played today either, but it can be made up later or have its status
+#corrected, so its responses only get the normal TTL. This is for knowing when there's nothing left to watch.
+overStatuses = finalStatuses + ('Postponed', 'Cancelled')
+
+def is_over_status(status):
+    return status.startswith(overStatuses)
+
+#Raised in offline mode when a call isn't in the cache.
+class CacheMissError(LookupError):
+    pass
+
+#This is an on-disk cache of statsapi responses, one pickle file per call.
+#Entries saved with ttl=None never expire (we use that for Final games); everything else expires after ttl seconds.
+#When the cache gets bigger than maxBytes, the least recently used files get deleted.
+#In offline mode nothing is fetched: every call has to come out of the cache, expired or not.
+class ResponseCache:
+    def __init__(self, cacheDir, maxBytes=500 * 1024 * 1024, shortTTL=300, offline=False):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.shortTTL = shortTTL
+        self.offline = offline
+        self.lock = threading.Lock()
+        os.makedirs(cacheDir, exist_ok=True)
+        self.totalBytes = 0
+        for entry in os.scandir(cacheDir):
+            if entry.name.endswith('.pickle'):
+                self.totalBytes += entry.stat().st_size
+
+    #Each call is stored under a hash of its name and arguments.
+    def get_path(self, name, kwargs):
+        keyString = json.dumps([name, kwargs], sort_keys=True, default=str)
+        return os.path.join(self.cacheDir, hashlib.sha1(keyString.encode('utf-8')).hexdigest() + '.pickle')
+
+    #Returns (True, value) if we have a usable copy of this call for a caller that wants it no older than ttl,
+    #otherwise (False, None). A copy saved with a TTL was saved while the game could still change, so it's no good
+    #to a caller asking for ttl=None (the game is Final now): that's a miss, and call() saves the new copy for good.
+    def load(self, name, kwargs, ttl):
+        path = self.get_path(name, kwargs)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        if not self.offline and entry['ttl'] is not None:
+            age = time.time() - entry['fetched']
+            if ttl is None or age > entry['ttl'] or age > ttl:
+                return False, None
+        #Touch the file so eviction knows it was used recently.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, entry['value']
+
+    #Writes an entry through a temp file so a crash never leaves half a file behind.
+    def save(self, name, kwargs, value, ttl):
+        path = self.get_path(name, kwargs)
+        entry = {'name': name, 'kwargs': kwargs, 'fetched': time.time(), 'ttl': ttl, 'value': value}
+        fileHandle, tempPath = tempfile.mkstemp(dir=self.cacheDir, suffix='.tmp')
+        with os.fdopen(fileHandle, 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        newSize = os.path.getsize(tempPath)
+        with self.lock:
+            if os.path.exists(path):
+                self.totalBytes -= os.path.getsize(path)
+            os.replace(tempPath, path)
+            self.totalBytes += newSize
+            if self.totalBytes > self.maxBytes:
+                self.evict()
+
+    #Deletes the least recently used entries until we're back under the size limit.
+    #Only called with the lock held.
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith('.pickle'):
+                entryStat = entry.stat()
+                entries.append((entryStat.st_mtime, entryStat.st_size, entry.path))
+        entries.sort()
+        for mtime, size, path in entries:
+            if self.totalBytes <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+                self.totalBytes -= size
+            except OSError:
+                pass
+
+    #Returns the cached value for this call if we have one, otherwise runs fetch() and saves what it returns.
+    def call(self, name, kwargs, fetch, ttl):
+        hit, value = self.load(name, kwargs, ttl)
+        if hit:
+            count('cacheHits')
+            return value
+        count('cacheMisses')
+        if self.offline:
+            raise CacheMissError(f"{name}({kwargs}) is not in the cache at {self.cacheDir}")
+        value = fetch()
+        self.save(name, kwargs, value, ttl)
+        return value
@@ -0,0 +1,136 @@
+import re
+from box_score_cache import CacheMissError
+from box_score_fetch import call_statsapi
+
+#The leagues and divisions a sport's standings are grouped by, from the API's divisions and league endpoints,
+#so the same code lays out MLB's two leagues and every minor league's. Each league gets its own standings table:
+#its divisions, then a wild card group if the league has one. Both calls are made once per sport and season.
+#When they aren't available (offline with an older cache, or a page rendered from saved models) the model
+#is worked out from the division names in the standings themselves: "American League West" is the AL's West.
+
+#Where a division sits in its league's table: East, then Central, then West, like the MLB page always had it.
+regionOrder = ['East', 'Northeast', 'North', 'Central', 'South', 'Southeast', 'Southwest', 'Northwest', 'West']
+
+def get_region_rank(divisionName):
+    region = divisionName.split(' ')[-1]
+    if region in regionOrder:
+        return regionOrder.index(region)
+    return len(regionOrder)
+
+#"American League" -> "AL", "Pacific Coast League" -> "PCL". A name that's already short stays as it is.
+def get_league_abbreviation(leagueName):
+    if ' ' not in leagueName and leagueName.isupper():
+        return leagueName
+    return ''.join(word[0] for word in leagueName.split(' ') if word[:1].isupper())
+
+#A division name without its region: "American League West" -> "American League".
+def get_league_name(divisionName):
+    words = divisionName.split(' ')
+    if len(words) > 1 and words[-1] in regionOrder:
+        words = words[:-1]
+    return ' '.join(words)
+
+class Division:
+    def __init__(self, divisionID, name, shortName, leagueID, sortOrder=0):
+        self.divisionID = divisionID
+        self.name = name
+        #What heads the division in the standings table, e.g. "AL West".
+        self.shortName = shortName
+        self.leagueID = leagueID
+        self.sortOrder = sortOrder
+
+class League:
+    def __init__(self, leagueID, name, abbreviation):
+        self.leagueID = leagueID
+        self.name = name
+        self.abbreviation = abbreviation
+        #In table order.
+        self.divisions = []
+
+    #A file name friendly version of the name, for the league's page.
+    def get_slug(self):
+        return re.sub(r'[^a-z0-9]+', '-', self.name.lower()).strip('-')
+
+class DivisionModel:
+    def __init__(self, leagues):
+        self.leagues = leagues
+        for league in leagues:
+            league.divisions.sort(key=lambda division: (get_region_rank(division.shortName), division.sortOrder, division.divisionID))
+        self.leagues.sort(key=lambda league: league.leagueID)
+        self.divisionsByID = {division.divisionID: division for league in leagues for division in league.divisions}
+        self.leaguesByID = {league.leagueID: league for league in leagues}
+
+    #The leagues to ask the standings endpoint about.
+    def get_league_ids(self):
+        return [league.leagueID for league in self.leagues]
+
+    def get_league(self, divisionID):
+        division = self.divisionsByID.get(divisionID)
+        if division is None:
+            return None
+        return self.leaguesByID[division.leagueID]
+
+    #team ID -> its league's ID, from the teams in a standings_data result.
+    def get_team_leagues(self, standingsData):
+        teamLeagues = {}
+        for divisionID in standingsData:
+            league = self.get_league(divisionID)
+            if league is not None:
+                for team in standingsData[divisionID]['teams']:
+                    teamLeagues[team['team_id']] = league.leagueID
+        return teamLeagues
+
+#Builds the model from the divisions and league endpoints' responses.
+def build_division_model(divisionsResponse, leaguesResponse=None):
+    leagueInfo = {}
+    for item in (leaguesResponse or {}).get('leagues', []):
+        leagueInfo[item['id']] = item
+    leagues = {}
+    for item in divisionsResponse.get('divisions', []):
+        if item.get('active') is False or 'league' not in item:
+            continue
+        leagueID = item['league']['id']
+        if leagueID not in leagues:
+            leagueName = leagueInfo.get(leagueID, {}).get('name') or get_league_name(item['name'])
+            abbreviation = leagueInfo.get(leagueID, {}).get('abbreviation') or get_league_abbreviation(leagueName)
+            leagues[leagueID] = League(leagueID, leagueName, abbreviation)
+        shortName = item.get('nameShort') or item['name']
+        leagues[leagueID].divisions.append(Division(item['id'], item['name'], shortName, leagueID, item.get('sortOrder', 0)))
+    return DivisionModel(list(leagues.values()))
+
+#Works the model out from a standings_data result alone. Divisions whose names give the same league end up together,
+#and the leagues are numbered in name order, since there's no league ID to go by.
+def build_division_model_from_standings(standingsData):
+    leaguesByName = {}
+    for divisionID in standingsData:
+        divisionName = standingsData[divisionID]['div_name']
+        leagueName = get_league_name(divisionName)
+        if leagueName not in leaguesByName:
+            leaguesByName[leagueName] = League(None, leagueName, get_league_abbreviation(leagueName))
+        league = leaguesByName[leagueName]
+        shortName = divisionName
+        if divisionName.split(' ')[-1] in regionOrder and divisionName != leagueName:
+            shortName = league.abbreviation + ' ' + divisionName.split(' ')[-1]
+        league.divisions.append(Division(divisionID, divisionName, shortName, None))
+    leagues = [leaguesByName[leagueName] for leagueName in sorted(leaguesByName)]
+    for leagueNumber, league in enumerate(leagues):
+        league.leagueID = leagueNumber
+        for division in league.divisions:
+            division.leagueID = leagueNumber
+    return DivisionModel(leagues)
+
+#Fetches the model for a sport and season. The divisions don't change during a season, so both calls are cached for good.
+#Returns None if the API can't tell us, and the caller falls back to build_division_model_from_standings.
+def fetch_division_model(sportID, season, responseCache=None):
+    try:
+        divisionsResponse = call_statsapi('get', {'endpoint': 'divisions', 'params': {'sportId': sportID, 'season': season}}, responseCache, None)
+        leaguesResponse = call_statsapi('get', {'endpoint': 'league', 'params': {'sportId': sportID, 'seasons': season}}, responseCache, None)
+    except CacheMissError:
+        return None
+    except Exception as error:
+        print("Couldn't fetch the divisions for sport " + str(sportID) + ": " + repr(error))
+        return None
+    divisionModel = build_division_model(divisionsResponse, leaguesResponse)
+    if not divisionModel.leagues:
+        return None
+    return divisionModel
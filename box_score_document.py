@@ -0,0 +1,256 @@
+import gzip
+import os
+import re
+import tempfile
+from box_score_metrics import count
+
+#brotli makes the smallest files for browsers that take them, but it isn't required: without it we only write .gz.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#BeautifulSoup is imported inside the functions that use it, so importing this module stays cheap.
+
+#This function combines two HTML files. We'll use this to build out the list of boxscores.'
+#Note that it re-parses everything it is given, so calling it in a loop gets slower with every game.
+#BoxScoreDocument below is what the main script uses now.
+def merge_html(html_base, new_html):
+    from bs4 import BeautifulSoup
+    count('htmlParses', 3)
+    # Parse both input HTML strings
+    soup1 = BeautifulSoup(html_base, 'html.parser')
+    soup2 = BeautifulSoup(new_html, 'html.parser')
+
+    # Create a new BeautifulSoup object with a basic HTML structure
+    new_soup = BeautifulSoup('<html><head></head><body></body></html>', 'html.parser')
+
+    # Handle the <head> section, using the <head> from soup1
+    if soup1.head:
+        new_soup.head.replace_with(soup1.head)
+
+    # Extract <body> contents from both soups
+    body1 = soup1.body
+    body2 = soup2.body
+
+    # Merge the body contents
+    if body1:
+        new_soup.body.extend(body1.contents)
+    if body2:
+        new_soup.body.extend(body2.contents)
+
+    # Return the string representation of the merged HTML
+    return str(new_soup)
+
+#These are the characters BeautifulSoup treats as blank space.
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+#Breaks the <body> of an HTML string into a list of serialized pieces, dropping the <html>/<head> wrapper.
+#Plain text pieces keep their raw text next to the markup, since two of them can run together between sections.
+def get_body_nodes(html):
+    from bs4 import BeautifulSoup, NavigableString
+    count('htmlParses')
+    soup = BeautifulSoup(html, 'html.parser')
+    bodyNodes = []
+    if soup.body:
+        for item in soup.body.contents:
+            if type(item) is NavigableString:
+                bodyNodes.append((str(item), item.output_ready()))
+            elif isinstance(item, NavigableString):
+                bodyNodes.append((None, item.output_ready()))
+            else:
+                bodyNodes.append((None, item.decode()))
+    return bodyNodes
+
+#Minified output: the f-string templates indent everything, and all of that blank space goes out to every reader.
+#Browsers collapse blank space in our markup anyway (there's no <pre>), so we can drop it between tags and squeeze
+#it everywhere else without changing how the page looks. The style sheet is only ever in the head, once.
+#Most of what's left is the same inline style="text-align: right;" on every number cell, so those cells get a
+#one-letter class instead, with a matching rule in the style sheet.
+spacePattern = re.compile(r'\s+')
+betweenTagsPattern = re.compile(r'>\s+<')
+cssCommentPattern = re.compile(r'/\*.*?\*/', re.S)
+cssPunctuationPattern = re.compile(r'\s*([{}:;,])\s*')
+stylePattern = re.compile(r'(<style[^>]*>)(.*?)(</style>)', re.S)
+rightAlignedPattern = re.compile(r'<(td|th) style="text-align: right;">')
+rightAlignedRule = '.r{text-align:right}'
+
+def minify_css(css):
+    css = cssCommentPattern.sub('', css)
+    css = cssPunctuationPattern.sub(r'\1', spacePattern.sub(' ', css))
+    return css.replace(';}', '}').strip()
+
+def minify_markup(html):
+    html = rightAlignedPattern.sub(r'<\1 class="r">', html)
+    return spacePattern.sub(' ', betweenTagsPattern.sub('><', html)).strip()
+
+def minify_head(head):
+    head = minify_markup(head)
+    if stylePattern.search(head) is None:
+        head = head.replace('</head>', '<style></style></head>', 1)
+    return stylePattern.sub(lambda match: match.group(1) + minify_css(match.group(2)) + rightAlignedRule + match.group(3), head, 1)
+
+#One piece from get_body_nodes. Blank text between tags goes away entirely.
+def minify_node(node):
+    if node[0] is not None and node[0].strip(ASCII_SPACES) == '':
+        return ''
+    if node[0] is not None:
+        return spacePattern.sub(' ', node[1])
+    return minify_markup(node[1])
+
+#Writes path.gz (and path.br, if brotli is installed) next to a finished page, so a static host can serve them
+#as they are. Returns the sizes in bytes: {'html': ..., 'gz': ..., 'br': ... or None}.
+def precompress_file(path):
+    sizes = {'html': os.path.getsize(path), 'gz': None, 'br': None}
+    with open(path, 'rb') as file:
+        data = file.read()
+    compressed = [('gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressed.append(('br', brotli.compress(data, quality=11)))
+    for extension, body in compressed:
+        write_file_atomically(path + '.' + extension, body)
+        sizes[extension] = len(body)
+    return sizes
+
+def write_file_atomically(path, data):
+    fileHandle, tempPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fileHandle, 'wb') as file:
+            file.write(data)
+        os.chmod(tempPath, 0o644)
+        os.replace(tempPath, path)
+    except BaseException:
+        os.remove(tempPath)
+        raise
+
+#"812.4 KB".
+def format_size(byteCount):
+    return str(round(byteCount / 1024, 1)) + ' KB'
+
+#How much smaller each version of a page is than the page we'd have written before, as one line for the log.
+def describe_page_sizes(path, rawBytes, sizes):
+    def describe(label, byteCount):
+        return label + ' ' + format_size(byteCount) + ' (-' + str(round(100 - 100 * byteCount / max(rawBytes, 1))) + '%)'
+    parts = [path + ': ' + format_size(rawBytes), describe('written', sizes['html'])]
+    for extension in ('gz', 'br'):
+        if sizes[extension] is not None:
+            parts.append(describe('.' + extension, sizes[extension]))
+    return ', '.join(parts)
+
+#This builds the page one section at a time.
+#The head (our style sheet) is parsed once, and each body section is parsed once when it is added,
+#so the cost of a page grows with the number of games instead of the square of it.
+#The output is the same string merge_html would have produced for the same sections.
+#With minify on, the page comes out minified (see minify_node) instead.
+class BoxScoreDocument:
+    def __init__(self, html_base, minify=False):
+        from bs4 import BeautifulSoup
+        count('htmlParses')
+        soup = BeautifulSoup(html_base, 'html.parser')
+        if soup.head:
+            self.head = str(soup.head)
+        else:
+            self.head = '<head></head>'
+        self.bodyNodes = get_body_nodes(html_base)
+        self.openJoin = None
+        self.minify = minify
+        #The head as it was, for the size report.
+        self.rawHead = self.head
+        if minify:
+            self.head = minify_head(self.head)
+
+    def join_nodes(self, bodyNodes):
+        if self.minify:
+            return ''.join(minify_node(node) for node in bodyNodes)
+        return ''.join(node[1] for node in bodyNodes)
+
+    #merge_html re-parses the page on every call, so text that ends one section and starts the next
+    #gets joined into a single string, and blank space gets squeezed down the way BeautifulSoup does it.
+    #The newest join hasn't been re-parsed yet, so we only settle a join once another section comes in.
+    def settle_join(self):
+        from bs4 import NavigableString
+        if self.openJoin is None or self.openJoin == 0 or self.openJoin >= len(self.bodyNodes):
+            return
+        before = self.bodyNodes[self.openJoin - 1]
+        after = self.bodyNodes[self.openJoin]
+        if before[0] is not None and after[0] is not None:
+            joinedText = before[0] + after[0]
+            if joinedText.strip(ASCII_SPACES) == '':
+                if '\n' in joinedText:
+                    joinedText = '\n'
+                else:
+                    joinedText = ' '
+            self.bodyNodes[self.openJoin - 1:self.openJoin + 1] = [(joinedText, NavigableString(joinedText).output_ready())]
+
+    #Adds the body of another HTML string to the end of the page.
+    def append_html(self, new_html):
+        self.append_nodes(get_body_nodes(new_html))
+
+    #Same thing for a section that was already broken up with get_body_nodes, so it can be reused without parsing it again.
+    def append_nodes(self, bodyNodes):
+        self.settle_join()
+        self.openJoin = len(self.bodyNodes)
+        self.bodyNodes.extend(bodyNodes)
+
+    #Serializes the whole page in one pass.
+    def to_html(self):
+        return '<html>' + self.head + '<body>' + self.join_nodes(self.bodyNodes) + '</body></html>'
+
+#The same page as BoxScoreDocument, but written to disk as it is built instead of kept in memory.
+#Only the last piece of text can still change when the next section comes in (see settle_join),
+#so everything before it gets written out and dropped on every append, and memory stays flat however many games there are.
+#It all goes to a temp file next to outputPath, and close() renames it into place, so nobody ever sees half a page.
+#rawBytes keeps count of how big the page would be without minifying, for the size report.
+class StreamingBoxScoreDocument(BoxScoreDocument):
+    def __init__(self, html_base, outputPath, minify=False):
+        BoxScoreDocument.__init__(self, html_base, minify)
+        self.outputPath = outputPath
+        fileHandle, self.tempPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(outputPath)), suffix='.tmp')
+        self.file = os.fdopen(fileHandle, 'w')
+        self.rawBytes = len(('<html>' + self.rawHead + '<body>').encode('utf-8'))
+        self.file.write('<html>' + self.head + '<body>')
+        self.flush_settled()
+
+    def write_nodes(self, bodyNodes):
+        text = ''.join(node[1] for node in bodyNodes)
+        self.rawBytes += len(text.encode('utf-8'))
+        if self.minify:
+            text = self.join_nodes(bodyNodes)
+        self.file.write(text)
+
+    #Writes out every node that can't change any more.
+    def flush_settled(self):
+        if self.openJoin is None:
+            settledCount = len(self.bodyNodes) - 1
+        else:
+            settledCount = self.openJoin - 1
+        if settledCount <= 0:
+            return
+        self.write_nodes(self.bodyNodes[:settledCount])
+        self.file.flush()
+        del self.bodyNodes[:settledCount]
+        if self.openJoin is not None:
+            self.openJoin -= settledCount
+
+    def append_nodes(self, bodyNodes):
+        BoxScoreDocument.append_nodes(self, bodyNodes)
+        self.flush_settled()
+
+    #Writes whatever is left and moves the finished page into place.
+    def close(self):
+        self.write_nodes(self.bodyNodes)
+        self.file.write('</body></html>')
+        self.rawBytes += len('</body></html>')
+        self.bodyNodes = []
+        self.file.close()
+        #mkstemp makes the file private, but the page should be readable like any file we'd write with open().
+        os.chmod(self.tempPath, 0o644)
+        os.replace(self.tempPath, self.outputPath)
+
+    #Throws the partial page away.
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.tempPath)
+        except OSError:
+            pass
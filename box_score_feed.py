@@ -0,0 +1,183 @@
+from array import array
+from box_score_linescore import notPlayed
+
+#boxscore_data, linescore and game_scoring_play_data all download the same live game feed, each with a different
+#list of fields. These are all three lists put together, so a single request has everything we need.
+feedFields = ("gamePk,link,gameData,game,pk,id,status,abstractGameState,detailedState,teams,away,home,name,teamCode,"
+              "fileCode,abbreviation,teamName,locationName,shortName,players,boxscoreName,fullName,liveData,boxscore,"
+              "teamStats,batting,atBats,runs,hits,doubles,triples,homeRuns,rbi,stolenBases,strikeOuts,baseOnBalls,"
+              "leftOnBase,pitching,inningsPitched,earnedRuns,allPositions,seasonStats,avg,ops,obp,slg,era,"
+              "pitchesThrown,numberOfPitches,strikes,battingOrder,info,title,fieldList,note,label,value,wins,losses,"
+              "holds,blownSaves,linescore,innings,num,errors,plays,allPlays,scoringPlays,atBatIndex,result,"
+              "description,awayScore,homeScore,about,halfInning,inning,endTime")
+
+#The request statsapi.get needs to download one game's feed.
+def get_feed_params(gameID):
+    return {'endpoint': 'game', 'params': {'gamePk': gameID, 'fields': feedFields}}
+
+#Builds the batting line for one player the same way statsapi.boxscore_data does.
+def build_feed_batter(boxData, side, batterID):
+    player = boxData[side]['players']['ID' + str(batterID)]
+    batting = player['stats']['batting']
+    seasonBatting = player['seasonStats']['batting']
+    battingOrder = str(player['battingOrder'])
+    if battingOrder[-1] == '0':
+        namefield = battingOrder[0]
+    else:
+        namefield = '   '
+    namefield += ' ' + batting.get('note', '')
+    namefield += boxData['playerInfo']['ID' + str(batterID)]['boxscoreName'] + '  ' + player['position']['abbreviation']
+    return {'namefield': namefield,
+            'ab': str(batting['atBats']),
+            'r': str(batting['runs']),
+            'h': str(batting['hits']),
+            'doubles': str(batting['doubles']),
+            'triples': str(batting['triples']),
+            'hr': str(batting['homeRuns']),
+            'rbi': str(batting['rbi']),
+            'sb': str(batting['stolenBases']),
+            'bb': str(batting['baseOnBalls']),
+            'k': str(batting['strikeOuts']),
+            'lob': str(batting['leftOnBase']),
+            'avg': str(seasonBatting['avg']),
+            'ops': str(seasonBatting['ops']),
+            'personId': batterID,
+            'battingOrder': battingOrder,
+            'substitution': battingOrder[-1] != '0',
+            'note': batting.get('note', ''),
+            'name': boxData['playerInfo']['ID' + str(batterID)]['boxscoreName'],
+            'position': player['position']['abbreviation'],
+            'obp': str(seasonBatting['obp']),
+            'slg': str(seasonBatting['slg'])}
+
+#Builds the pitching line for one player the same way statsapi.boxscore_data does.
+def build_feed_pitcher(boxData, side, pitcherID):
+    player = boxData[side]['players']['ID' + str(pitcherID)]
+    pitching = player['stats']['pitching']
+    namefield = boxData['playerInfo']['ID' + str(pitcherID)]['boxscoreName']
+    if pitching.get('note'):
+        namefield += '  ' + pitching.get('note', '')
+    return {'namefield': namefield,
+            'ip': str(pitching['inningsPitched']),
+            'h': str(pitching['hits']),
+            'r': str(pitching['runs']),
+            'er': str(pitching['earnedRuns']),
+            'bb': str(pitching['baseOnBalls']),
+            'k': str(pitching['strikeOuts']),
+            'hr': str(pitching['homeRuns']),
+            'p': str(pitching.get('pitchesThrown', pitching.get('numberOfPitches', 0))),
+            's': str(pitching['strikes']),
+            'era': str(player['seasonStats']['pitching']['era']),
+            'name': boxData['playerInfo']['ID' + str(pitcherID)]['boxscoreName'],
+            'personId': pitcherID,
+            'note': pitching.get('note', '')}
+
+#This turns a game feed into the same dict statsapi.boxscore_data returns, without another request.
+def boxscore_data_from_feed(feed):
+    boxData = {}
+    boxData['gameId'] = feed['gameData']['game']['id']
+    boxData['teamInfo'] = feed['gameData']['teams']
+    boxData['playerInfo'] = feed['gameData']['players']
+    boxData['away'] = feed['liveData']['boxscore']['teams']['away']
+    boxData['home'] = feed['liveData']['boxscore']['teams']['home']
+
+    for side in ['away', 'home']:
+        teamName = boxData['teamInfo'][side]['teamName']
+        batters = [{'namefield': teamName + ' Batters', 'ab': 'AB', 'r': 'R', 'h': 'H', 'doubles': '2B',
+                    'triples': '3B', 'hr': 'HR', 'rbi': 'RBI', 'sb': 'SB', 'bb': 'BB', 'k': 'K', 'lob': 'LOB',
+                    'avg': 'AVG', 'ops': 'OPS', 'personId': 0, 'substitution': False, 'note': '',
+                    'name': teamName + ' Batters', 'position': '', 'obp': 'OBP', 'slg': 'SLG', 'battingOrder': ''}]
+        for batterID in boxData[side]['batters']:
+            player = boxData[side]['players'].get('ID' + str(batterID), {})
+            #Players with no batting order or no batting line don't go in the box (statsapi skips them too).
+            if not player.get('battingOrder') or not len(player.get('stats', {}).get('batting', {})):
+                continue
+            batters.append(build_feed_batter(boxData, side, batterID))
+        boxData[side + 'Batters'] = batters
+
+        teamBatting = boxData[side]['teamStats']['batting']
+        boxData[side + 'BattingTotals'] = {'namefield': 'Totals',
+                                           'ab': str(teamBatting['atBats']),
+                                           'r': str(teamBatting['runs']),
+                                           'h': str(teamBatting['hits']),
+                                           'hr': str(teamBatting['homeRuns']),
+                                           'rbi': str(teamBatting['rbi']),
+                                           'bb': str(teamBatting['baseOnBalls']),
+                                           'k': str(teamBatting['strikeOuts']),
+                                           'lob': str(teamBatting['leftOnBase']),
+                                           'avg': '', 'ops': '', 'obp': '', 'slg': '',
+                                           'name': 'Totals', 'position': '', 'note': '',
+                                           'substitution': False, 'battingOrder': '', 'personId': 0}
+
+        battingNotes = {}
+        for note in boxData[side]['note']:
+            battingNotes[len(battingNotes)] = note['label'] + '-' + note['value']
+        boxData[side + 'BattingNotes'] = battingNotes
+
+        #statsapi labels the home pitchers' "name" with the away team, so we do the same to keep the dicts identical.
+        pitchers = [{'namefield': teamName + ' Pitchers', 'ip': 'IP', 'h': 'H', 'r': 'R', 'er': 'ER', 'bb': 'BB',
+                     'k': 'K', 'hr': 'HR', 'era': 'ERA', 'p': 'P', 's': 'S',
+                     'name': boxData['teamInfo']['away']['teamName'] + ' Pitchers', 'personId': 0, 'note': ''}]
+        for pitcherID in boxData[side]['pitchers']:
+            player = boxData[side]['players'].get('ID' + str(pitcherID))
+            if not player or not len(player.get('stats', {}).get('pitching', {})):
+                continue
+            pitchers.append(build_feed_pitcher(boxData, side, pitcherID))
+        boxData[side + 'Pitchers'] = pitchers
+
+        teamPitching = boxData[side]['teamStats']['pitching']
+        boxData[side + 'PitchingTotals'] = {'namefield': 'Totals',
+                                            'ip': str(teamPitching['inningsPitched']),
+                                            'h': str(teamPitching['hits']),
+                                            'r': str(teamPitching['runs']),
+                                            'er': str(teamPitching['earnedRuns']),
+                                            'bb': str(teamPitching['baseOnBalls']),
+                                            'k': str(teamPitching['strikeOuts']),
+                                            'hr': str(teamPitching['homeRuns']),
+                                            'p': '', 's': '', 'era': '',
+                                            'name': 'Totals', 'personId': 0, 'note': ''}
+
+    boxData['gameBoxInfo'] = feed['liveData']['boxscore'].get('info', [])
+    return boxData
+
+#This turns a game feed into the same dict statsapi.game_scoring_play_data returns.
+def scoring_play_data_from_feed(feed):
+    scoringData = {'home': feed['gameData']['teams']['home'],
+                   'away': feed['gameData']['teams']['away'],
+                   'plays': []}
+    scoringPlays = feed['liveData']['plays'].get('scoringPlays', [])
+    if not len(scoringPlays):
+        return scoringData
+
+    #Look plays up by at-bat index once, instead of searching all of them for every scoring play.
+    playsByIndex = {}
+    for play in feed['liveData']['plays']['allPlays']:
+        if play.get('atBatIndex') not in playsByIndex:
+            playsByIndex[play.get('atBatIndex')] = play
+    unorderedPlays = {}
+    for atBatIndex in scoringPlays:
+        play = playsByIndex.get(atBatIndex)
+        if play:
+            unorderedPlays[play['about']['endTime']] = play
+    for endTime in sorted(unorderedPlays):
+        scoringData['plays'].append(unorderedPlays[endTime])
+    return scoringData
+
+#The feed already has the runs for every half inning, so we can fill the line score arrays straight from it.
+#A half inning that wasn't played has no runs entry.
+def inning_runs_from_feed(feed):
+    innings = feed['liveData']['linescore'].get('innings', [])
+    awayRuns = array('h')
+    homeRuns = array('h')
+    for inning in innings:
+        awayRuns.append(inning.get('away', {}).get('runs', notPlayed))
+        homeRuns.append(inning.get('home', {}).get('runs', notPlayed))
+    return awayRuns, homeRuns
+
+#Everything the page needs for one game, built from its feed.
+def build_game_payload_from_feed(gameID, feed):
+    return {'gameID': gameID,
+            'status': feed['gameData'].get('status', {}).get('detailedState', ''),
+            'boxscore': boxscore_data_from_feed(feed),
+            'scoring': scoring_play_data_from_feed(feed),
+            'innings': inning_runs_from_feed(feed)}
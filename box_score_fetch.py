@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from box_score_feed import get_feed_params, build_game_payload_from_feed
+from box_score_metrics import span, count, game_context
+
+#These are the per-game statsapi calls the box score page needs, keyed by where they land in the payload.
+gameCalls = {'boxscore': 'boxscore_data',
+             'linescore': 'linescore',
+             'scoring': 'game_scoring_play_data'}
+
+#Makes a statsapi call by name. If we have a ResponseCache, the call goes through it.
+#ttl=None means the response never changes (a Final game), so the cache keeps it forever.
+#statsapi is imported here rather than at the top so that importing this module stays cheap.
+def call_statsapi(name, kwargs, cache=None, ttl=None):
+    import statsapi
+    count('apiCalls')
+    with span('api.' + name):
+        if cache is None:
+            return getattr(statsapi, name)(**kwargs)
+        return cache.call(name, kwargs, lambda: getattr(statsapi, name)(**kwargs), ttl)
+
+#Makes one of the per-game calls above for a single game.
+#Final games are cached forever, games that are still going only for the cache's short TTL.
+def call_game_api(key, gameID, cache=None, finalGameIDs=()):
+    ttl = None
+    if cache is not None and gameID not in finalGameIDs:
+        ttl = cache.shortTTL
+    with game_context(gameID):
+        return call_statsapi(gameCalls[key], {'gamePk': gameID}, cache, ttl)
+
+#Grabs everything for a single game, one call after another.
+def fetch_game_payload(gameID, cache=None, finalGameIDs=()):
+    payload = {'gameID': gameID}
+    for key in gameCalls:
+        payload[key] = call_game_api(key, gameID, cache, finalGameIDs)
+    return payload
+
+#Single-feed mode: one request for the game's live feed, and everything else gets built from it locally.
+#The payload has 'innings' (runs per half inning) in place of the unused 'linescore' text.
+def fetch_game_feed_payload(gameID, cache=None, finalGameIDs=()):
+    ttl = None
+    if cache is not None and gameID not in finalGameIDs:
+        ttl = cache.shortTTL
+    with game_context(gameID):
+        feed = call_statsapi('get', get_feed_params(gameID), cache, ttl)
+        with span('feed.build'):
+            return build_game_payload_from_feed(gameID, feed)
+
+#This fetches every game's payloads at the same time on a pool of worker threads.
+#Each API call is its own job, so with enough workers the whole slate takes about as long as the slowest call.
+#The payloads come back in the same order as gameIDs, so the page comes out in schedule order.
+def fetch_game_payloads(gameIDs, workers=8, cache=None, finalGameIDs=(), singleFeed=False):
+    if singleFeed:
+        if workers <= 1:
+            return [fetch_game_feed_payload(gameID, cache, finalGameIDs) for gameID in gameIDs]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda gameID: fetch_game_feed_payload(gameID, cache, finalGameIDs), gameIDs))
+
+    if workers <= 1:
+        return [fetch_game_payload(gameID, cache, finalGameIDs) for gameID in gameIDs]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futureList = []
+        for gameID in gameIDs:
+            gameFutures = {}
+            for key in gameCalls:
+                gameFutures[key] = executor.submit(call_game_api, key, gameID, cache, finalGameIDs)
+            futureList.append((gameID, gameFutures))
+
+        payloads = []
+        for gameID, gameFutures in futureList:
+            payload = {'gameID': gameID}
+            for key in gameFutures:
+                payload[key] = gameFutures[key].result()
+            payloads.append(payload)
+    return payloads
+
+#Deadline mode: the same fetches, one job per game, but we stop waiting at deadlineTime (a time.monotonic() value)
+#and give up on any one game gameTimeout seconds after it started. Returns (payloads, failures): the payloads
+#by game ID, and for each game that failed or ran out of time, why. The workers are daemon threads, so one
+#stuck on a hanging request is simply left behind (and replaced) and never holds up the page or the exit.
+def fetch_game_payloads_until(gameIDs, deadlineTime, gameTimeout=None, workers=8, cache=None, finalGameIDs=(), singleFeed=False):
+    fetchGame = fetch_game_payload
+    if singleFeed:
+        fetchGame = fetch_game_feed_payload
+    jobs = queue.Queue()
+    for gameID in gameIDs:
+        jobs.put(gameID)
+    finished = threading.Condition()
+    startTimes = {}
+    payloads = {}
+    failures = {}
+    stopped = []
+
+    def work():
+        while not stopped:
+            try:
+                gameID = jobs.get_nowait()
+            except queue.Empty:
+                return
+            with finished:
+                startTimes[gameID] = time.monotonic()
+            try:
+                payload = fetchGame(gameID, cache, finalGameIDs)
+                error = None
+            except Exception as fetchError:
+                payload = None
+                error = fetchError
+            with finished:
+                #Too late: it was already given up on.
+                if gameID in failures or stopped:
+                    return
+                if error is None:
+                    payloads[gameID] = payload
+                else:
+                    print("Game " + str(gameID) + " failed: " + repr(error))
+                    failures[gameID] = 'fetch failed (' + type(error).__name__ + ')'
+                finished.notify_all()
+
+    def start_worker():
+        threading.Thread(target=work, daemon=True).start()
+
+    for k in range(min(workers, len(gameIDs))):
+        start_worker()
+    with finished:
+        while len(payloads) + len(failures) < len(gameIDs):
+            now = time.monotonic()
+            if now >= deadlineTime:
+                stopped.append(True)
+                for gameID in gameIDs:
+                    if gameID not in payloads and gameID not in failures:
+                        failures[gameID] = 'missed the deadline'
+                break
+            waitUntil = deadlineTime
+            if gameTimeout is not None:
+                for gameID in list(startTimes):
+                    if gameID in payloads or gameID in failures:
+                        continue
+                    if now >= startTimes[gameID] + gameTimeout:
+                        failures[gameID] = 'timed out after ' + str(gameTimeout) + 's'
+                        #Its worker is stuck, so another one takes its place.
+                        start_worker()
+                    else:
+                        waitUntil = min(waitUntil, startTimes[gameID] + gameTimeout)
+            if len(payloads) + len(failures) < len(gameIDs):
+                finished.wait(waitUntil - now)
+    count('gamesFailed', len(failures))
+    return payloads, failures
@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor
+from box_score_cache import is_final_status
+from box_score_document import StreamingBoxScoreDocument
+from box_score_fetch import fetch_game_payloads
+from box_score_maker import FetchOptions, make_box_scores, get_response_cache, get_schedule_store, get_stat_store, get_completed_game_ids, \
+    get_next_day, build_standings_tables, write_schedule, render_page_header, render_game_models, build_section_html, finish_page_file
+from box_score_metrics import span, count
+from box_score_model import build_game_model
+
+#Minor-league mode: box scores for any of the sports the Stats API covers, not just MLB (sport 1).
+#MLB keeps its one page. Every other sport gets a page per league for the date, e.g.
+#box_scores-07-30-2024-international-league.html, with that league's standings and its games for the day after.
+#  - One schedule request per sport covers the date and the day after (see box_score_schedule.py), and the
+#    leagues and divisions come from the API (see box_score_divisions.py), so nothing here knows any league by name.
+#  - The standings tell us each team's league, and so which page each game goes on. A game between teams
+#    we can't place (an exhibition, or a sport whose divisions we couldn't get) goes on the sport's "other" page.
+#  - A full minor-league night is hundreds of games, so they're fetched a chunk at a time across the whole sport,
+#    the next chunk while this one is rendered, and written out as they come. Only two chunks of games are
+#    ever in memory, however big the night is.
+
+#What --sport takes, besides a sport ID.
+sportCodes = {'mlb': 1, 'aaa': 11, 'aa': 12, 'high-a': 13, 'single-a': 14, 'rookie': 16}
+sportNames = {1: 'MLB', 11: 'Triple-A', 12: 'Double-A', 13: 'High-A', 14: 'Single-A', 16: 'Rookie'}
+
+#"aaa" -> 11, "12" -> 12. Raises ValueError for anything else.
+def parse_sport(text):
+    if text.lower() in sportCodes:
+        return sportCodes[text.lower()]
+    return int(text)
+
+def get_sport_name(sportID):
+    return sportNames.get(sportID, 'Sport ' + str(sportID))
+
+#Where a league's page goes. slug is the league's (or 'other').
+def get_league_file_name(gameDate, slug):
+    return 'box_scores-' + gameDate.replace("/","-") + '-' + slug + '.html'
+
+#Which league a game belongs to: the home team's, or failing that the road team's. None if neither is in the standings.
+def get_game_league(item, teamLeagues):
+    return teamLeagues.get(item['home_id'], teamLeagues.get(item['away_id']))
+
+#Fetches, models and renders gameIDs chunkSize games at a time, in order, and yields (gameID, tables) for each.
+#The next chunk is fetched while this one is rendered. Finished games go in the stat store on the way.
+def generate_game_tables(gameDate, gameIDs, completedGameIDs, finalGameIDs, responseCache, options, chunkSize):
+    statStore = get_stat_store(options)
+    chunks = [gameIDs[start:start + chunkSize] for start in range(0, len(gameIDs), chunkSize)]
+    fetchChunk = lambda chunkIDs: fetch_game_payloads(chunkIDs, options.fetchWorkers, responseCache, finalGameIDs, options.singleFeed)
+    with ThreadPoolExecutor(max_workers=1) as fetcher:
+        nextFetch = fetcher.submit(fetchChunk, chunks[0]) if chunks else None
+        for chunkNumber in range(len(chunks)):
+            with span('fetch.games'):
+                gamePayloads = nextFetch.result()
+            nextFetch = None
+            if chunkNumber + 1 < len(chunks):
+                nextFetch = fetcher.submit(fetchChunk, chunks[chunkNumber + 1])
+            if statStore is not None:
+                with span('stats.save'):
+                    statStore.save_games(gameDate, [payload for payload in gamePayloads if payload['gameID'] in completedGameIDs])
+            gameModels = [build_game_model(payload) for payload in gamePayloads]
+            del gamePayloads
+            for gameModel, gameTables in zip(gameModels, render_game_models(gameModels, options)):
+                yield gameModel.gameID, gameTables
+            del gameModels
+
+#Writes one page of a sport: the header, then its games two at a time as their tables come out of gameTables.
+def write_league_page(outputFileName, headerHTML, pageGames, gameTables, options):
+    boxScoreDocument = StreamingBoxScoreDocument(headerHTML, outputFileName, options.minify)
+    try:
+        sectionTables = []
+        for item in pageGames:
+            gameID, tables = next(gameTables)
+            if gameID != item['game_id']:
+                raise RuntimeError("Game " + str(item['game_id']) + " came back out of order")
+            sectionTables.append(tables)
+            if len(sectionTables) == 2:
+                boxScoreDocument.append_html(build_section_html(sectionTables))
+                sectionTables = []
+        if sectionTables:
+            boxScoreDocument.append_html(build_section_html(sectionTables))
+    except BaseException:
+        boxScoreDocument.abort()
+        raise
+    with span('page.write'):
+        boxScoreDocument.close()
+    finish_page_file(boxScoreDocument, options)
+    print("Wrote " + outputFileName)
+    return outputFileName
+
+#Builds every league page of one (non-MLB) sport for gameDate. Returns the file names.
+def make_sport_box_scores(gameDate, sportID, timezone='eastern', options=None):
+    if options is None:
+        options = FetchOptions()
+    sportName = get_sport_name(sportID)
+    responseCache = get_response_cache(options)
+    scheduleStore = get_schedule_store(responseCache, options.cacheTTL, sportID)
+    games = scheduleStore.get_games(gameDate)
+    tomorrowsGames = scheduleStore.get_games(get_next_day(gameDate))
+    finalGameIDs = set(item['game_id'] for item in games if is_final_status(item['status']))
+    dateTTL = None if len(finalGameIDs) == len(games) else options.cacheTTL
+    print(sportName + ": " + str(len(games)) + " games")
+
+    #Without the divisions we can't ask for the standings (statsapi's default is the AL and NL), so every game goes on one page.
+    divisionModel = scheduleStore.get_division_model(gameDate)
+    standingsData = {}
+    if divisionModel is not None:
+        try:
+            standingsData = scheduleStore.get_standings(gameDate, dateTTL, divisionModel.get_league_ids())
+        except Exception as error:
+            print("Couldn't fetch the " + sportName + " standings: " + repr(error))
+    pageLeagues = []
+    teamLeagues = {}
+    if divisionModel is not None:
+        pageLeagues = [league for league in divisionModel.leagues if any(division.divisionID in standingsData for division in league.divisions)]
+        teamLeagues = divisionModel.get_team_leagues(standingsData)
+
+    #Every league gets a page, even on a day it has no games; the games nobody claims get one if there are any.
+    leagueGames = {league.leagueID: [] for league in pageLeagues}
+    leagueTomorrow = {league.leagueID: [] for league in pageLeagues}
+    otherGames = []
+    otherTomorrow = []
+    for item in games:
+        leagueGames.get(get_game_league(item, teamLeagues), otherGames).append(item)
+    for item in tomorrowsGames:
+        leagueTomorrow.get(get_game_league(item, teamLeagues), otherTomorrow).append(item)
+    pages = []
+    for league in pageLeagues:
+        leagueStandings = {division.divisionID: standingsData[division.divisionID] for division in league.divisions if division.divisionID in standingsData}
+        with span('render.standings'):
+            standingsTables = build_standings_tables(leagueStandings, divisionModel)
+        pages.append((league.get_slug(), league.name, standingsTables, leagueGames[league.leagueID], leagueTomorrow[league.leagueID]))
+    if otherGames or not pages:
+        pages.append(('other', sportName, [], otherGames, otherTomorrow))
+
+    #The games in page order, so one pass of chunks feeds every page in turn.
+    gameIDs = [item['game_id'] for page in pages for item in page[3]]
+    count('sportGames', len(gameIDs))
+    chunkSize = max(2, options.fetchWorkers * 4)
+    gameTables = generate_game_tables(gameDate, gameIDs, get_completed_game_ids(games), finalGameIDs, responseCache, options, chunkSize)
+    outputFiles = []
+    try:
+        for slug, title, standingsTables, pageGames, pageTomorrow in pages:
+            with span('render.schedule'):
+                scheduleTable = write_schedule(pageTomorrow,timezone)
+            headerHTML = render_page_header(gameDate, standingsTables, scheduleTable, title)
+            outputFiles.append(write_league_page(get_league_file_name(gameDate, slug), headerHTML, pageGames, gameTables, options))
+    finally:
+        gameTables.close()
+    return outputFiles
+
+#The whole run for --sport: MLB's page if sport 1 is in sportIDs, and every other sport's league pages. Returns the file names.
+def make_league_box_scores(gameDate, sportIDs, timezone='eastern', options=None):
+    if options is None:
+        options = FetchOptions()
+    outputFiles = []
+    for sportID in sportIDs:
+        if sportID == 1:
+            outputFiles.append(make_box_scores(gameDate, timezone, None, options))
+        else:
+            outputFiles += make_sport_box_scores(gameDate, sportID, timezone, options)
+    return outputFiles
@@ -0,0 +1,91 @@
+from array import array
+
+#This builds the line score: one array of runs per team, one slot per inning.
+#A half inning that wasn't played is stored as notPlayed, and shows up as an 'x' in the table.
+notPlayed = -1
+
+#Turns innings pitched ('8.2') into the number of half innings the other team got to bat in (9).
+def count_innings_batted(inningsPitched):
+    wholeInnings, _, outs = str(inningsPitched).partition('.')
+    if not wholeInnings.isdigit():
+        return 0
+    if outs.strip('0') != '':
+        return int(wholeInnings) + 1
+    return int(wholeInnings)
+
+#The home pitchers' innings are the road team's turns at bat, and the road pitchers' are the home team's.
+#A walk-off with nobody out doesn't show up in innings pitched, but it's always a scoring play, so we check those too.
+def get_innings_batted(data, plays):
+    topInnings = count_innings_batted(data['homePitchingTotals']['ip'])
+    bottomInnings = count_innings_batted(data['awayPitchingTotals']['ip'])
+    for play in plays:
+        if play['about']['halfInning'] == 'top':
+            topInnings = max(topInnings, play['about']['inning'])
+        else:
+            bottomInnings = max(bottomInnings, play['about']['inning'])
+    return topInnings, bottomInnings
+
+#One pass over the scoring plays: keep the highest score each team had in each inning,
+#then the runs for an inning are the difference from the inning before.
+#Rain-shortened games keep however many innings were played, extra innings just make the arrays longer,
+#and any half inning past what the team batted is marked notPlayed.
+def build_inning_runs(plays, topInnings=9, bottomInnings=9):
+    innings = max(topInnings, bottomInnings)
+    for play in plays:
+        innings = max(innings, play['about']['inning'])
+    awayRuns = array('h', bytes(2 * (innings + 1)))
+    homeRuns = array('h', bytes(2 * (innings + 1)))
+    for play in plays:
+        inning = play['about']['inning']
+        if play['result']['awayScore'] > awayRuns[inning]:
+            awayRuns[inning] = play['result']['awayScore']
+        if play['result']['homeScore'] > homeRuns[inning]:
+            homeRuns[inning] = play['result']['homeScore']
+
+    #Right now each slot holds the score at the end of that inning (or 0), so turn them into runs per inning.
+    awayScore = 0
+    homeScore = 0
+    for inning in range(1, innings + 1):
+        awayEnd = max(awayScore, awayRuns[inning])
+        homeEnd = max(homeScore, homeRuns[inning])
+        awayRuns[inning] = awayEnd - awayScore
+        homeRuns[inning] = homeEnd - homeScore
+        awayScore = awayEnd
+        homeScore = homeEnd
+        if inning > topInnings:
+            awayRuns[inning] = notPlayed
+        if inning > bottomInnings:
+            homeRuns[inning] = notPlayed
+    return awayRuns[1:], homeRuns[1:]
+
+#The runs per inning for one fetched game. In single-feed mode the payload already has them.
+def get_game_inning_runs(payload):
+    if 'innings' in payload:
+        return payload['innings']
+    gamePlays = payload['scoring']['plays']
+    topInnings, bottomInnings = get_innings_batted(payload['boxscore'], gamePlays)
+    return build_inning_runs(gamePlays, topInnings, bottomInnings)
+
+#The batch version, for backfills. Each game is (plays, topInnings, bottomInnings).
+def build_inning_runs_batch(games):
+    inningRuns = []
+    for plays, topInnings, bottomInnings in games:
+        inningRuns.append(build_inning_runs(plays, topInnings, bottomInnings))
+    return inningRuns
+
+#Makes the list-of-lists table that add_totals_to_linescore and tabulate expect.
+def make_linescore_table(awayRuns, homeRuns, road_team, home_team):
+    linescoreList = [""]
+    roadList = [road_team]
+    homeList = [home_team]
+    for inning in range(len(awayRuns)):
+        linescoreList.append(inning + 1)
+        if awayRuns[inning] == notPlayed:
+            roadList.append('x')
+        else:
+            roadList.append(awayRuns[inning])
+        if homeRuns[inning] == notPlayed:
+            homeList.append('x')
+        else:
+            homeList.append(homeRuns[inning])
+    return [linescoreList, roadList, homeList]
@@ -0,0 +1,148 @@
+import sched
+import time
+from box_score_cache import is_final_status, is_over_status
+from box_score_document import StreamingBoxScoreDocument, get_body_nodes
+from box_score_fetch import fetch_game_payloads
+from box_score_maker import FetchOptions, get_response_cache, get_stat_store, get_completed_game_ids, get_schedule_store, \
+    get_next_day, build_page_header, render_game_tables, build_section_html, finish_page_file
+from box_score_schedule import get_game_signature
+
+#Live mode: keeps the page for a date up to date while the games are being played.
+#Every cycle makes one schedule request, for the date and the day after, through the schedule store.
+#If none of the date's games changed, that's the whole cycle. Otherwise a game is only fetched and re-rendered
+#when its status, inning or score changed since the last cycle, and once a game is Final we stop asking about it.
+#The page is then spliced back together from the sections we already have.
+
+class LiveBoxScorePage:
+    def __init__(self, gameDate, timezone='eastern', team_filter=None, options=None):
+        if options is None:
+            options = FetchOptions()
+        self.gameDate = gameDate
+        self.timezone = timezone
+        self.team_filter = team_filter
+        self.options = options
+        self.outputPath = 'box_scores-' + gameDate.replace("/","-") + '.html'
+        #The games on the page, in schedule order. Games i and i+1 (i even) share a section.
+        self.gameIDs = []
+        self.signatures = {}
+        self.gameTables = {}
+        self.finalGameIDs = set()
+        #Each section's body, already parsed, keyed by the index of its first game.
+        self.sectionNodes = {}
+        self.headerHTML = None
+        self.cycleCount = 0
+        #Whether the last cycle got all the way through, so a quiet schedule means the page is current.
+        self.upToDate = False
+
+    #Once every game is over (Final, or postponed or cancelled) there's nothing left to watch.
+    def is_finished(self):
+        return self.cycleCount > 0 and len(self.finalGameIDs) == len(self.gameIDs)
+
+    #One polling cycle: check the schedule, refetch and re-render what changed, and rewrite the page.
+    def refresh(self):
+        responseCache = get_response_cache(self.options)
+        scheduleStore = get_schedule_store(responseCache, self.options.cacheTTL)
+        #The schedule is how we find out what changed, so it never comes out of the cache.
+        changedDates = scheduleStore.load_range(self.gameDate, get_next_day(self.gameDate), False)
+        requestCount = 1
+        if self.upToDate and self.gameDate not in changedDates:
+            self.cycleCount += 1
+            print("Cycle " + str(self.cycleCount) + ": nothing changed, 1 request")
+            return
+        self.upToDate = False
+        yesterdaysGames = scheduleStore.get_games(self.gameDate)
+        if self.cycleCount == 0:
+            self.gameIDs = [item['game_id'] for item in scheduleStore.get_games(self.gameDate, self.team_filter)]
+
+        changedSignatures = {}
+        newFinalIDs = set()
+        for item in yesterdaysGames:
+            gameID = item['game_id']
+            if gameID not in self.gameIDs or gameID in self.finalGameIDs:
+                continue
+            signature = get_game_signature(item)
+            if signature != self.signatures.get(gameID):
+                changedSignatures[gameID] = signature
+                if is_over_status(item['status']):
+                    newFinalIDs.add(gameID)
+
+        #Finished games go through the cache for good. Games still going skip it, since it would hand back old data.
+        #A copy some earlier run cached while a game was still going is a miss once it's Final (see ResponseCache.load).
+        changedIDs = [gameID for gameID in self.gameIDs if gameID in changedSignatures]
+        if len(changedIDs):
+            print("Fetching " + str(len(changedIDs)) + " changed games")
+            finalIDs = [gameID for gameID in changedIDs if gameID in newFinalIDs]
+            liveIDs = [gameID for gameID in changedIDs if gameID not in newFinalIDs]
+            #Postponed and cancelled games are done for the day, but only truly final ones are cached for good.
+            cachedIDs = set(item['game_id'] for item in yesterdaysGames if item['game_id'] in newFinalIDs and is_final_status(item['status']))
+            gamePayloads = fetch_game_payloads(finalIDs, self.options.fetchWorkers, responseCache, cachedIDs, self.options.singleFeed)
+            gamePayloads += fetch_game_payloads(liveIDs, self.options.fetchWorkers, None, (), self.options.singleFeed)
+            if self.options.singleFeed:
+                requestCount += len(changedIDs)
+            else:
+                requestCount += 3 * len(changedIDs)
+            for payload in gamePayloads:
+                self.gameTables[payload['gameID']] = render_game_tables(payload)
+            #A game goes in the stat store once, when it finishes.
+            statStore = get_stat_store(self.options)
+            if statStore is not None:
+                completedGameIDs = get_completed_game_ids(yesterdaysGames) & newFinalIDs
+                statStore.save_games(self.gameDate, [payload for payload in gamePayloads if payload['gameID'] in completedGameIDs])
+
+        #Only the sections with a changed game get built again.
+        for j in range(0,len(self.gameIDs),2):
+            sectionIDs = self.gameIDs[j:j + 2]
+            if j not in self.sectionNodes or any(gameID in changedSignatures for gameID in sectionIDs):
+                sectionTables = [self.gameTables[gameID] for gameID in sectionIDs]
+                self.sectionNodes[j] = get_body_nodes(build_section_html(sectionTables))
+
+        #Standings only move when a game ends, so that's the only time we rebuild them.
+        #The day after's schedule came with this cycle's request, so only the standings cost a request.
+        self.finalGameIDs |= newFinalIDs
+        if self.headerHTML is None or len(newFinalIDs):
+            dateTTL = self.options.cacheTTL
+            if len(self.finalGameIDs) == len(self.gameIDs):
+                dateTTL = None
+            self.headerHTML = build_page_header(self.gameDate, self.timezone, responseCache, self.options.cacheTTL, dateTTL)
+            requestCount += 1
+
+        self.signatures.update(changedSignatures)
+        self.write_page()
+        self.upToDate = True
+        self.cycleCount += 1
+        print("Cycle " + str(self.cycleCount) + ": " + str(len(changedIDs)) + " games changed, " + str(len(self.gameIDs) - len(self.finalGameIDs)) +
+              " still going, about " + str(requestCount) + " requests")
+
+    def write_page(self):
+        boxScoreDocument = StreamingBoxScoreDocument(self.headerHTML, self.outputPath, self.options.minify)
+        try:
+            for j in range(0,len(self.gameIDs),2):
+                boxScoreDocument.append_nodes(self.sectionNodes[j])
+        except BaseException:
+            boxScoreDocument.abort()
+            raise
+        boxScoreDocument.close()
+        finish_page_file(boxScoreDocument, self.options)
+
+#Polls every interval seconds until every game is Final (or maxCycles runs out) and returns the file name.
+#A cycle that fails, say because the API hiccups, is reported and tried again next time instead of ending the watch.
+def watch_box_scores(gameDate, timezone='eastern', team_filter=None, options=None, interval=60, maxCycles=None):
+    livePage = LiveBoxScorePage(gameDate, timezone, team_filter, options)
+    scheduler = sched.scheduler(time.time, time.sleep)
+
+    def run_cycle():
+        startTime = time.time()
+        try:
+            livePage.refresh()
+        except Exception as error:
+            print("Refresh failed, trying again next cycle: " + repr(error))
+        if livePage.is_finished():
+            print("Every game is Final, done watching")
+            return
+        if maxCycles is not None and livePage.cycleCount >= maxCycles:
+            return
+        scheduler.enterabs(startTime + interval, 1, run_cycle)
+
+    scheduler.enter(0, 1, run_cycle)
+    scheduler.run()
+    return livePage.outputPath
@@ -1,19 +1,70 @@
-import json
-from tabulate import tabulate
-from bs4 import BeautifulSoup
-import statsapi
+import argparse
 import copy
+import os
 import re
-import pytz
+import threading
+import time
 from datetime import datetime, timedelta
-
-#input today's date here.'
-gameDate = '07/30/2024'
-myTimeZone = 'eastern'
-metsMode = 0
-
-#grab the standings data from the API.
-standingsData = statsapi.standings_data(date=gameDate)
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from box_score_document import BoxScoreDocument, StreamingBoxScoreDocument, get_body_nodes, precompress_file, describe_page_sizes
+from box_score_fetch import fetch_game_payloads, fetch_game_payloads_until
+from box_score_cache import ResponseCache, is_final_status
+from box_score_tables import render_html_table
+from box_score_linescore import make_linescore_table
+from box_score_metrics import span, count, run_with_metrics
+from box_score_notes import get_batting_notes_text, get_fields_text
+from box_score_transport import install_transport
+from box_score_manifest import GameManifest, get_payload_hash
+from box_score_model import DateModel, build_game_model, save_date_model, load_date_model
+from box_score_stats import StatStore
+from box_score_schedule import ScheduleStore, get_dates_between
+from box_score_divisions import build_division_model_from_standings
+
+#tabulate, BeautifulSoup, pytz and statsapi are slow to import, so each is imported inside the functions that use it.
+#Importing this module doesn't touch the network or run anything; build_box_score_page() is the way in,
+#and the command line at the bottom of the file is a thin wrapper around it.
+
+#These control how we talk to the API. The defaults here don't cache anything; the command line turns the cache on.
+class FetchOptions:
+    def __init__(self, fetchWorkers=8, cacheDir=None, cacheTTL=300, cacheMaxMB=500, offline=False, singleFeed=False, statsPath=None, modelDir=None, fromModels=False,
+                 httpTimeout=30, httpRetries=3, rateLimit=None, incremental=False, renderWorkers=0, deadline=None, gameTimeout=None,
+                 minify=False, precompress=False):
+        #How many API calls we make at the same time when fetching the games.
+        self.fetchWorkers = fetchWorkers
+        #API responses get cached here so reruns of the same date don't re-download everything. None turns the cache off.
+        self.cacheDir = cacheDir
+        #Anything that isn't Final yet is only cached for this many seconds.
+        self.cacheTTL = cacheTTL
+        self.cacheMaxMB = cacheMaxMB
+        #Replay a date entirely from the cache, without touching the network.
+        self.offline = offline
+        #Download one live feed per game instead of three separate calls, and build everything from it.
+        self.singleFeed = singleFeed
+        #Every finished game's player lines, line score and totals also get saved to this SQLite file (see box_score_stats.py).
+        self.statsPath = statsPath
+        #Each date's game models get saved here (see box_score_model.py). With fromModels on, pages are
+        #rendered from the models already saved here instead, without any API calls.
+        self.modelDir = modelDir
+        self.fromModels = fromModels
+        #The transport (see box_score_transport.py): seconds before a request times out, how many times a failed
+        #request is retried, and the most requests per second we make (None for no limit).
+        self.httpTimeout = httpTimeout
+        self.httpRetries = httpRetries
+        self.rateLimit = rateLimit
+        #Keep a manifest next to each page and only fetch and render the games that changed since the last run
+        #(see box_score_manifest.py).
+        self.incremental = incremental
+        #Processes to render the games on. 0 or 1 renders them in this process.
+        self.renderWorkers = renderWorkers
+        #Seconds the page has, from when it starts, and seconds any one game gets to be fetched or rendered.
+        #With a deadline the page always goes out on time: a game that fails or runs out of time gets a
+        #placeholder with its score from the schedule (see render_placeholder_tables). None means no limit.
+        self.deadline = deadline
+        self.gameTimeout = gameTimeout
+        #Output for a static host: minified pages (see box_score_document.py), and .gz and .br copies
+        #written next to each page so the host can serve them without compressing on the fly.
+        self.minify = minify
+        self.precompress = precompress
 
 def get_next_day(date_str):
     # Parse the input date string to a datetime object
@@ -27,15 +78,25 @@ def get_next_day(date_str):
 
     return next_day_str
 
+#Our timezone names and the pytz zones they stand for. Anything else is treated as eastern.
+timezoneNames = {'eastern': 'US/Eastern',
+                 'central': 'US/Central',
+                 'mountain': 'US/Mountain',
+                 'pacific': 'US/Pacific'}
+
+#pytz zones are built once and reused, since every schedule row needs one.
+timezoneCache = {}
+
+def get_timezone(timezone):
+    if timezone not in timezoneCache:
+        import pytz
+        timezoneCache[timezone] = pytz.timezone(timezoneNames.get(timezone, 'US/Eastern'))
+    return timezoneCache[timezone]
+
 def convert_dt_to_timezone(myDT,timezone):
+    import pytz
     zulu_time = datetime.strptime(myDT, "%Y-%m-%dT%H:%M:%SZ")
-    myTZ = pytz.timezone('US/Eastern')
-    if timezone == 'central':
-        myTZ = pytz.timezone('US/Central')
-    elif timezone == 'pacific':
-        myTZ = pytz.timezone('US/Pacific')
-    elif timezone == 'mountain':
-        myTZ = pytz.timezone('US/Mountain')
+    myTZ = get_timezone(timezone)
     zulu_time_utc = pytz.utc.localize(zulu_time)
     timeString = zulu_time_utc.astimezone(myTZ).strftime("%I:%M %p")
     if str(timeString[0]) == '0':
@@ -43,13 +104,14 @@ def convert_dt_to_timezone(myDT,timezone):
     else:
         return str(timeString)
 
-def write_schedule(mySchedule):
+def write_schedule(mySchedule,timezone='eastern'):
+    from tabulate import tabulate
     myScheduleTable = []
     myGameList = ["Time", "Game", "Venue", "Road Probable Pitcher", "Home Probable Pitcher"]
     myScheduleTable.append(myGameList)
     for item in mySchedule:
         myGameList = []
-        myGameList.append(convert_dt_to_timezone(item['game_datetime'],myTimeZone))
+        myGameList.append(convert_dt_to_timezone(item['game_datetime'],timezone))
         myGameList.append(item['away_name'] + ' at ' + item['home_name'])
         myGameList.append(item['venue_name'])
         if item['away_probable_pitcher'] == '':
@@ -63,43 +125,6 @@ def write_schedule(mySchedule):
         myScheduleTable.append(myGameList)
     return tabulate(myScheduleTable, tablefmt='html', headers="firstrow")
 
-#This function combines two HTML files. We'll use this to build out the list of boxscores.'
-def merge_html(html_base, new_html):
-    # Parse both input HTML strings
-    soup1 = BeautifulSoup(html_base, 'html.parser')
-    soup2 = BeautifulSoup(new_html, 'html.parser')
-
-    # Create a new BeautifulSoup object with a basic HTML structure
-    new_soup = BeautifulSoup('<html><head></head><body></body></html>', 'html.parser')
-
-    # Handle the <head> section, using the <head> from soup1
-    if soup1.head:
-        new_soup.head.replace_with(soup1.head)
-
-    # Extract <body> contents from both soups
-    body1 = soup1.body
-    body2 = soup2.body
-
-    # Merge the body contents
-    if body1:
-        new_soup.body.extend(body1.contents)
-    if body2:
-        new_soup.body.extend(body2.contents)
-
-    # Return the string representation of the merged HTML
-    return str(new_soup)
-
-#This dictionary links IDs from the standings API to actual division names.
-divisionDict = {200: "AL West",
-                201: "AL East",
-                202: "AL Central",
-                203: "NL West",
-                204: "NL East",
-                205: "NL Central"}
-
-#We'll store the standings here.'
-standingsDict = {}
-
 #This function takes the input from the standings, by division, and makes it into a list-of-lists.
 def build_standings_group(a):
     standingsLOL = []
@@ -109,7 +134,11 @@ def build_standings_group(a):
         standingsRow.append(item['w'])
         standingsRow.append(item['l'])
         #We're calculating winning percentage, leaving off the leading 0. and rounding to 3 digits.
-        standingsRow.append(str(f"{item['w'] / (item['w'] + item['l']):.3f}")[1:])
+        #Before opening day (which comes at different times in the minors) nobody has played yet.
+        if item['w'] + item['l'] == 0:
+            standingsRow.append(".000")
+        else:
+            standingsRow.append(str(f"{item['w'] / (item['w'] + item['l']):.3f}")[1:])
         standingsRow.append(item['gb'])
         #Key part here is for later exclusion from the wild card grouping.
         #First place teams are excluded from the wild card grouping.
@@ -120,20 +149,14 @@ def build_standings_group(a):
         standingsLOL.append(standingsRow)
     return standingsLOL
 
-#This takes the three divisions as inputs and adds everything to a new "wild card" group.
+#This takes a league's divisions as inputs and adds everything to a new "wild card" group.
 #But... if we see that "xxxx" we know NOT to include it in the wild card set.
-def build_wild_card_group(a,b,c):
+def build_wild_card_group(*divisions):
     standingsLOL = []
-    for item in a:
-        #if item[5] != '-':
-        if item[5] != "xxxx":
-            standingsLOL.append(item)
-    for item in b:
-        if item[5] != "xxxx":
-            standingsLOL.append(item)
-    for item in c:
-        if item[5] != "xxxx":
-            standingsLOL.append(item)
+    for division in divisions:
+        for item in division:
+            if item[5] != "xxxx":
+                standingsLOL.append(item)
     return standingsLOL
 
 #This is a simple procedure to write the HTML table, but it adds a "special row" class to the headers.
@@ -141,7 +164,7 @@ def build_wild_card_group(a,b,c):
 def generate_HTML_standings_table(a):
     html = '<table>\n'
     for i in a:
-        if (i[0][0:2] == "AL") or (i[0][0:2] == "NL"):
+        if i[1:] == standingsColumns:
                 html += '<tr class="special-row">\n'
         else:
             html += '<tr>'
@@ -178,371 +201,217 @@ def remove_extra_gb(a,b):
     newItem.pop(b)
     return newItem
 
-#We're leaning on the divisionCodes to loop through in building a standings table.'
-def build_standings_html_table(myStandings,x):
+#We're leaning on the league's divisions, in table order, to loop through in building its standings table.
+#The wild card goes last, and only if the league has one (most of the minors don't).
+def build_standings_html_table(standingsData,league):
     standingsLOL = []
-    divisionCodes = [201,202,200]
-    if x == "NL":
-        for division in divisionCodes:
-            standingsHeader = build_standings_headers(myStandings,divisionDict[division + 3])
-            standingsLOL.append(standingsHeader)
-            for item in myStandings[division + 3]:
-                standingsLOL.append(remove_extra_gb(item,5))
-        standingsHeader = build_standings_headers(myStandings,"NL Wild Card")
-        standingsLOL.append(standingsHeader)
-        for item in myStandings['nlwc']:
-            standingsLOL.append(remove_extra_gb(item,4))
-    else:
-        for division in divisionCodes:
-            standingsHeader = build_standings_headers(myStandings,divisionDict[division])
-            standingsLOL.append(standingsHeader)
-            for item in myStandings[division]:
-                standingsLOL.append(remove_extra_gb(item,5))
-        standingsHeader = build_standings_headers(myStandings,"NL Wild Card")
-        standingsLOL.append(standingsHeader)
-        for item in myStandings['alwc']:
+    divisionGroups = {}
+    for division in league.divisions:
+        if division.divisionID not in standingsData:
+            continue
+        divisionGroups[division.divisionID] = build_standings_group(standingsData[division.divisionID]['teams'])
+        standingsLOL.append(build_standings_headers(standingsLOL,division.shortName))
+        for item in divisionGroups[division.divisionID]:
+            standingsLOL.append(remove_extra_gb(item,5))
+    if has_wild_card(standingsData,divisionGroups):
+        #Ties keep division ID order, like they always have.
+        wildCardStandings = build_wild_card_group(*[divisionGroups[divisionID] for divisionID in sorted(divisionGroups)])
+        wildCardStandings = sort_list_of_lists(wildCardStandings,3)
+        standingsLOL.append(build_standings_headers(standingsLOL,league.abbreviation + " Wild Card"))
+        for item in wildCardStandings:
             standingsLOL.append(remove_extra_gb(item,4))
     return standingsLOL
 
+#A league has a wild card race if the standings rank anybody in it.
+def has_wild_card(standingsData,divisionIDs):
+    for divisionID in divisionIDs:
+        for item in standingsData[divisionID]['teams']:
+            if item['wc_rank'] not in ('-', None, ''):
+                return True
+    return False
+
+#The columns after the group name, in every standings group.
+standingsColumns = ['W', 'L', 'WP', 'GB']
+
 #This builds the headers for each standings group.
 def build_standings_headers(a,b):
     a = []
     a.append(b)
-    a.append('W')
-    a.append('L')
-    a.append('WP')
-    a.append('GB')
+    a.extend(standingsColumns)
     return a
 
-#We use this class for building out the line score.
-#Each inning gets a "start" and "stop" score. The difference between those two goes into the line score.
-class Inning:
-    def __init__(self):
-        self.inningNumber = 0
-        self.topRunsStart = 0
-        self.topRunsEnd = 0
-        self.bottomRunsStart = 0
-        self.bottomRunsEnd = 0
-
-#Figure out if the game went to extra innings.
-#Note that as of now we assume ALL games go at least 9, even rain-shortened games.
-def get_max_inning(a):
-    maxInning = 9
-    for item in a:
-        if item['about']['inning'] > maxInning:
-            maxInning = item['about']['inning']
-    return maxInning
-
-#Go through each inning and build the line score.
-def log_runs(a,b):
-    for item in a:
-        checkInning = item['about']['inning']
-        if item['result']['awayScore'] > b[checkInning].topRunsEnd:
-            b[checkInning].topRunsEnd = item['result']['awayScore']
-        if item['result']['homeScore'] > b[checkInning].bottomRunsEnd:
-            b[checkInning].bottomRunsEnd = item['result']['homeScore']
-    return b
-
-#This catches anything that our iterative processe misses.
-def clean_table(a):
-    keyList = []
-    for key in a:
-        keyList.append(key)
-    for i in range(1,len(keyList)):
-        if a[i].topRunsStart > a[i].topRunsEnd:
-            a[i].topRunsEnd = a[i].topRunsStart
-        if a[i].bottomRunsStart > a[i].bottomRunsEnd:
-            a[i].bottomRunsEnd = a[i].bottomRunsStart
-        if a[i].topRunsEnd > a[i + 1].topRunsStart:
-            a[i + 1].topRunsStart = a[i].topRunsEnd
-        if a[i].bottomRunsEnd > a[i + 1].bottomRunsStart:
-            a[i + 1].bottomRunsStart = a[i].bottomRunsEnd
-        finalInning = i + 1
-    if a[finalInning].topRunsStart > a[finalInning].topRunsEnd:
-        a[finalInning].topRunsEnd = a[finalInning].topRunsStart
-    if a[finalInning].bottomRunsStart > a[finalInning].bottomRunsEnd:
-        a[finalInning].bottomRunsEnd = a[finalInning].bottomRunsStart
-    if a[9].topRunsEnd < a[9].bottomRunsStart:
-        a[9].bottomRunsStart = 'x'
-        a[9].bottomRunsEnd = 'x'
-    return a
-
-#Actually builds the inning totals.
-def make_linescore(a,road_team,home_team):
-    linescoreLOL = []
-    linescoreList = [""]
-    roadList = [road_team]
-    homeList = [home_team]
-    for key in a:
-        linescoreList.append(a[key].inningNumber)
-        roadList.append(a[key].topRunsEnd - a[key].topRunsStart)
-        if key != 9:
-            homeList.append(a[key].bottomRunsEnd - a[key].bottomRunsStart)
-        else:
-            if a[key].bottomRunsStart == 'x':
-                homeList.append('x')
-            else:
-                homeList.append(a[key].bottomRunsEnd - a[key].bottomRunsStart)
-
-    linescoreLOL.append(linescoreList)
-    linescoreLOL.append(roadList)
-    linescoreLOL.append(homeList)
-    return linescoreLOL
-
 #We need actual totals added.
-def add_totals_to_linescore(linescore,a):
+#The R, H and E columns, from the game model.
+def add_totals_to_linescore(linescore,game):
     linescore[0].append("R")
-    linescore[1].append(a['away']['teamStats']['batting']['runs'])
-    linescore[2].append(a['home']['teamStats']['batting']['runs'])
+    linescore[1].append(game.away.runs)
+    linescore[2].append(game.home.runs)
     linescore[0].append("H")
-    linescore[1].append(a['away']['teamStats']['batting']['hits'])
-    linescore[2].append(a['home']['teamStats']['batting']['hits'])
+    linescore[1].append(game.away.hits)
+    linescore[2].append(game.home.hits)
     linescore[0].append("E")
-    linescore[1].append(figure_out_team_errors(a['away']['info']))
-    linescore[2].append(figure_out_team_errors(a['home']['info']))
+    linescore[1].append(game.away.errors)
+    linescore[2].append(game.home.errors)
     return linescore
 
-#Need to correct the 9th inning values to make sure they're right-adjusted.
-def fix_linescore_html(myLinescoreTable):
-    soup = BeautifulSoup(myLinescoreTable, 'html.parser')
-    for td in soup.find_all('td'):
-        if td.get_text(strip=True).isnumeric() or td.get_text(strip=True) == 'x':
-            td['style'] = "text-align: right;"
-    for th in soup.find_all('th'):
-        if th.get_text(strip=True).isnumeric() or th.get_text(strip=True) == 'x':
-            th['style'] = "text-align: right;"
-    return str(soup)
-
-def extract_and_clean_parentheses_text(input_string):
-    # Find all text within parentheses
-    input_string = error_cleanup(input_string)
-    pattern = r'\(([^)]*)\)'
-    matches = re.findall(pattern, input_string)
-
-    cleaned_matches = []
-    for match in matches:
-        # Split the text at the first comma and take the second part (if exists)
-        parts = match.split(',', 1)
-        if len(parts) > 1:
-            cleaned_matches.append(parts[1].strip())
-        else:
-            cleaned_matches.append(parts[0].strip())
-
-    # Join the cleaned matches into a single string
-    result = ' '.join(cleaned_matches)
-    return result
-
-def error_cleanup(a):
-    a = a.replace("catcher interference","CI")
-    return a
-
-def figure_out_team_errors(a):
-    hasErrors = 0
-    i = 0
-    for item in a:
-        if item['title'] == 'FIELDING':
-            for item2 in item['fieldList']:
-                if item2['label'] == 'E':
-                    errorData = item2['value']
-                    hasErrors = 1
-    if hasErrors == 0:
-        return(0)
-    else:
-        return(len(extract_and_clean_parentheses_text(errorData).split(" ")))
-
-def merge_html(html_base, new_html):
-    # Parse both input HTML strings
-    soup1 = BeautifulSoup(html_base, 'html.parser')
-    soup2 = BeautifulSoup(new_html, 'html.parser')
-
-    # Create a new BeautifulSoup object with a basic HTML structure
-    new_soup = BeautifulSoup('<html><head></head><body></body></html>', 'html.parser')
-
-    # Handle the <head> section, using the <head> from soup1
-    if soup1.head:
-        new_soup.head.replace_with(soup1.head)
-
-    # Extract <body> contents from both soups
-    body1 = soup1.body
-    body2 = soup2.body
-
-    # Merge the body contents
-    if body1:
-        new_soup.body.extend(body1.contents)
-    if body2:
-        new_soup.body.extend(body2.contents)
-
-    # Return the string representation of the merged HTML
-    return str(new_soup)
-
-#Some BeautifulSoup-driven functions to modify our HTML.
-
-#This one adds a row to the bottom of a table that is basically just a text box.
-def append_row_with_colspan_to_html_table(html_table, new_row, colspan_index, colspan_value):
-    soup = BeautifulSoup(html_table, "html.parser")
-    table = soup.find("table")
-    new_row_tag = soup.new_tag("tr")
-    for i, cell in enumerate(new_row):
-        new_cell_tag = soup.new_tag("td")
-        if i == colspan_index:
-            new_cell_tag['colspan'] = colspan_value
-        new_cell_tag.string = str(cell)
-        new_row_tag.append(new_cell_tag)
-    table.append(new_row_tag)
-    return str(soup)
-
-#This one replaces three asterisks in a cell with a special kind of indented cell.
-def add_indent_to_asterisk_cells_in_table(html_table):
-    """
-    Takes an HTML string representing a single table, searches for <td> elements containing '***',
-    and adds the 'special-cell' class to those elements.
-
-    Parameters:
-    html_table (str): The input HTML string representing a single table.
-
-    Returns:
-    str: The modified HTML table as a string.
-    """
-    # Parse the HTML table string
-    soup = BeautifulSoup(html_table, 'html.parser')
-
-    # Find all <td> elements containing '***'
-    for td in soup.find_all('td'):
-        if '***' in td.get_text(strip=True):
-            td['class'] = td.get('class', []) + ['indented-cell']  # Add 'special-cell' class
-            td.string.replace_with(td.get_text().replace("***", ""))
-
-    # Return the modified HTML table as a string
-    return str(soup)
-
-def create_boxscore_row(myItem,myPositions):
-    myRow = []
-    if myItem['substitution']:
-        nameField = "***" + myItem['namefield']
+#The name cell: substitutes get the indent marker, and anyone who played more than one position gets all of them, e.g. SS-2B.
+def get_batter_name_field(namefield,substitution,positions):
+    if substitution:
+        nameField = "***" + namefield
     else:
-        nameField = myItem['namefield']
+        nameField = namefield
     newPositions = ''
-    if len(myPositions) > 1 and nameField != 'Totals':
+    if len(positions) > 1 and nameField != 'Totals':
         nameFieldList = nameField.split(" ")
         nameFieldList.pop()
-        for item in myPositions:
-            newPositions = newPositions + item['abbreviation'] + '-'
+        for item in positions:
+            newPositions = newPositions + item + '-'
         nameFieldList.append(newPositions)
         nameField = ''
         #print(nameFieldList)
         for item in nameFieldList:
             nameField = nameField + item + ' '
         nameField = nameField[:-2]
-    myRow.append(nameField)
-    myRow.append(myItem['ab'])
-    myRow.append(myItem['r'])
-    myRow.append(myItem['h'])
-    myRow.append(myItem['rbi'])
-    myRow.append(myItem['bb'])
-    myRow.append(myItem['k'])
-    myRow.append(myItem['avg'])
-    myRow.append(myItem['obp'])
-    myRow.append(myItem['slg'])
-    return myRow
-
-def create_pitcher_row(myItem):
-    myRow = []
-    myRow.append(myItem['namefield'])
-    myRow.append(myItem['ip'])
-    myRow.append(myItem['h'])
-    myRow.append(myItem['r'])
-    myRow.append(myItem['er'])
-    myRow.append(myItem['bb'])
-    myRow.append(myItem['k'])
-    myRow.append(myItem['hr'])
-    myRow.append(myItem['era'])
-    return myRow
-
-def build_hitter_list(hitterData,hitterTotals,teamPlayers):
+    return nameField
+
+#These write each finished table in one pass (see box_score_tables.py).
+#They render from the game model (see box_score_model.py) rather than the raw payload.
+
+#The batting table's rows from a TeamModel, headings first and totals last.
+def build_model_hitter_rows(team):
     hitterChart = []
-    for item in hitterData:
-        positionData = ''
-        if item['personId']:
-            playerID = 'ID' + str(item['personId'])
-            positionData = teamPlayers[playerID]['allPositions']
-            #print(positionData)
-        hitterRow = create_boxscore_row(item,positionData)
-        hitterChart.append(hitterRow)
-    hitterRow = create_boxscore_row(hitterTotals,positionData)
-    hitterChart.append(hitterRow)
-    return tabulate(hitterChart, tablefmt='html', headers="firstrow")
-
-def append_hitter_notes(hitterTable,hitterNotes):
-    myHitterNotes = ''
-    for item in hitterNotes:
-        myHitterNotes = myHitterNotes + hitterNotes[item] + "\n"
-    hitterNotesList = []
-    hitterNotesList.append(myHitterNotes)
-    hitterTable = append_row_with_colspan_to_html_table(hitterTable,hitterNotesList,0,10)
-    return hitterTable
-
-def append_other_notes(hitterTable,hitterOtherNotes):
-    myOtherNotes = ""
-    myOtherNotesList = []
-    for item in hitterOtherNotes:
-        for item2 in item['fieldList']:
-            myOtherNotes = myOtherNotes + item2['label'] + ': ' + item2['value'] + ' '
-    myOtherNotesList.append(myOtherNotes)
-    hitterTable = append_row_with_colspan_to_html_table(hitterTable,myOtherNotesList,0,10)
-    return hitterTable
-
-def build_pitcher_list(pitcherData,pitcherTotals):
+    for row in team.batters + [team.battingTotals]:
+        hitterChart.append([get_batter_name_field(row.namefield,row.substitution,row.positions),
+                            row.ab, row.r, row.h, row.rbi, row.bb, row.k, row.avg, row.obp, row.slg])
+    return hitterChart
+
+def build_model_pitcher_rows(team):
     pitchingChart = []
-    for item in pitcherData:
-        pitcherRow = create_pitcher_row(item)
-        pitchingChart.append(pitcherRow)
-    pitcherRow = create_pitcher_row(pitcherTotals)
-    pitchingChart.append(pitcherRow)
-    return tabulate(pitchingChart, tablefmt='html', headers="firstrow")
-
-def add_game_notes(pitcherTable,boxInfo):
-    gameNotes = ''
-    gameNotesList = []
-    for i in range(0,len(boxInfo) - 1):
-        gameNotes = gameNotes + boxInfo[i]['label'] + ': ' + boxInfo[i]['value'] + ' '
-    gameNotesList.append(gameNotes)
-    pitcherTable = append_row_with_colspan_to_html_table(pitcherTable,gameNotesList,0,10)
-    return pitcherTable
-
-
-#Grab all of the games from the selected date and store the gameIDs.
-gameDateOutput = gameDate.replace("/","-")
-outputFileName = 'box_scores-' + gameDateOutput
-yesterdaysGames = statsapi.schedule(date=gameDate, team="", opponent="", sportId=1, game_id=None)
-print(yesterdaysGames)
-yesterdayGameIDs = []
-
-for keys in divisionDict:
-    standingsDict[keys] = build_standings_group(standingsData[keys]['teams'])
-
-wildCardStandings = build_wild_card_group(standingsDict[200],standingsDict[201],standingsDict[202])
-wildCardStandings = sort_list_of_lists(wildCardStandings,3)
-standingsDict['alwc'] = wildCardStandings
-standingsAL = (build_standings_html_table(standingsDict,"AL"))
-standingsALHTML = generate_HTML_standings_table(standingsAL)
-print("Logging AL Standings")
-
-wildCardStandings = build_wild_card_group(standingsDict[203],standingsDict[204],standingsDict[205])
-wildCardStandings = sort_list_of_lists(wildCardStandings,3)
-standingsDict['nlwc'] = wildCardStandings
-standingsNL = (build_standings_html_table(standingsDict,"NL"))
-standingsNLHTML = generate_HTML_standings_table(standingsNL)
-print("Logging NL Standings")
-
-nextDay = get_next_day(gameDate)
-todaysSchedule = statsapi.schedule(start_date=nextDay,end_date=nextDay)
-
-print("Logging today's games")
-todaysScheduleTable = write_schedule(todaysSchedule)
-
-#This is the initial HTML template. Note that it will include our style sheet.
-#It also includes the standings tables to start.
-boxScoreHTML = f"""
+    for row in team.pitchers + [team.pitchingTotals]:
+        pitchingChart.append([row.namefield, row.ip, row.h, row.r, row.er, row.bb, row.k, row.hr, row.era])
+    return pitchingChart
+
+#Batting table: substitutes indented, then the batting notes row and the other notes row.
+def render_hitter_table(team):
+    notesRows = [get_batting_notes_text(team.battingNotes), get_fields_text(team.otherNotes)]
+    return render_html_table(build_model_hitter_rows(team), indentMarker='***', notesRows=notesRows)
+
+#Pitching table. If we pass in the game info, it goes underneath as a notes row.
+def render_pitcher_table(team,gameNotes=None):
+    notesRows = []
+    if gameNotes is not None:
+        notesRows.append(get_fields_text(gameNotes))
+    return render_html_table(build_model_pitcher_rows(team), notesRows=notesRows)
+
+#Line score, with every number and 'x' right-adjusted.
+def render_linescore_table(linescore):
+    return render_html_table(linescore, alignNumbers=True)
+
+
+#We open each response cache once per process and reuse it for every date.
+#The server builds pages on many threads at once, so openLock makes sure only one of them opens each
+#cache, store or pool (it's held for every get_* below, which never call each other).
+openLock = threading.Lock()
+openCaches = {}
+
+def get_response_cache(options):
+    if options.cacheDir is None:
+        return None
+    cacheKey = (options.cacheDir, options.cacheMaxMB, options.cacheTTL, options.offline)
+    with openLock:
+        if cacheKey not in openCaches:
+            openCaches[cacheKey] = ResponseCache(options.cacheDir, options.cacheMaxMB * 1024 * 1024, options.cacheTTL, options.offline)
+            print("Using the response cache in " + options.cacheDir)
+        return openCaches[cacheKey]
+
+#Same for the stat store.
+openStores = {}
+
+def get_stat_store(options):
+    if options.statsPath is None:
+        return None
+    with openLock:
+        if options.statsPath not in openStores:
+            openStores[options.statsPath] = StatStore(options.statsPath)
+            print("Saving stats to " + options.statsPath)
+        return openStores[options.statsPath]
+
+#And the schedule store (see box_score_schedule.py), one for each response cache and sport, so every page in the process
+#shares the schedules and standings it has already fetched.
+openSchedules = {}
+
+def get_schedule_store(responseCache, cacheTTL, sportID=1):
+    scheduleKey = (responseCache, cacheTTL, sportID)
+    with openLock:
+        if scheduleKey not in openSchedules:
+            openSchedules[scheduleKey] = ScheduleStore(responseCache, cacheTTL, sportID)
+        return openSchedules[scheduleKey]
+
+#The games on a schedule that were played to the end. Only these go in the stat store.
+def get_completed_game_ids(games):
+    return set(item['game_id'] for item in games if is_final_status(item['status']))
+
+#Sends statsapi's requests through our pooled, rate-limited, retrying session, sized for the fetch workers.
+def start_transport(options):
+    return install_transport(options.fetchWorkers, options.httpTimeout, options.httpRetries, options.rateLimit)
+
+#Does a game involve the team we're filtering on? No filter means every game counts.
+def game_matches_team(item,team_filter):
+    if team_filter is None:
+        return True
+    return item['away_name'] == team_filter or item['home_name'] == team_filter
+
+#Turns standings_data into one standings table per league (for MLB, the AL and the NL), wild cards included.
+#divisionModel (see box_score_divisions.py) says which divisions make up which league. Without one, or with one
+#that doesn't know these divisions (standings saved from another sport), it's worked out from the division names.
+def build_standings_tables(standingsData, divisionModel=None):
+    if divisionModel is None or not all(divisionID in divisionModel.divisionsByID for divisionID in standingsData):
+        divisionModel = build_division_model_from_standings(standingsData)
+    standingsTables = []
+    for league in divisionModel.leagues:
+        if not any(division.divisionID in standingsData for division in league.divisions):
+            continue
+        standingsTables.append(generate_HTML_standings_table(build_standings_html_table(standingsData,league)))
+        print("Logging " + league.abbreviation + " Standings")
+    return standingsTables
+
+#Grabs the standings as of gameDate and the schedule for the day after, for the top of the page.
+#Both come from the schedule store, which usually has the day after already: it came with gameDate's games.
+def fetch_page_header_data(gameDate, responseCache, cacheTTL, dateTTL, todaysSchedule=None):
+    scheduleStore = get_schedule_store(responseCache, cacheTTL)
+    standingsData = scheduleStore.get_standings(gameDate, dateTTL)
+    if todaysSchedule is None:
+        todaysSchedule = scheduleStore.get_games(get_next_day(gameDate))
+    return standingsData, todaysSchedule
+
+#Which divisions make up which league, for laying out the standings. Also from the schedule store.
+def get_division_model(gameDate, responseCache, cacheTTL):
+    return get_schedule_store(responseCache, cacheTTL).get_division_model(gameDate)
+
+#Builds the top of the page: the style sheet, the standings as of gameDate and the schedule for the day after.
+def build_page_header(gameDate, timezone, responseCache, cacheTTL, dateTTL, todaysSchedule=None):
+    standingsData, todaysSchedule = fetch_page_header_data(gameDate, responseCache, cacheTTL, dateTTL, todaysSchedule)
+    divisionModel = get_division_model(gameDate, responseCache, cacheTTL)
+    return build_page_header_from_data(gameDate, timezone, standingsData, todaysSchedule, divisionModel)
+
+#The same, from standings and a schedule we already have. title goes in front of "Standings" at the top.
+def build_page_header_from_data(gameDate, timezone, standingsData, todaysSchedule, divisionModel=None, title='MLB'):
+    with span('render.standings'):
+        standingsTables = build_standings_tables(standingsData, divisionModel)
+
+    print("Logging today's games")
+    with span('render.schedule'):
+        todaysScheduleTable = write_schedule(todaysSchedule,timezone)
+    return render_page_header(gameDate, standingsTables, todaysScheduleTable, title)
+
+#Fills the page template with the standings tables, side by side, and the schedule table.
+def render_page_header(gameDate, standingsTables, todaysScheduleTable, title='MLB'):
+    standingsHTML = '\n        '.join(f"""<table>
+        <tr><td class="nested-standings-table">{standingsTable}</td></tr>
+        </table>""" for standingsTable in standingsTables)
+    #This is the initial HTML template. Note that it will include our style sheet.
+    #It also includes the standings tables to start.
+    boxScoreHTML = f"""
         <html>
         <head>
             <style>
@@ -571,14 +440,9 @@ boxScoreHTML = f"""
             </style>
         </head>
         <body>
-        <h2>MLB Standings - {get_next_day(gameDate)}</h2>
+        <h2>{title} Standings - {get_next_day(gameDate)}</h2>
         <div class="table-container">
-        <table>
-        <tr><td class="nested-standings-table">{standingsALHTML}</td></tr>
-        </table>
-        <table>
-        <tr><td class="nested-standings-table">{standingsNLHTML}</td></tr>
-        </table>
+        {standingsHTML}
         </div>
         <br>
         <h2>Today's Games</h2>
@@ -587,86 +451,110 @@ boxScoreHTML = f"""
         </body>
         </html>
         """
+    return boxScoreHTML
 
-for item in yesterdaysGames:
-    if metsMode == 1:
-        if item['away_name'] == 'New York Mets' or item['home_name'] == 'New York Mets':
-            yesterdayGameIDs.append(item['game_id'])
-    else:
-        yesterdayGameIDs.append(item['game_id'])
-
-#Loop through all of the game_IDs we just added.
-for j in range(0,len(yesterdayGameIDs)):
-#for j in range(0,2):
-    gameID = yesterdayGameIDs[j]
-    #gameID = 745807
-    #Get the boxscore data and line score.
-    data = statsapi.boxscore_data(gameID)
-    myLineScore = statsapi.linescore(gameID)
-    #print(data)
+#Renders the five tables for one game: the line score, both lineups and both pitching staffs.
+def render_game_tables(payload):
+    return render_game_model(build_game_model(payload))
 
+#The same, from the game's model. Nothing here touches the network, so stored models can be re-rendered any time.
+def render_game_model(game):
     #Convert the line score into a text table via tabulate.
     #myLineScoreLOL = parse_text_table(myLineScore)
     #lineScoreTable = tabulate(myLineScoreLOL, tablefmt='html', headers="firstrow")
 
     #Get team info.
-    away_team = data['teamInfo']['away']['shortName']
-    home_team = data['teamInfo']['home']['shortName']
+    away_team = game.away.shortName
+    home_team = game.home.shortName
     print("Logging " + away_team + " versus " + home_team)
 
-    #All the Road Team Stuff
-    roadPlayers = data['away']['players']
-    roadBatters = data['awayBatters']
-    roadBattingTotals = data['awayBattingTotals']
-    roadBattingTable = build_hitter_list(roadBatters,roadBattingTotals,roadPlayers)
-    roadBattingTable = append_hitter_notes(roadBattingTable,data['awayBattingNotes'])
-    roadBattingTable = add_indent_to_asterisk_cells_in_table(roadBattingTable)
-    roadBattingTable = append_other_notes(roadBattingTable,data['away']['info'])
-    roadPitchers = data['awayPitchers']
-    roadPitchingTotals = data['awayPitchingTotals']
-    roadPitcherTable = build_pitcher_list(roadPitchers,roadPitchingTotals)
-
-    #All the Home Team Stuff
-    homePlayers = data['home']['players']
-    homeBatters = data['homeBatters']
-    homeBattingTotals = data['homeBattingTotals']
-    homeBattingTable = build_hitter_list(homeBatters,homeBattingTotals,homePlayers)
-    homeBattingTable = append_hitter_notes(homeBattingTable,data['homeBattingNotes'])
-    homeBattingTable = add_indent_to_asterisk_cells_in_table(homeBattingTable)
-    homeBattingTable = append_other_notes(homeBattingTable,data['home']['info'])
-    homePitchers = data['homePitchers']
-    homePitchingTotals = data['homePitchingTotals']
-    homePitcherTable = build_pitcher_list(homePitchers,homePitchingTotals)
-
-    #We have to add the game notes somewhere.
-    homePitcherTable = add_game_notes(homePitcherTable,data['gameBoxInfo'])
+    gameID = game.gameID
+    with span('render.batting', gameID):
+        roadBattingTable = render_hitter_table(game.away)
+        homeBattingTable = render_hitter_table(game.home)
 
-    #Line Score next.
-    gameScoring = statsapi.game_scoring_play_data(gameID)
-    myMaxInning = get_max_inning(gameScoring['plays'])
-
-    inningDetails = {}
-
-    for i in range(0,myMaxInning):
-        inningDetails[i + 1] = Inning()
-        inningDetails[i + 1].inningNumber = i + 1
-
-    inningDetails = log_runs(gameScoring['plays'],inningDetails)
-    inningDetails = clean_table(inningDetails)
+    with span('render.pitching', gameID):
+        roadPitcherTable = render_pitcher_table(game.away)
+        #We have to add the game notes somewhere.
+        homePitcherTable = render_pitcher_table(game.home,game.gameNotes)
 
-    myLineScore = make_linescore(inningDetails,away_team,home_team)
-    myLineScore = add_totals_to_linescore(myLineScore,data)
-    lineScoreTable = tabulate(myLineScore, tablefmt='html', headers="firstrow")
-    lineScoreTable = fix_linescore_html(lineScoreTable)
-
-    #We're going to build two at a time, so the first one, we'll store in differently-named tables.
-    if j == len(yesterdayGameIDs) - 1 and j % 2 == 0:
-        additionalHTML = f"""Mets
+    #Line Score next.
+    with span('render.linescore', gameID):
+        myLineScore = make_linescore_table(game.away.inningRuns,game.home.inningRuns,away_team,home_team)
+        myLineScore = add_totals_to_linescore(myLineScore,game)
+        lineScoreTable = render_linescore_table(myLineScore)
+    return [lineScoreTable, roadBattingTable, homeBattingTable, roadPitcherTable, homePitcherTable]
+
+#A game we couldn't get in time, or at all, still gets its spot on the page: the teams and the score from the
+#schedule, and why the box score is missing. It isn't saved in the manifest, so an --incremental rerun fills it in.
+def render_placeholder_tables(item, reason):
+    rows = [[item['status'], 'R'], [item['away_name'], str(item.get('away_score', ''))], [item['home_name'], str(item.get('home_score', ''))]]
+    placeholderTable = render_html_table(rows, alignNumbers=True, notesRows=["Box score unavailable: " + reason], notesColspan=2)
+    return [placeholderTable, '', '', '', '']
+
+#Deadline mode keeps this much of the deadline back for rendering and writing the page: fetching stops that long
+#before it. Otherwise one hung game would hold the fetch up to the deadline, leaving no time for the games that came in.
+def get_render_budget(deadline):
+    return min(deadline * 0.2, 5.0)
+
+#Deadline mode: a game's tables once they're rendered, here or on the pool, or None and the reason if that fails.
+#A game we fetched is always rendered here, however late it is (it takes milliseconds); only the pool is waited on
+#with a time limit, up to the deadline.
+def render_game_by_deadline(gameTables, gameModel, deadlineTime, gameTimeout):
+    remaining = deadlineTime - time.monotonic()
+    if gameTimeout is not None:
+        remaining = min(remaining, gameTimeout)
+    try:
+        if isinstance(gameTables, Future):
+            return gameTables.result(timeout=max(0, remaining)), None
+        return render_game_model(gameModel), None
+    except FutureTimeoutError:
+        return None, 'rendering timed out'
+    except Exception as error:
+        print("Game " + str(gameModel.gameID) + " failed to render: " + repr(error))
+        return None, 'render failed (' + type(error).__name__ + ')'
+
+#Rendering is all CPU, so with renderWorkers above 1 the games are rendered on a pool of processes,
+#one per core, while this one keeps fetching and assembling. The game models are small, so they're cheap to send over.
+#Each process keeps its pool for every date it builds.
+renderPools = {}
+
+def get_render_pool(options):
+    if options.renderWorkers <= 1:
+        return None
+    with openLock:
+        if options.renderWorkers not in renderPools:
+            renderPools[options.renderWorkers] = ProcessPoolExecutor(max_workers=options.renderWorkers)
+        return renderPools[options.renderWorkers]
+
+#Renders a list of game models, on the render pool if there is one. The tables come back in the same order.
+def render_game_models(gameModels, options):
+    renderPool = get_render_pool(options)
+    if renderPool is None:
+        return [render_game_model(gameModel) for gameModel in gameModels]
+    with span('render.wait'):
+        return list(renderPool.map(render_game_model, gameModels))
+
+#This is how we're going to build the HTML, two games side by side.
+#There are a few things in here: table-container allows us to do two columns, and the "indented-cell" allows for indentation.
+def build_game_pair_html(firstTables, secondTables):
+    lineScoreTable2, roadBattingTable2, homeBattingTable2, roadPitcherTable2, homePitcherTable2 = firstTables
+    lineScoreTable, roadBattingTable, homeBattingTable, roadPitcherTable, homePitcherTable = secondTables
+    additionalHTML = f"""
         <html>
         <head></head>
         <body>
         <div class="table-container">
         <table>
+        <tr><td class="nested-table">{lineScoreTable2}</td></tr>
+        <tr><td class="nested-table">{roadBattingTable2}</td></tr>
+        <tr><td class="nested-table">{homeBattingTable2}</td></tr>
+        <tr><td class="nested-table">{roadPitcherTable2}</td></tr>
+        <tr><td class="nested-table">{homePitcherTable2}</td></tr>
+        <tr><td><br></td></tr>
+        <tr><td><br></td></tr>
+        </table>
+        <table>
         <tr><td class="nested-table">{lineScoreTable}</td></tr>
         <tr><td class="nested-table">{roadBattingTable}</td></tr>
         <tr><td class="nested-table">{homeBattingTable}</td></tr>
@@ -675,46 +563,21 @@ for j in range(0,len(yesterdayGameIDs)):
         <tr><td><br></td></tr>
         <tr><td><br></td></tr>
         </table>
-        <table>
-        <tr><td class="nested-table"></td></tr>
-        <tr><td class="nested-table"></td></tr>
-        <tr><td class="nested-table"></td></tr>
-        <tr><td class="nested-table"></td></tr>
-        <tr><td class="nested-table"></td></tr>
-        <tr><td><br></td></tr>
-        <tr><td><br></td></tr>
-        </table>
         </div>
         </body>
         </html>
         """
-        boxScoreHTML = merge_html(boxScoreHTML,additionalHTML)
-
-    elif j % 2 == 0:
-        lineScoreTable2 = copy.deepcopy(lineScoreTable)
-        homeBattingTable2 = copy.deepcopy(homeBattingTable)
-        roadBattingTable2 = copy.deepcopy(roadBattingTable)
-        roadPitcherTable2 = copy.deepcopy(roadPitcherTable)
-        homePitcherTable2 = copy.deepcopy(homePitcherTable)
-    else:
+    return additionalHTML
 
-    #This is how we're going to build the HTML.
-    #There are a few things in here: table-container allows us to do two columns, and the "indented-cell" allows for indentation.
-        additionalHTML = f"""
+#An odd game out at the end of the night gets a section to itself, with the second column left empty.
+def build_last_game_html(gameTables):
+    lineScoreTable, roadBattingTable, homeBattingTable, roadPitcherTable, homePitcherTable = gameTables
+    additionalHTML = f"""Mets
         <html>
         <head></head>
         <body>
         <div class="table-container">
         <table>
-        <tr><td class="nested-table">{lineScoreTable2}</td></tr>
-        <tr><td class="nested-table">{roadBattingTable2}</td></tr>
-        <tr><td class="nested-table">{homeBattingTable2}</td></tr>
-        <tr><td class="nested-table">{roadPitcherTable2}</td></tr>
-        <tr><td class="nested-table">{homePitcherTable2}</td></tr>
-        <tr><td><br></td></tr>
-        <tr><td><br></td></tr>
-        </table>
-        <table>
         <tr><td class="nested-table">{lineScoreTable}</td></tr>
         <tr><td class="nested-table">{roadBattingTable}</td></tr>
         <tr><td class="nested-table">{homeBattingTable}</td></tr>
@@ -723,25 +586,535 @@ for j in range(0,len(yesterdayGameIDs)):
         <tr><td><br></td></tr>
         <tr><td><br></td></tr>
         </table>
+        <table>
+        <tr><td class="nested-table"></td></tr>
+        <tr><td class="nested-table"></td></tr>
+        <tr><td class="nested-table"></td></tr>
+        <tr><td class="nested-table"></td></tr>
+        <tr><td class="nested-table"></td></tr>
+        <tr><td><br></td></tr>
+        <tr><td><br></td></tr>
+        </table>
         </div>
         </body>
         </html>
         """
-
-        #Some cleanup for the next iteration.
-        del lineScoreTable
-        del roadBattingTable
-        del homeBattingTable
-        del roadPitcherTable
-        del homePitcherTable
-        del lineScoreTable2
-        del roadBattingTable2
-        del homeBattingTable2
-        del roadPitcherTable2
-        del homePitcherTable2
-
-        #Write the records to our HTML file.
-        boxScoreHTML = merge_html(boxScoreHTML,additionalHTML)
-
-with open(outputFileName + '.html','w') as file:
-    file.write(boxScoreHTML)
+    return additionalHTML
+
+#Builds one section of the page from the tables of one or two games.
+def build_section_html(sectionTables):
+    if len(sectionTables) == 1:
+        return build_last_game_html(sectionTables[0])
+    return build_game_pair_html(sectionTables[0], sectionTables[1])
+
+#Grabs the list of games on a date, from the schedule store. Returns the games, the IDs of the ones that are over,
+#and how long to cache things for the date: once every game is over, the schedule and standings won't change,
+#so we can cache them for good. Games the caller already has go into the store, so the page can pick from them there.
+def fetch_date_schedule(gameDate, responseCache, cacheTTL, yesterdaysGames=None):
+    scheduleStore = get_schedule_store(responseCache, cacheTTL)
+    if yesterdaysGames is None:
+        yesterdaysGames = scheduleStore.get_games(gameDate)
+    else:
+        scheduleStore.set_date(gameDate, yesterdaysGames)
+    print(yesterdaysGames)
+    finalGameIDs = set()
+    for item in yesterdaysGames:
+        if is_final_status(item['status']):
+            finalGameIDs.add(item['game_id'])
+    dateTTL = cacheTTL
+    if len(finalGameIDs) == len(yesterdaysGames):
+        dateTTL = None
+    return yesterdaysGames, finalGameIDs, dateTTL
+
+#This builds the box score page for one date (MM/DD/YYYY), one piece at a time: first the head, standings
+#and schedule, then each two-game section as soon as it is rendered. Each piece is a full HTML string for BoxScoreDocument.
+#timezone is eastern, central, mountain or pacific, and team_filter is a full team name like 'New York Mets'.
+#The batch mode already has the schedules for the date and the day after, so it can pass them in.
+def generate_box_score_sections(gameDate, timezone='eastern', team_filter=None, options=None, yesterdaysGames=None, todaysSchedule=None):
+    if options is None:
+        options = FetchOptions()
+    if options.fromModels:
+        yield from generate_box_score_sections_from_model(gameDate, timezone, team_filter, options.modelDir)
+        return
+    cacheTTL = options.cacheTTL
+    deadlineTime = None
+    if options.deadline is not None:
+        deadlineTime = time.monotonic() + options.deadline
+    #Grab all of the games from the selected date and store the gameIDs.
+    #With a deadline the page goes out whatever happens, even without the schedule or the standings.
+    responseCache = get_response_cache(options)
+    try:
+        yesterdaysGames, finalGameIDs, dateTTL = fetch_date_schedule(gameDate, responseCache, cacheTTL, yesterdaysGames)
+        pageGames = get_schedule_store(responseCache, cacheTTL).get_games(gameDate, team_filter)
+    except Exception as error:
+        if deadlineTime is None:
+            raise
+        print("Couldn't fetch the schedule, the page will have no games: " + repr(error))
+        yesterdaysGames, finalGameIDs, dateTTL = [], set(), cacheTTL
+        pageGames = []
+
+    try:
+        standingsData, todaysSchedule = fetch_page_header_data(gameDate, responseCache, cacheTTL, dateTTL, todaysSchedule)
+        divisionModel = get_division_model(gameDate, responseCache, cacheTTL)
+        headerHTML = build_page_header_from_data(gameDate, timezone, standingsData, todaysSchedule, divisionModel)
+    except Exception as error:
+        if deadlineTime is None:
+            raise
+        print("Couldn't fetch the standings or tomorrow's schedule: " + repr(error))
+        standingsData = None
+        unavailableHTML = "<p>Not available right now.</p>"
+        headerHTML = render_page_header(gameDate, [unavailableHTML, ''], unavailableHTML)
+    yield headerHTML
+
+    yesterdayGameIDs = [item['game_id'] for item in pageGames]
+
+    #In an incremental run, games that were already Final last time come straight out of the manifest.
+    manifest = None
+    gameStatuses = {item['game_id']: item['status'] for item in yesterdaysGames}
+    fetchGameIDs = yesterdayGameIDs
+    if options.incremental:
+        manifest = GameManifest(get_manifest_path(gameDate))
+        fetchGameIDs = [gameID for gameID in yesterdayGameIDs if not manifest.can_reuse(gameID, gameStatuses[gameID])]
+        print("Reusing " + str(len(yesterdayGameIDs) - len(fetchGameIDs)) + " games from the manifest")
+        count('manifestReused', len(yesterdayGameIDs) - len(fetchGameIDs))
+
+    #Fetch every game up front, all at once. They come back in schedule order.
+    #With a deadline, the games that fail or run out of time end up in failedGames, with the reason.
+    print("Fetching " + str(len(fetchGameIDs)) + " games")
+    failedGames = {}
+    with span('fetch.games'):
+        if deadlineTime is None:
+            gamePayloads = fetch_game_payloads(fetchGameIDs, options.fetchWorkers, responseCache, finalGameIDs, options.singleFeed)
+        else:
+            fetchDeadline = deadlineTime - get_render_budget(options.deadline)
+            payloadsByID, failedGames = fetch_game_payloads_until(fetchGameIDs, fetchDeadline, options.gameTimeout, options.fetchWorkers,
+                                                                  responseCache, finalGameIDs, options.singleFeed)
+            gamePayloads = [payloadsByID[gameID] for gameID in fetchGameIDs if gameID in payloadsByID]
+    payloadsByID = {}
+    for payload in gamePayloads:
+        payloadsByID[payload['gameID']] = payload
+    del gamePayloads
+
+    statStore = get_stat_store(options)
+    completedGameIDs = get_completed_game_ids(yesterdaysGames)
+    renderPool = get_render_pool(options)
+
+    #First turn each fetched payload into its game model and let the payload go: the model is a small fraction
+    #of the size. Each game ends up with its tables (from the manifest), a future for them (on the render pool)
+    #or None (render it here, when its section comes up).
+    pendingGames = {}
+    for gameID in yesterdayGameIDs:
+        if gameID in failedGames:
+            pendingGames[gameID] = (None, None, None)
+            continue
+        if gameID not in payloadsByID:
+            gameModel = manifest.get_model(gameID) if options.modelDir is not None else None
+            pendingGames[gameID] = (manifest.get_tables(gameID), gameModel, None)
+            continue
+        payload = payloadsByID.pop(gameID)
+        try:
+            with span('model.build', gameID):
+                gameModel = build_game_model(payload)
+        except Exception as error:
+            if deadlineTime is None:
+                raise
+            print("Game " + str(gameID) + " failed: " + repr(error))
+            failedGames[gameID] = 'bad data (' + type(error).__name__ + ')'
+            pendingGames[gameID] = (None, None, None)
+            continue
+        gameTables = None
+        payloadHash = None
+        if manifest is not None:
+            #A game that was fetched again but hasn't changed doesn't need rendering again.
+            payloadHash = get_payload_hash(payload)
+            gameTables = manifest.get_tables(gameID, payloadHash)
+            if gameTables is not None:
+                count('manifestUnchanged')
+        if gameTables is None and renderPool is not None:
+            gameTables = renderPool.submit(render_game_model, gameModel)
+        if statStore is not None and gameID in completedGameIDs:
+            with span('stats.save'):
+                statStore.save_game(gameDate, payload)
+        pendingGames[gameID] = (gameTables, gameModel, payloadHash)
+    payload = None
+
+    #Then put the sections together two games at a time, in schedule order.
+    gameModels = []
+    scheduleItems = {item['game_id']: item for item in yesterdaysGames}
+    for j in range(0,len(yesterdayGameIDs),2):
+        sectionTables = []
+        for gameID in yesterdayGameIDs[j:j + 2]:
+            gameTables, gameModel, payloadHash = pendingGames.pop(gameID)
+            if gameID in failedGames:
+                pass
+            elif deadlineTime is not None and not isinstance(gameTables, list):
+                with span('render.wait', gameID):
+                    gameTables, reason = render_game_by_deadline(gameTables, gameModel, deadlineTime, options.gameTimeout)
+                if gameTables is None:
+                    failedGames[gameID] = reason
+            elif gameTables is None:
+                gameTables = render_game_model(gameModel)
+            elif isinstance(gameTables, Future):
+                with span('render.wait', gameID):
+                    gameTables = gameTables.result()
+            if gameID in failedGames:
+                print("Placeholder for game " + str(gameID) + ": " + failedGames[gameID])
+                sectionTables.append(render_placeholder_tables(scheduleItems[gameID], failedGames[gameID]))
+                continue
+            if payloadHash is not None:
+                manifest.update(gameID, gameStatuses[gameID], payloadHash, gameTables, gameModel)
+            sectionTables.append(gameTables)
+            if options.modelDir is not None and gameModel is not None:
+                gameModels.append(gameModel)
+        yield build_section_html(sectionTables)
+    count('gamesPlaceholder', len(failedGames))
+
+    if manifest is not None:
+        manifest.keep_only(gameStatuses)
+        with span('manifest.save'):
+            manifest.save()
+    if options.modelDir is not None and standingsData is not None:
+        with span('model.save'):
+            save_date_model(options.modelDir, DateModel(gameDate, standingsData, todaysSchedule, gameModels))
+
+#Does a game model involve the team we're filtering on? Same as game_matches_team, for a stored game.
+def game_model_matches_team(game,team_filter):
+    if team_filter is None:
+        return True
+    return game.away.name == team_filter or game.home.name == team_filter
+
+#The same sections, rendered from the models saved for gameDate in modelDir. CPU only: no API calls, no cache.
+def generate_box_score_sections_from_model(gameDate, timezone, team_filter, modelDir):
+    with span('model.load'):
+        dateModel = load_date_model(modelDir, gameDate)
+    yield build_page_header_from_data(gameDate, timezone, dateModel.standingsData, dateModel.todaysSchedule)
+    games = [game for game in dateModel.games if game_model_matches_team(game,team_filter)]
+    for j in range(0,len(games),2):
+        yield build_section_html([render_game_model(game) for game in games[j:j + 2]])
+
+#Builds the whole page for one date and returns it as a string.
+def build_box_score_page(gameDate, timezone='eastern', team_filter=None, options=None, yesterdaysGames=None, todaysSchedule=None):
+    if options is None:
+        options = FetchOptions()
+    sections = generate_box_score_sections(gameDate, timezone, team_filter, options, yesterdaysGames, todaysSchedule)
+    boxScoreHTML = next(sections)
+    with span('page.assemble'):
+        boxScoreDocument = BoxScoreDocument(boxScoreHTML, options.minify)
+    for additionalHTML in sections:
+        with span('page.assemble'):
+            boxScoreDocument.append_html(additionalHTML)
+    return boxScoreDocument.to_html()
+
+#This builds the page for one date and writes it to box_scores-MM-DD-YYYY.html. Returns the file name.
+#Each section goes to disk as soon as it is rendered, through a temp file that only replaces the real one
+#when the page is finished. If something goes wrong partway, the old page (if any) is left alone.
+def make_box_scores(gameDate, timezone='eastern', team_filter=None, options=None, yesterdaysGames=None, todaysSchedule=None):
+    if options is None:
+        options = FetchOptions()
+    gameDateOutput = gameDate.replace("/","-")
+    outputFileName = 'box_scores-' + gameDateOutput
+    sections = generate_box_score_sections(gameDate, timezone, team_filter, options, yesterdaysGames, todaysSchedule)
+    boxScoreHTML = next(sections)
+    with span('page.assemble'):
+        boxScoreDocument = StreamingBoxScoreDocument(boxScoreHTML, outputFileName + '.html', options.minify)
+    try:
+        for additionalHTML in sections:
+            with span('page.assemble'):
+                boxScoreDocument.append_html(additionalHTML)
+    except BaseException:
+        boxScoreDocument.abort()
+        raise
+    with span('page.write'):
+        boxScoreDocument.close()
+    finish_page_file(boxScoreDocument, options)
+    return outputFileName + '.html'
+
+#Once a page is written: with precompress on, write its compressed copies next to it. With either output option on,
+#log how much smaller the page came out. A page written plainly loses any old copies, so they never go stale.
+def finish_page_file(boxScoreDocument, options):
+    outputPath = boxScoreDocument.outputPath
+    if options.precompress:
+        with span('page.compress'):
+            sizes = precompress_file(outputPath)
+    else:
+        for extension in ('gz', 'br'):
+            if os.path.exists(outputPath + '.' + extension):
+                os.remove(outputPath + '.' + extension)
+        sizes = {'html': os.path.getsize(outputPath), 'gz': None, 'br': None}
+    count('pageBytes', boxScoreDocument.rawBytes)
+    count('pageBytesWritten', sizes['html'])
+    if options.minify or options.precompress:
+        print(describe_page_sizes(outputPath, boxScoreDocument.rawBytes, sizes))
+    return sizes
+
+#Where an edition's page goes: the full slate in eastern time keeps the usual name,
+#and a team page or another timezone adds the team and the timezone, e.g. box_scores-07-30-2024-new-york-mets-pacific.html.
+def get_edition_file_name(gameDate, team_filter=None, timezone='eastern'):
+    outputFileName = 'box_scores-' + gameDate.replace("/","-")
+    if team_filter is not None:
+        outputFileName += '-' + re.sub(r'[^a-z0-9]+', '-', team_filter.lower()).strip('-')
+    if timezone != 'eastern':
+        outputFileName += '-' + timezone
+    return outputFileName + '.html'
+
+#Editions mode: one fetch pass for the date, then a page for every team filter and timezone combination.
+#team_filters can include None for the full slate, and allTeams adds a page for every team playing that day.
+#Each game is fetched and rendered once and each section is parsed once, however many pages it ends up on,
+#so 30 team pages cost about the same API traffic as one. Returns the file names.
+def make_box_score_editions(gameDate, team_filters=(None,), timezones=('eastern',), options=None, allTeams=False):
+    if options is None:
+        options = FetchOptions()
+    responseCache = get_response_cache(options)
+    scheduleStore = get_schedule_store(responseCache, options.cacheTTL)
+    yesterdaysGames, finalGameIDs, dateTTL = fetch_date_schedule(gameDate, responseCache, options.cacheTTL)
+    standingsData, todaysSchedule = fetch_page_header_data(gameDate, responseCache, options.cacheTTL, dateTTL)
+    divisionModel = get_division_model(gameDate, responseCache, options.cacheTTL)
+    with span('render.standings'):
+        standingsTables = build_standings_tables(standingsData, divisionModel)
+
+    team_filters = list(team_filters)
+    if allTeams:
+        for teamName in scheduleStore.get_team_names(gameDate):
+            if teamName not in team_filters:
+                team_filters.append(teamName)
+
+    #Only fetch the games at least one edition shows, in schedule order.
+    editionGames = {team_filter: [item['game_id'] for item in scheduleStore.get_games(gameDate, team_filter)] for team_filter in team_filters}
+    neededIDs = set()
+    for editionGameIDs in editionGames.values():
+        neededIDs.update(editionGameIDs)
+    neededGameIDs = [item['game_id'] for item in yesterdaysGames if item['game_id'] in neededIDs]
+    print("Fetching " + str(len(neededGameIDs)) + " games for " + str(len(team_filters) * len(timezones)) + " editions")
+    with span('fetch.games'):
+        gamePayloads = fetch_game_payloads(neededGameIDs, options.fetchWorkers, responseCache, finalGameIDs, options.singleFeed)
+    gameTables = {}
+    gameModels = [build_game_model(payload) for payload in gamePayloads]
+    for gameModel, tables in zip(gameModels, render_game_models(gameModels, options)):
+        gameTables[gameModel.gameID] = tables
+    del gameModels
+    statStore = get_stat_store(options)
+    if statStore is not None:
+        completedGameIDs = get_completed_game_ids(yesterdaysGames)
+        with span('stats.save'):
+            statStore.save_games(gameDate, [payload for payload in gamePayloads if payload['gameID'] in completedGameIDs])
+    del gamePayloads
+
+    scheduleTables = {}
+    sectionNodes = {}
+    outputFiles = []
+    for timezone in timezones:
+        with span('render.schedule'):
+            scheduleTables[timezone] = write_schedule(todaysSchedule,timezone)
+        boxScoreHTML = render_page_header(gameDate, standingsTables, scheduleTables[timezone])
+        for team_filter in team_filters:
+            editionGameIDs = editionGames[team_filter]
+            outputFileName = get_edition_file_name(gameDate, team_filter, timezone)
+            with span('page.assemble'):
+                boxScoreDocument = StreamingBoxScoreDocument(boxScoreHTML, outputFileName, options.minify)
+            try:
+                for j in range(0,len(editionGameIDs),2):
+                    #The same pair of games makes the same section, whichever page it's on.
+                    sectionKey = tuple(editionGameIDs[j:j + 2])
+                    if sectionKey not in sectionNodes:
+                        sectionNodes[sectionKey] = get_body_nodes(build_section_html([gameTables[gameID] for gameID in sectionKey]))
+                    with span('page.assemble'):
+                        boxScoreDocument.append_nodes(sectionNodes[sectionKey])
+            except BaseException:
+                boxScoreDocument.abort()
+                raise
+            with span('page.write'):
+                boxScoreDocument.close()
+            finish_page_file(boxScoreDocument, options)
+            print("Wrote " + outputFileName)
+            outputFiles.append(outputFileName)
+    return outputFiles
+
+#Where the run report and the profile for a date go, next to its page.
+def get_report_path(gameDate):
+    return 'box_scores-' + gameDate.replace("/","-") + '.report.json'
+
+def get_profile_path(gameDate):
+    return 'box_scores-' + gameDate.replace("/","-") + '.pstats'
+
+def get_manifest_path(gameDate):
+    return 'box_scores-' + gameDate.replace("/","-") + '.manifest.json'
+
+#Runs one date inside a worker process. Errors come back as text so one bad date doesn't stop the backfill.
+#With report on, each date gets its own run report (and profile, with profile on).
+def run_box_score_date(gameDate, timezone, team_filter, options, yesterdaysGames, todaysSchedule, report=False, profile=False):
+    try:
+        start_transport(options)
+        if not report:
+            return gameDate, True, make_box_scores(gameDate, timezone, team_filter, options, yesterdaysGames, todaysSchedule)
+        profilePath = None
+        if profile:
+            profilePath = get_profile_path(gameDate)
+        return gameDate, True, run_with_metrics(lambda: make_box_scores(gameDate, timezone, team_filter, options, yesterdaysGames, todaysSchedule),
+                                                gameDate, get_report_path(gameDate), profilePath)
+    except Exception as error:
+        return gameDate, False, repr(error)
+
+#Batch mode: builds a page for every date from startDate to endDate (MM/DD/YYYY), spread across a process pool.
+#The schedule for the whole range (plus the day after, for "Today's Games") comes from one API call, through
+#the schedule store, which splits it up by date. Standings still have to be fetched one date at a time.
+#processes=None means one process per CPU.
+def make_box_scores_for_range(startDate, endDate, timezone='eastern', team_filter=None, options=None, processes=None, report=False, profile=False):
+    if options is None:
+        options = FetchOptions()
+    responseCache = get_response_cache(options)
+    gameDates = get_dates_between(startDate, endDate)
+
+    scheduleByDate = {}
+    for gameDate in gameDates + [get_next_day(endDate)]:
+        scheduleByDate[gameDate] = []
+    #Rendering from saved models needs no schedule: each date's model has its own.
+    if not options.fromModels:
+        scheduleStore = get_schedule_store(responseCache, options.cacheTTL)
+        scheduleStore.load_range(startDate, get_next_day(endDate))
+        for gameDate in scheduleByDate:
+            scheduleByDate[gameDate] = scheduleStore.get_games(gameDate)
+    print("Building " + str(len(gameDates)) + " dates, " + str(sum(len(scheduleByDate[gameDate]) for gameDate in scheduleByDate)) + " games")
+
+    #The rate limit is for the whole backfill, so the worker processes split it between them.
+    workerOptions = options
+    if options.rateLimit:
+        workerOptions = copy.copy(options)
+        workerOptions.rateLimit = options.rateLimit / (processes or os.cpu_count() or 1)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futureList = []
+        for gameDate in gameDates:
+            futureList.append(executor.submit(run_box_score_date, gameDate, timezone, team_filter, workerOptions,
+                                              scheduleByDate[gameDate], scheduleByDate[get_next_day(gameDate)], report, profile))
+        for future in as_completed(futureList):
+            gameDate, succeeded, detail = future.result()
+            if succeeded:
+                print("Finished " + gameDate + ": " + detail)
+            else:
+                print("FAILED " + gameDate + ": " + detail)
+            results.append((gameDate, succeeded, detail))
+
+    results.sort(key=lambda result: datetime.strptime(result[0], "%m/%d/%Y"))
+    failedDates = [result[0] for result in results if not result[1]]
+    print(str(len(results) - len(failedDates)) + " dates succeeded, " + str(len(failedDates)) + " failed")
+    for gameDate in failedDates:
+        print("  failed: " + gameDate)
+    return results
+
+#The command line. With no date we build yesterday's games.
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Builds an HTML page of MLB box scores, standings and the next day's schedule.")
+    parser.add_argument('date', nargs='?', help="date of the games, MM/DD/YYYY (default: yesterday)")
+    parser.add_argument('--end-date', help="build every date from DATE through this one, on a process pool")
+    parser.add_argument('--tz', action='append', choices=sorted(timezoneNames), help="timezone for the schedule (default: eastern); give it more than once for one page per timezone")
+    parser.add_argument('--team', action='append', help="only include games for this team, e.g. 'New York Mets'; give it more than once for one page per team")
+    parser.add_argument('--all-teams', action='store_true', help="write the full slate plus a page for every team playing, from one fetch")
+    parser.add_argument('--sport', action='append', help="build this sport's pages, one per league: mlb, aaa, aa, high-a, single-a, rookie or a sport ID; give it more than once for several (default: mlb)")
+    parser.add_argument('--workers', type=int, default=8, help="API calls to make at the same time (default: 8)")
+    parser.add_argument('--render-workers', type=int, default=0, help="processes to render the games on (default: 0, render in the main process)")
+    parser.add_argument('--processes', type=int, help="dates to build at the same time in a backfill (default: one per CPU)")
+    parser.add_argument('--cache-dir', default='statsapi_cache', help="where to cache API responses (default: statsapi_cache)")
+    parser.add_argument('--no-cache', action='store_true', help="don't cache API responses")
+    parser.add_argument('--cache-ttl', type=int, default=300, help="seconds to keep games that aren't Final yet (default: 300)")
+    parser.add_argument('--cache-max-mb', type=int, default=500, help="size limit for the cache (default: 500)")
+    parser.add_argument('--offline', action='store_true', help="only use the cache, never the network")
+    parser.add_argument('--watch', action='store_true', help="keep the page up to date while the games are being played")
+    parser.add_argument('--interval', type=int, default=60, help="seconds between checks in --watch mode (default: 60)")
+    parser.add_argument('--serve', action='store_true', help="run an HTTP server that renders pages on request at /boxscores/MM-DD-YYYY?team=...&tz=...")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --serve to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="port for --serve (default: 8000)")
+    parser.add_argument('--page-cache-mb', type=int, default=64, help="memory for --serve's rendered pages, and again for its games (default: 64)")
+    parser.add_argument('--prewarm-days', type=int, default=3, help="recent dates --serve builds in the background (default: 3)")
+    parser.add_argument('--single-feed', action='store_true', help="fetch one live feed per game instead of three calls")
+    parser.add_argument('--timeout', type=float, default=30, help="seconds to wait for an API response (default: 30)")
+    parser.add_argument('--retries', type=int, default=3, help="times to retry a failed API request (default: 3)")
+    parser.add_argument('--deadline', type=float, help="seconds the page has; games that fail or aren't done in time get a placeholder and the page goes out anyway")
+    parser.add_argument('--game-timeout', type=float, help="with --deadline, seconds any one game gets to be fetched or rendered")
+    parser.add_argument('--rate-limit', type=float, default=20, help="most API requests per second, 0 for no limit (default: 20)")
+    parser.add_argument('--incremental', action='store_true', help="only fetch and render games that changed since the last run of the date")
+    parser.add_argument('--stats-db', help="also save every finished game's stats to this SQLite file (see box_score_stats.py)")
+    parser.add_argument('--model-dir', help="also save each date's game models here, for re-rendering later without the API")
+    parser.add_argument('--from-models', metavar='DIR', help="render the pages from the game models saved in DIR instead of fetching anything")
+    parser.add_argument('--minify', action='store_true', help="write minified pages")
+    parser.add_argument('--precompress', action='store_true', help="also write .gz (and .br, if brotli is installed) copies of each page")
+    parser.add_argument('--report', help="where to write the JSON run report (default: box_scores-MM-DD-YYYY.report.json)")
+    parser.add_argument('--no-report', action='store_true', help="don't time the run or write a report")
+    parser.add_argument('--profile', nargs='?', const='', help="also profile the run with cProfile and dump the stats here (default: box_scores-MM-DD-YYYY.pstats)")
+    arguments = parser.parse_args(argv)
+    if arguments.tz is None:
+        arguments.tz = ['eastern']
+    if arguments.team is None:
+        arguments.team = [None]
+    if arguments.date is None:
+        arguments.date = (datetime.now() - timedelta(days=1)).strftime("%m/%d/%Y")
+    if arguments.from_models is not None and (arguments.watch or arguments.all_teams or len(arguments.team) * len(arguments.tz) > 1):
+        parser.error("--from-models builds one page per date; it can't be used with --watch or more than one edition")
+    if arguments.serve and (arguments.end_date is not None or arguments.watch or arguments.from_models is not None):
+        parser.error("--serve builds pages on request; it can't be used with --end-date, --watch or --from-models")
+    if arguments.sport is not None:
+        from box_score_leagues import parse_sport
+        try:
+            arguments.sport = [parse_sport(sport) for sport in arguments.sport]
+        except ValueError:
+            parser.error("--sport takes mlb, aaa, aa, high-a, single-a, rookie or a sport ID")
+        if (arguments.end_date is not None or arguments.watch or arguments.serve or arguments.from_models is not None or arguments.model_dir is not None
+                or arguments.incremental or arguments.deadline is not None or arguments.all_teams or len(arguments.team) * len(arguments.tz) > 1 or arguments.team[0] is not None):
+            parser.error("--sport builds one date's full pages; it can't be used with --end-date, --watch, --serve, the model options, --incremental, --deadline or team pages")
+    return arguments
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    cacheDir = arguments.cache_dir
+    if arguments.no_cache:
+        cacheDir = None
+    modelDir = arguments.model_dir
+    if arguments.from_models is not None:
+        modelDir = arguments.from_models
+    #No single request should be able to eat the whole deadline either.
+    httpTimeout = arguments.timeout
+    if arguments.deadline is not None:
+        httpTimeout = min(httpTimeout, arguments.game_timeout or arguments.deadline)
+    options = FetchOptions(fetchWorkers=arguments.workers, cacheDir=cacheDir, cacheTTL=arguments.cache_ttl, cacheMaxMB=arguments.cache_max_mb,
+                           offline=arguments.offline, singleFeed=arguments.single_feed, statsPath=arguments.stats_db, modelDir=modelDir,
+                           fromModels=arguments.from_models is not None, httpTimeout=httpTimeout, httpRetries=arguments.retries,
+                           rateLimit=arguments.rate_limit or None, incremental=arguments.incremental, renderWorkers=arguments.render_workers,
+                           deadline=arguments.deadline, gameTimeout=arguments.game_timeout, minify=arguments.minify, precompress=arguments.precompress)
+    start_transport(options)
+    #Server mode renders pages as they're asked for, so there's no report for one date.
+    if arguments.serve:
+        from box_score_server import serve_box_scores
+        serve_box_scores(arguments.host, arguments.port, options, arguments.page_cache_mb, arguments.cache_ttl, arguments.prewarm_days)
+        return 0
+    timezone = arguments.tz[0]
+    team_filter = arguments.team[0]
+    #A backfill writes a report (and profile) per date from inside each worker.
+    if arguments.end_date is not None:
+        results = make_box_scores_for_range(arguments.date, arguments.end_date, timezone, team_filter, options, arguments.processes,
+                                            not arguments.no_report, arguments.profile is not None)
+        if not all(result[1] for result in results):
+            return 1
+        return 0
+
+    if arguments.sport is not None:
+        from box_score_leagues import make_league_box_scores
+        runPage = lambda: make_league_box_scores(arguments.date, arguments.sport, timezone, options)
+    elif arguments.watch:
+        from box_score_live import watch_box_scores
+        runPage = lambda: watch_box_scores(arguments.date, timezone, team_filter, options, arguments.interval)
+    elif arguments.all_teams or len(arguments.team) * len(arguments.tz) > 1:
+        runPage = lambda: make_box_score_editions(arguments.date, arguments.team, arguments.tz, options, arguments.all_teams)
+    else:
+        runPage = lambda: make_box_scores(arguments.date, timezone, team_filter, options)
+    if arguments.no_report:
+        runPage()
+        return 0
+    reportPath = arguments.report or get_report_path(arguments.date)
+    profilePath = None
+    if arguments.profile is not None:
+        profilePath = arguments.profile or get_profile_path(arguments.date)
+    run_with_metrics(runPage, arguments.date, reportPath, profilePath)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import tempfile
+from box_score_cache import is_final_status
+from box_score_model import GameModel
+
+#The manifest for a date's page: for every game, the status it had, a hash of the payload it was rendered from,
+#its five rendered tables and its game model. A rerun of the date (after a crash, or for a late game)
+#only fetches the games that are new or weren't Final last time, only re-renders the ones whose payload
+#actually changed, and takes everything else straight from here.
+
+#Bump this when the tables change, so old manifests don't hand back tables in the old layout.
+manifestVersion = 1
+
+#A hash of everything we fetched for a game. Same hash, same tables.
+def get_payload_hash(payload):
+    payloadText = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(payloadText.encode('utf-8')).hexdigest()
+
+class GameManifest:
+    def __init__(self, path):
+        self.path = path
+        self.games = {}
+        try:
+            with open(path) as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        if manifest.get('version') == manifestVersion:
+            self.games = manifest['games']
+
+    def get_entry(self, gameID):
+        return self.games.get(str(gameID))
+
+    #A game can be skipped entirely if it was Final last time and still has the same status.
+    def can_reuse(self, gameID, status):
+        entry = self.get_entry(gameID)
+        return entry is not None and entry['status'] == status and is_final_status(status)
+
+    #The saved tables if the game was rendered from exactly this payload, otherwise None.
+    def get_tables(self, gameID, payloadHash=None):
+        entry = self.get_entry(gameID)
+        if entry is None or (payloadHash is not None and entry['hash'] != payloadHash):
+            return None
+        return entry['tables']
+
+    def get_model(self, gameID):
+        return GameModel.from_list(self.get_entry(gameID)['model'])
+
+    def update(self, gameID, status, payloadHash, tables, gameModel):
+        self.games[str(gameID)] = {'status': status, 'hash': payloadHash, 'tables': tables, 'model': gameModel.to_list()}
+
+    #Forgets games that aren't on the date's schedule any more (a game moved to another day, say).
+    def keep_only(self, gameIDs):
+        gameKeys = set(str(gameID) for gameID in gameIDs)
+        self.games = {key: self.games[key] for key in self.games if key in gameKeys}
+
+    #Written through a temp file, so a crash halfway never leaves a broken manifest.
+    def save(self):
+        manifestDir = os.path.dirname(os.path.abspath(self.path))
+        fileHandle, tempPath = tempfile.mkstemp(dir=manifestDir, suffix='.tmp')
+        try:
+            with os.fdopen(fileHandle, 'w') as file:
+                json.dump({'version': manifestVersion, 'games': self.games}, file)
+            os.replace(tempPath, self.path)
+        except BaseException:
+            os.remove(tempPath)
+            raise
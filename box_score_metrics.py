@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+#Instrumentation for a run: how long each stage took, how many API calls and HTML parses we made,
+#how many bytes came over the network and how often the cache saved us a call, in total and per game.
+#Nothing is recorded unless start_metrics() has been called, so the helpers below cost next to nothing normally.
+
+activeMetrics = None
+
+#Which game the current thread is working on, so counts made deep inside a call can be credited to it.
+threadState = threading.local()
+
+class RunMetrics:
+    def __init__(self, label=''):
+        self.label = label
+        self.startTime = time.time()
+        self.startClock = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+        self.games = {}
+
+    def get_game(self, gameID):
+        if gameID not in self.games:
+            self.games[gameID] = {'counters': {}, 'spans': {}}
+        return self.games[gameID]
+
+    def add_span(self, name, seconds, gameID=None):
+        with self.lock:
+            targets = [self.spans]
+            if gameID is not None:
+                targets.append(self.get_game(gameID)['spans'])
+            for spans in targets:
+                if name not in spans:
+                    spans[name] = {'count': 0, 'seconds': 0.0, 'maxSeconds': 0.0}
+                spans[name]['count'] += 1
+                spans[name]['seconds'] += seconds
+                spans[name]['maxSeconds'] = max(spans[name]['maxSeconds'], seconds)
+
+    def add_count(self, name, amount=1, gameID=None):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            if gameID is not None:
+                gameCounters = self.get_game(gameID)['counters']
+                gameCounters[name] = gameCounters.get(name, 0) + amount
+
+    #The whole run as a dict that json can write. Times are in seconds.
+    def get_report(self):
+        with self.lock:
+            gameCount = len(self.games)
+            #Spread over the games, shared work (the schedule, standings and page assembly) included.
+            perGame = {}
+            if gameCount:
+                for name in self.counters:
+                    perGame[name] = self.counters[name] / gameCount
+            return {'label': self.label,
+                    'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.startTime)),
+                    'wallSeconds': time.perf_counter() - self.startClock,
+                    'counters': dict(self.counters),
+                    'spans': {name: dict(self.spans[name]) for name in self.spans},
+                    'gameCount': gameCount,
+                    'perGameAverages': perGame,
+                    'games': {str(gameID): self.games[gameID] for gameID in self.games}}
+
+    def write_report(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.get_report(), file, indent=2, sort_keys=True)
+
+#statsapi makes its requests through its module-level requests import. While the metrics are on,
+#we swap in this stand-in so we can time each request and count the bytes that come back.
+class CountingRequests:
+    def __init__(self, requestsModule):
+        self.requestsModule = requestsModule
+
+    def get(self, url, **kwargs):
+        with span('http.get'):
+            response = self.requestsModule.get(url, **kwargs)
+        count('httpRequests')
+        count('bytesReceived', len(response.content))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.requestsModule, name)
+
+def start_metrics(label=''):
+    global activeMetrics
+    import statsapi
+    activeMetrics = RunMetrics(label)
+    if not isinstance(statsapi.requests, CountingRequests):
+        statsapi.requests = CountingRequests(statsapi.requests)
+    return activeMetrics
+
+def stop_metrics():
+    global activeMetrics
+    import statsapi
+    if isinstance(statsapi.requests, CountingRequests):
+        statsapi.requests = statsapi.requests.requestsModule
+    metrics = activeMetrics
+    activeMetrics = None
+    return metrics
+
+#Times the block under name. Credited to gameID, or to the game this thread is working on.
+@contextmanager
+def span(name, gameID=None):
+    if activeMetrics is None:
+        yield
+        return
+    if gameID is None:
+        gameID = getattr(threadState, 'gameID', None)
+    startTime = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = activeMetrics
+        if metrics is not None:
+            metrics.add_span(name, time.perf_counter() - startTime, gameID)
+
+def count(name, amount=1, gameID=None):
+    if activeMetrics is None:
+        return
+    if gameID is None:
+        gameID = getattr(threadState, 'gameID', None)
+    activeMetrics.add_count(name, amount, gameID)
+
+#Everything counted on this thread inside the block is credited to gameID.
+@contextmanager
+def game_context(gameID):
+    previousGameID = getattr(threadState, 'gameID', None)
+    threadState.gameID = gameID
+    try:
+        yield
+    finally:
+        threadState.gameID = previousGameID
+
+#Runs function() with the metrics on and writes the JSON report to reportPath when it's done, even if it fails.
+#With a profilePath, the run is also profiled and the stats are dumped there for pstats or snakeviz.
+def run_with_metrics(function, label='', reportPath=None, profilePath=None):
+    metrics = start_metrics(label)
+    profiler = None
+    if profilePath is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        return function()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profilePath)
+        stop_metrics()
+        if reportPath is not None:
+            metrics.write_report(reportPath)
+            print("Wrote the run report to " + reportPath)
@@ -0,0 +1,172 @@
+import os
+import pickle
+import tempfile
+import zlib
+from box_score_linescore import get_game_inning_runs
+from box_score_notes import parse_box_score_notes
+
+#msgpack makes smaller files and loads faster, but it isn't required: without it we fall back to pickle.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+#The game model: everything the page shows for one game and nothing else, pulled out of the raw statsapi
+#payload once. The tables are rendered from this (see render_game_model in box_score_maker.py), so the big
+#payload can be let go right away, and a page can be re-rendered later from stored models without the API.
+#Stats stay the strings statsapi gives us, since that's what goes in the tables.
+
+#A record is a fixed set of fields. It turns into a plain list (in __slots__ order) to be saved.
+class Record:
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def to_list(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(*values)
+
+    def __repr__(self):
+        return type(self).__name__ + '(' + ', '.join(name + '=' + repr(getattr(self, name)) for name in self.__slots__) + ')'
+
+#One line of the batting table. The headings row and the totals row are BatterRows too, with personId 0.
+#positions is every position the player played, e.g. ['SS', '2B'].
+class BatterRow(Record):
+    __slots__ = ('personId', 'namefield', 'name', 'substitution', 'positions', 'battingOrder', 'position',
+                 'ab', 'r', 'h', 'doubles', 'triples', 'hr', 'rbi', 'sb', 'bb', 'k', 'lob', 'avg', 'obp', 'slg', 'ops', 'note')
+
+#One line of the pitching table, headings and totals included.
+class PitcherRow(Record):
+    __slots__ = ('personId', 'namefield', 'name', 'ip', 'h', 'r', 'er', 'bb', 'k', 'hr', 'p', 's', 'era', 'note')
+
+#One team in one game. inningRuns has the runs for each inning, notPlayed for an 'x'.
+#battingNotes are the lettered notes ("a-Singled for X in the 7th.") and otherNotes are the
+#(label, value) pairs from the BATTING/BASERUNNING/FIELDING lists.
+class TeamModel(Record):
+    __slots__ = ('teamID', 'name', 'teamName', 'shortName', 'batters', 'battingTotals', 'pitchers', 'pitchingTotals',
+                 'inningRuns', 'runs', 'hits', 'errors', 'battingNotes', 'otherNotes')
+
+    def to_list(self):
+        values = Record.to_list(self)
+        values[4] = [row.to_list() for row in self.batters]
+        values[5] = self.battingTotals.to_list()
+        values[6] = [row.to_list() for row in self.pitchers]
+        values[7] = self.pitchingTotals.to_list()
+        values[12] = list(self.battingNotes)
+        values[13] = [list(field) for field in self.otherNotes]
+        return values
+
+    @classmethod
+    def from_list(cls, values):
+        team = cls(*values)
+        team.batters = [BatterRow.from_list(row) for row in team.batters]
+        team.battingTotals = BatterRow.from_list(team.battingTotals)
+        team.pitchers = [PitcherRow.from_list(row) for row in team.pitchers]
+        team.pitchingTotals = PitcherRow.from_list(team.pitchingTotals)
+        team.otherNotes = [tuple(field) for field in team.otherNotes]
+        return team
+
+#One game. gameNotes are the (label, value) pairs under the home pitching, without the date.
+class GameModel(Record):
+    __slots__ = ('gameID', 'away', 'home', 'gameNotes')
+
+    def to_list(self):
+        return [self.gameID, self.away.to_list(), self.home.to_list(), [list(field) for field in self.gameNotes]]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(values[0], TeamModel.from_list(values[1]), TeamModel.from_list(values[2]), [tuple(field) for field in values[3]])
+
+#Everything one date's page needs: the raw standings and next-day schedule for the header, and the games in page order.
+class DateModel(Record):
+    __slots__ = ('gameDate', 'standingsData', 'todaysSchedule', 'games')
+
+    def to_list(self):
+        return [self.gameDate, self.standingsData, self.todaysSchedule, [game.to_list() for game in self.games]]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(values[0], values[1], values[2], [GameModel.from_list(game) for game in values[3]])
+
+batterFields = BatterRow.__slots__[7:]
+pitcherFields = PitcherRow.__slots__[3:]
+
+def build_batter_row(item, teamPlayers):
+    positions = []
+    if item['personId']:
+        positions = [position['abbreviation'] for position in teamPlayers['ID' + str(item['personId'])]['allPositions']]
+    return BatterRow(item['personId'], item['namefield'], item.get('name', ''), bool(item['substitution']), positions,
+                     item.get('battingOrder', ''), item.get('position', ''), *[item.get(field, '') for field in batterFields])
+
+def build_pitcher_row(item):
+    return PitcherRow(item['personId'], item['namefield'], item.get('name', ''), *[item.get(field, '') for field in pitcherFields])
+
+def build_team_model(data, side, inningRuns, teamNotes):
+    teamInfo = data['teamInfo'][side]
+    teamPlayers = data[side]['players']
+    battingStats = data[side]['teamStats']['batting']
+    return TeamModel(teamInfo['id'], teamInfo['name'], teamInfo['teamName'], teamInfo['shortName'],
+                     [build_batter_row(item, teamPlayers) for item in data[side + 'Batters']],
+                     build_batter_row(data[side + 'BattingTotals'], teamPlayers),
+                     [build_pitcher_row(item) for item in data[side + 'Pitchers']],
+                     build_pitcher_row(data[side + 'PitchingTotals']),
+                     list(inningRuns), battingStats['runs'], battingStats['hits'], teamNotes.errorTotal,
+                     teamNotes.battingNotes, [(label, value) for title, label, value in teamNotes.fields])
+
+#Pulls the model for one game out of a fetched payload (see box_score_fetch.py).
+def build_game_model(payload):
+    data = payload['boxscore']
+    notes = parse_box_score_notes(data)
+    awayRuns, homeRuns = get_game_inning_runs(payload)
+    return GameModel(payload['gameID'], build_team_model(data, 'away', awayRuns, notes['away']),
+                     build_team_model(data, 'home', homeRuns, notes['home']), notes['game'].fields)
+
+#Saved models start with this, then a byte for how the rest was packed, then the packed data, compressed.
+modelMagic = b'BSM1'
+
+def pack_model(model):
+    values = model.to_list()
+    if msgpack is not None:
+        return modelMagic + b'm' + zlib.compress(msgpack.packb(values, use_bin_type=True))
+    return modelMagic + b'p' + zlib.compress(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+
+def unpack_model(data, modelClass=DateModel):
+    if data[:4] != modelMagic:
+        raise ValueError("Not a saved box score model")
+    packing = data[4:5]
+    body = zlib.decompress(data[5:])
+    if packing == b'm':
+        if msgpack is None:
+            raise RuntimeError("This model was saved with msgpack, which isn't installed")
+        #The standings are keyed by division ID, so the map keys aren't all strings.
+        values = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    else:
+        values = pickle.loads(body)
+    return modelClass.from_list(values)
+
+#Where the models for a date go, e.g. games-07-30-2024.model.
+def get_model_path(modelDir, gameDate):
+    return os.path.join(modelDir, 'games-' + gameDate.replace("/","-") + '.model')
+
+#Written through a temp file, like the pages, so a crash never leaves half a model behind.
+def save_date_model(modelDir, dateModel):
+    os.makedirs(modelDir, exist_ok=True)
+    path = get_model_path(modelDir, dateModel.gameDate)
+    fileHandle, tempPath = tempfile.mkstemp(dir=modelDir, suffix='.tmp')
+    try:
+        with os.fdopen(fileHandle, 'wb') as file:
+            file.write(pack_model(dateModel))
+        os.replace(tempPath, path)
+    except BaseException:
+        os.remove(tempPath)
+        raise
+    return path
+
+def load_date_model(modelDir, gameDate):
+    with open(get_model_path(modelDir, gameDate), 'rb') as file:
+        return unpack_model(file.read())
@@ -0,0 +1,164 @@
+import re
+
+#Reads the notes under the box score into records we can use, in one pass per game:
+#the batting notes, each team's BATTING/BASERUNNING/FIELDING lists (who doubled, homered, stole, made errors)
+#and the game info (umpires, weather, attendance). The notes rows on the page are written from these too
+#(through the game model, see box_score_model.py), so we only ever walk the lists once.
+
+#"Semien (3, fielding)" or "Seager 2 (5, throw, fielding)". The name can have a comma in it ("Lowe, N").
+entryPattern = re.compile(r'(?P<name>[^;()]+?)(?:\s+(?P<count>\d+))?\s*\((?P<details>[^()]*)\)')
+#"Smith 2" in a list without parentheses, like TB.
+countPattern = re.compile(r'^(?P<name>.+?)(?:\s+(?P<count>\d+))?$')
+umpirePattern = re.compile(r'(?P<position>HP|1B|2B|3B|LF|RF):\s*(?P<name>.*?)\.?\s*(?=(?:HP|1B|2B|3B|LF|RF):|$)')
+numberPattern = re.compile(r'\d[\d,]*')
+weatherPattern = re.compile(r'^(?P<degrees>-?\d+) degrees,\s*(?P<condition>.*?)\.?$')
+
+#One player (or team) in a notes list, like "Seager 2 (5, throw, fielding)": name Seager, count 2,
+#details ['5', 'throw', 'fielding'].
+class NoteEntry:
+    def __init__(self, name, count=1, details=None):
+        self.name = name
+        self.count = count
+        self.details = details or []
+
+    def __repr__(self):
+        return 'NoteEntry(' + repr(self.name) + ', ' + str(self.count) + ', ' + repr(self.details) + ')'
+
+#Splits a notes value into entries. Lists with parentheses are read entry by entry, so commas inside
+#the parentheses (or inside a name) don't split anything; lists without them are split on semicolons.
+def parse_note_entries(value):
+    value = value.strip()
+    if value.endswith('.'):
+        value = value[:-1]
+    entries = []
+    if '(' in value:
+        for match in entryPattern.finditer(value):
+            name = match.group('name').strip(' ,;')
+            if not name:
+                continue
+            count = int(match.group('count')) if match.group('count') else 1
+            #Team lists like DP start with just the number: "2 (Semien-Lowe-Garver)."
+            if name.isdigit():
+                name, count = '', int(name)
+            details = [detail.strip() for detail in match.group('details').split(',')]
+            entries.append(NoteEntry(name, count, details))
+        return entries
+    for part in value.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        match = countPattern.match(part)
+        count = int(match.group('count')) if match.group('count') else 1
+        entries.append(NoteEntry(match.group('name'), count))
+    return entries
+
+#One team's notes: the batting notes ("a-Singled for X in the 7th.") and the info lists.
+class TeamNotes:
+    def __init__(self):
+        self.battingNotes = []
+        #(title, label, value) in the order they come, for the notes row.
+        self.fields = []
+        #label -> entries, for the lists we read (E, 2B, HR, SB, DP and the rest).
+        self.entries = {}
+        self.errorTotal = 0
+
+    def get_entries(self, label):
+        return self.entries.get(label, [])
+
+    #Errors per player, e.g. {'Seager': 2, 'Semien': 1}.
+    def get_errors(self):
+        errors = {}
+        for entry in self.get_entries('E'):
+            errors[entry.name] = errors.get(entry.name, 0) + entry.count
+        return errors
+
+    def get_doubles(self):
+        return self.get_entries('2B')
+
+    def get_home_runs(self):
+        return self.get_entries('HR')
+
+    def get_stolen_bases(self):
+        return self.get_entries('SB')
+
+    def get_double_plays(self):
+        return self.get_entries('DP')
+
+#The game info under the home pitching: umpires, weather, attendance and the rest.
+class GameNotes:
+    def __init__(self):
+        #(label, value), everything but the date at the end.
+        self.fields = []
+        self.values = {}
+        self.date = ''
+        #Position -> name, e.g. {'HP': 'Dan Bellino', '1B': ...}.
+        self.umpires = {}
+        self.temperature = None
+        self.condition = ''
+        self.wind = ''
+        self.attendance = None
+
+#Reads one team's batting notes and info lists. teamStats is the team's boxscore stats; when it has
+#the fielding errors we use them for the total, and otherwise we add up the errors in the E list.
+def parse_team_notes(battingNotes, info, teamStats=None):
+    notes = TeamNotes()
+    for key in battingNotes:
+        notes.battingNotes.append(battingNotes[key])
+
+    for item in info:
+        for field in item['fieldList']:
+            label = field['label']
+            value = field.get('value', '')
+            notes.fields.append((item.get('title', ''), label, value))
+            notes.entries[label] = notes.entries.get(label, []) + parse_note_entries(value)
+
+    fielding = (teamStats or {}).get('fielding', {})
+    if 'errors' in fielding:
+        notes.errorTotal = int(fielding['errors'])
+    else:
+        notes.errorTotal = sum(notes.get_errors().values())
+    return notes
+
+def parse_number(value):
+    match = numberPattern.search(value)
+    if match is None:
+        return None
+    return int(match.group().replace(',', ''))
+
+#The last item in the game info is just the date, so it is kept apart from the rest.
+def parse_game_notes(boxInfo):
+    notes = GameNotes()
+    if boxInfo:
+        notes.date = boxInfo[-1].get('value', boxInfo[-1]['label'])
+    for item in boxInfo[:-1]:
+        label = item['label']
+        value = item.get('value', '')
+        notes.fields.append((label, value))
+        notes.values[label] = value
+        if label == 'Umpires':
+            for match in umpirePattern.finditer(value):
+                notes.umpires[match.group('position')] = match.group('name').strip()
+        elif label == 'Weather':
+            match = weatherPattern.match(value.strip())
+            if match is not None:
+                notes.temperature = int(match.group('degrees'))
+                notes.condition = match.group('condition')
+        elif label == 'Wind':
+            notes.wind = value.strip().rstrip('.')
+        elif label == 'Att':
+            notes.attendance = parse_number(value)
+    return notes
+
+#The notes rows on the page. The batting notes go one to a line, and the other lists and the game info
+#are run together as "label: value " pairs.
+def get_batting_notes_text(battingNotes):
+    return ''.join(note + "\n" for note in battingNotes)
+
+def get_fields_text(fields):
+    return ''.join(label + ': ' + value + ' ' for label, value in fields)
+
+#Everything for one game from statsapi.boxscore_data(): {'away': TeamNotes, 'home': TeamNotes, 'game': GameNotes}.
+def parse_box_score_notes(data):
+    return {'away': parse_team_notes(data['awayBattingNotes'], data['away']['info'], data['away'].get('teamStats')),
+            'home': parse_team_notes(data['homeBattingNotes'], data['home']['info'], data['home'].get('teamStats')),
+            'game': parse_game_notes(data['gameBoxInfo'])}
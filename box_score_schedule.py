@@ -0,0 +1,222 @@
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from box_score_cache import CacheMissError, is_final_status
+from box_score_divisions import fetch_division_model
+from box_score_fetch import call_statsapi
+from box_score_metrics import count
+
+#The schedule and standings for a window of dates, kept in memory so each date is only asked about once.
+#The schedule for the whole window comes from one range request, and its games are indexed by date, by team
+#and by game ID. A page needs its date and the day after ("Today's Games"), so asking for a date we don't have
+#loads both in the same request. The standings API has no range request, so standings are fetched one date at a time,
+#the first time a page needs them, and kept until that date's games change.
+#Loading a window again returns the dates whose games changed since last time, so callers only rebuild those.
+#The lock only guards the indexes: requests are made without it, so one slow fetch never holds up a page that has
+#what it needs already, and callers asking for the same thing at the same time wait on one request.
+#A store covers one sport (1 is MLB; see box_score_leagues.py for the others).
+
+#The arguments for the schedule call that lists a date's games.
+def get_schedule_arguments(gameDate, sportID=1):
+    return {'date': gameDate, 'team': "", 'opponent': "", 'sportId': sportID, 'game_id': None}
+
+#The same for every date from startDate through endDate, in one request.
+def get_range_arguments(startDate, endDate, sportID=1):
+    return {'start_date': startDate, 'end_date': endDate, 'sportId': sportID}
+
+#What we compare between loads to tell whether a game has changed.
+def get_game_signature(item):
+    return (item['status'], item.get('current_inning'), item.get('inning_state'), item.get('away_score'), item.get('home_score'))
+
+#Every date (MM/DD/YYYY) from startDate through endDate.
+def get_dates_between(startDate, endDate):
+    currentDate = datetime.strptime(startDate, "%m/%d/%Y")
+    lastDate = datetime.strptime(endDate, "%m/%d/%Y")
+    gameDates = []
+    while currentDate <= lastDate:
+        gameDates.append(currentDate.strftime("%m/%d/%Y"))
+        currentDate += timedelta(days=1)
+    return gameDates
+
+#Schedule items carry their date as YYYY-MM-DD.
+def get_item_date(item):
+    return datetime.strptime(item['game_date'], "%Y-%m-%d").strftime("%m/%d/%Y")
+
+class ScheduleStore:
+    def __init__(self, responseCache=None, cacheTTL=300, sportID=1):
+        self.responseCache = responseCache
+        self.sportID = sportID
+        #A date that still has games going is loaded again once it is older than this many seconds.
+        self.cacheTTL = cacheTTL
+        #date -> the games on it, in schedule order
+        self.gamesByDate = {}
+        #team name -> date -> that team's games on it, in schedule order
+        self.gamesByTeam = {}
+        #gameID -> the game's latest schedule item (a suspended game is on two dates; the later one wins)
+        self.gamesByID = {}
+        #date -> signature of all its games, when it was loaded, and its standings with when they were fetched
+        self.signatures = {}
+        self.loadedTimes = {}
+        self.standingsByDate = {}
+        #season -> the sport's division model (see box_score_divisions.py), or None if the API couldn't say
+        self.divisionModels = {}
+        #The requests going on right now, by what they're for. Everyone asking for the same thing waits on its Future.
+        self.fetching = {}
+        self.lock = threading.RLock()
+
+    #Runs fetch() for key, or waits for the run of it that's already going, and returns its result.
+    def fetch_once(self, key, fetch):
+        with self.lock:
+            future = self.fetching.get(key)
+            fetching = future is None
+            if fetching:
+                future = Future()
+                self.fetching[key] = future
+        if not fetching:
+            count('scheduleFetchesCoalesced')
+            return future.result()
+        try:
+            result = fetch()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.fetching[key]
+        future.set_result(result)
+        return result
+
+    #Once every game on a date is over, it won't change again. A date with no games counts too.
+    def is_date_final(self, gameDate):
+        return all(is_final_status(item['status']) for item in self.gamesByDate.get(gameDate, []))
+
+    def needs_load(self, gameDate):
+        if gameDate not in self.gamesByDate:
+            return True
+        return not self.is_date_final(gameDate) and time.time() - self.loadedTimes[gameDate] > self.cacheTTL
+
+    #Fetches every game from startDate through endDate in one request and indexes them.
+    #With useCache off the request skips the response cache (live mode needs to see changes as they happen).
+    #Returns the dates whose games changed, which is every date the first time. A caller that waited on
+    #someone else's load of the same window gets the same answer.
+    def load_range(self, startDate, endDate, useCache=True):
+        return self.fetch_once(('schedule', startDate, endDate, useCache), lambda: self.fetch_range(startDate, endDate, useCache))
+
+    def fetch_range(self, startDate, endDate, useCache):
+        gameDates = get_dates_between(startDate, endDate)
+        responseCache = self.responseCache if useCache else None
+        count('scheduleLoads')
+        rangeArguments = get_range_arguments(startDate, endDate, self.sportID)
+        try:
+            rangeGames = call_statsapi('schedule', rangeArguments, responseCache, self.cacheTTL)
+        except CacheMissError:
+            rangeGames, gameDates = self.load_dates_from_cache(gameDates)
+        gamesByDate = {gameDate: [] for gameDate in gameDates}
+        for item in rangeGames:
+            itemDate = get_item_date(item)
+            if itemDate in gamesByDate:
+                gamesByDate[itemDate].append(item)
+        #A window that's entirely over goes in the cache for good.
+        if responseCache is not None and not responseCache.offline:
+            if all(is_final_status(item['status']) for item in rangeGames):
+                responseCache.save('schedule', rangeArguments, rangeGames, None)
+        with self.lock:
+            changedDates = [gameDate for gameDate in gameDates if self.set_date(gameDate, gamesByDate[gameDate])]
+        count('scheduleDatesChanged', len(changedDates))
+        return changedDates
+
+    #Offline, a cache filled before the store existed only has each date under its own call.
+    #Returns the games and the dates we found. A date that isn't there at all stays unloaded, so asking for it raises.
+    def load_dates_from_cache(self, gameDates):
+        rangeGames = []
+        foundDates = []
+        for gameDate in gameDates:
+            oldArguments = [get_schedule_arguments(gameDate, self.sportID), get_range_arguments(gameDate, gameDate, self.sportID)]
+            if self.sportID == 1:
+                oldArguments.append({'start_date': gameDate, 'end_date': gameDate})
+            for arguments in oldArguments:
+                try:
+                    rangeGames += call_statsapi('schedule', arguments, self.responseCache, self.cacheTTL)
+                except CacheMissError:
+                    continue
+                foundDates.append(gameDate)
+                break
+        return rangeGames, foundDates
+
+    #Puts one date's games in the indexes, replacing what we had for it. Also for games the caller already has,
+    #like the schedules a backfill hands its workers. Returns whether anything on the date changed.
+    def set_date(self, gameDate, games):
+        with self.lock:
+            for item in self.gamesByDate.get(gameDate, []):
+                if self.gamesByID.get(item['game_id']) is item:
+                    del self.gamesByID[item['game_id']]
+            for teamGames in self.gamesByTeam.values():
+                teamGames.pop(gameDate, None)
+            self.gamesByDate[gameDate] = games
+            for item in games:
+                self.gamesByID[item['game_id']] = item
+                for teamName in (item['away_name'], item['home_name']):
+                    self.gamesByTeam.setdefault(teamName, {}).setdefault(gameDate, []).append(item)
+            self.loadedTimes[gameDate] = time.time()
+            signature = tuple((item['game_id'],) + get_game_signature(item) for item in games)
+            changed = self.signatures.get(gameDate) != signature
+            self.signatures[gameDate] = signature
+            #The standings as of a date only move when its games do.
+            if changed:
+                self.standingsByDate.pop(gameDate, None)
+            return changed
+
+    #The games on a date, in schedule order, or just the ones team_filter (a full team name) plays in.
+    #A date we don't have yet, or have but is out of date, is loaded along with the day after it.
+    def get_games(self, gameDate, team_filter=None):
+        with self.lock:
+            needsLoad = self.needs_load(gameDate)
+        if needsLoad:
+            nextDay = (datetime.strptime(gameDate, "%m/%d/%Y") + timedelta(days=1)).strftime("%m/%d/%Y")
+            self.load_range(gameDate, nextDay)
+        with self.lock:
+            if team_filter is None:
+                return list(self.gamesByDate[gameDate])
+            return list(self.gamesByTeam.get(team_filter, {}).get(gameDate, []))
+
+    def get_game(self, gameID):
+        with self.lock:
+            return self.gamesByID.get(gameID)
+
+    #Every team with a game on a date.
+    def get_team_names(self, gameDate):
+        with self.lock:
+            return sorted(teamName for teamName in self.gamesByTeam if gameDate in self.gamesByTeam[teamName])
+
+    #The standings as of a date. ttl is how long the response cache keeps them (None for good, once the date is over).
+    #We keep them in memory until the date's games change, or for ttl seconds if that comes first.
+    #MLB's come from statsapi's default leagues; any other sport has to say which leagues it wants.
+    def get_standings(self, gameDate, ttl=None, leagueIDs=None):
+        with self.lock:
+            entry = self.standingsByDate.get(gameDate)
+            if entry is not None and (ttl is None or time.time() - entry[1] <= ttl):
+                count('standingsReused')
+                return entry[0]
+            signature = self.signatures.get(gameDate)
+        standingsArguments = {'date': gameDate}
+        if leagueIDs is not None:
+            standingsArguments['leagueId'] = ','.join(str(leagueID) for leagueID in leagueIDs)
+        standingsData = self.fetch_once(('standings', gameDate, standingsArguments.get('leagueId')),
+                                        lambda: call_statsapi('standings_data', standingsArguments, self.responseCache, ttl))
+        with self.lock:
+            #If the date's games changed while we were fetching, these may be behind already; don't keep them.
+            if self.signatures.get(gameDate) == signature:
+                self.standingsByDate[gameDate] = (standingsData, time.time())
+        return standingsData
+
+    #The sport's division model for the season gameDate is in, fetched the first time it's needed.
+    def get_division_model(self, gameDate):
+        season = gameDate[-4:]
+        with self.lock:
+            if season in self.divisionModels:
+                return self.divisionModels[season]
+        divisionModel = self.fetch_once(('divisions', season), lambda: fetch_division_model(self.sportID, season, self.responseCache))
+        with self.lock:
+            self.divisionModels[season] = divisionModel
+        return divisionModel
@@ -0,0 +1,256 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from box_score_cache import is_final_status
+from box_score_document import BoxScoreDocument
+from box_score_fetch import fetch_game_payloads
+from box_score_maker import FetchOptions, timezoneNames, get_response_cache, get_schedule_store, fetch_date_schedule, fetch_page_header_data, \
+    get_division_model, build_page_header_from_data, game_matches_team, render_game_models, build_section_html
+from box_score_model import build_game_model
+
+#Server mode: renders box score pages on request, e.g. GET /boxscores/07-30-2024?team=New+York+Mets&tz=pacific.
+#  - Rendered pages and each game's tables are kept in memory, in LRUs with a size limit. A page whose games are
+#    all Final is good for as long as it stays in the LRU; a page (or game) that's still going is rebuilt once
+#    it is older than liveTTL seconds. A team page reuses the tables of games the full page already rendered.
+#  - Requests for a page that is already being built wait for that build instead of starting their own, so a burst
+#    of readers asking for the same date makes one fetch and one render.
+#  - The last few dates are built in the background when the server starts, and kept warm after that.
+#  - Schedules and standings come from the schedule store (see box_score_schedule.py), shared by every page.
+#GET /stats gives the hit and miss counts as JSON.
+
+#A least-recently-used map that holds at most maxBytes worth of values. Each value is put in with its size.
+class LRUCache:
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.totalBytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.entries:
+                self.totalBytes -= self.entries.pop(key)[1]
+            #Something bigger than the whole cache isn't kept at all.
+            if size > self.maxBytes:
+                return
+            self.entries[key] = (value, size)
+            self.totalBytes += size
+            while self.totalBytes > self.maxBytes:
+                oldKey, (oldValue, oldSize) = self.entries.popitem(last=False)
+                self.totalBytes -= oldSize
+
+    def __len__(self):
+        return len(self.entries)
+
+#The size of a game's five tables, for the fragment LRU.
+def get_tables_size(gameTables):
+    return sum(len(table) for table in gameTables)
+
+#A date from the URL: MM-DD-YYYY or YYYY-MM-DD. Returns MM/DD/YYYY, or None if it isn't a date.
+def parse_page_date(text):
+    for dateFormat in ("%m-%d-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, dateFormat).strftime("%m/%d/%Y")
+        except ValueError:
+            pass
+    return None
+
+class BoxScoreServer:
+    def __init__(self, options=None, cacheMB=64, liveTTL=60, prewarmDays=3, prewarmInterval=300):
+        if options is None:
+            options = FetchOptions()
+        self.options = options
+        #(gameDate, timezone, team_filter) -> (html, built at, every game Final)
+        self.pages = LRUCache(cacheMB * 1024 * 1024)
+        #gameID -> (status, built at, tables)
+        self.fragments = LRUCache(cacheMB * 1024 * 1024)
+        self.liveTTL = liveTTL
+        self.prewarmDays = prewarmDays
+        self.prewarmInterval = prewarmInterval
+        #The page builds going on right now, keyed like pages. Everyone asking for the same page waits on its Future.
+        self.building = {}
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def is_fresh(self, builtTime, final):
+        return final or time.time() - builtTime < self.liveTTL
+
+    #The page for a date, from the LRU if it's there and fresh enough, otherwise built (or waited for).
+    #rebuild skips the LRU, for a date we know has changed.
+    def get_page(self, gameDate, timezone='eastern', team_filter=None, rebuild=False):
+        key = (gameDate, timezone, team_filter)
+        with self.lock:
+            entry = self.pages.get(key)
+            if entry is not None and not rebuild and self.is_fresh(entry[1], entry[2]):
+                self.counters['pageHits'] = self.counters.get('pageHits', 0) + 1
+                return entry[0]
+            future = self.building.get(key)
+            building = future is None
+            if building:
+                future = Future()
+                self.building[key] = future
+        if not building:
+            self.count('pagesCoalesced')
+            return future.result()
+
+        self.count('pageBuilds')
+        try:
+            html, final = self.build_page(gameDate, timezone, team_filter)
+            self.pages.put(key, (html, time.time(), final), len(html))
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.building[key]
+        future.set_result(html)
+        return html
+
+    #A game's tables from the fragment LRU, if we have them for its current status and they're fresh enough.
+    def get_fragment(self, item):
+        entry = self.fragments.get(item['game_id'])
+        if entry is None:
+            return None
+        status, builtTime, gameTables = entry
+        if status != item['status'] or not self.is_fresh(builtTime, is_final_status(status)):
+            return None
+        return gameTables
+
+    #Builds one page: the header, then the games, taking each game's tables from the fragment LRU
+    #where we can and fetching and rendering the rest. Returns the page and whether every game is Final.
+    def build_page(self, gameDate, timezone, team_filter):
+        options = self.options
+        responseCache = get_response_cache(options)
+        yesterdaysGames, finalGameIDs, dateTTL = fetch_date_schedule(gameDate, responseCache, options.cacheTTL)
+        standingsData, todaysSchedule = fetch_page_header_data(gameDate, responseCache, options.cacheTTL, dateTTL)
+        divisionModel = get_division_model(gameDate, responseCache, options.cacheTTL)
+        boxScoreDocument = BoxScoreDocument(build_page_header_from_data(gameDate, timezone, standingsData, todaysSchedule, divisionModel), options.minify)
+
+        pageGames = [item for item in yesterdaysGames if game_matches_team(item,team_filter)]
+        gameStatuses = {item['game_id']: item['status'] for item in pageGames}
+        gameTables = {}
+        fetchGameIDs = []
+        for item in pageGames:
+            fragment = self.get_fragment(item)
+            if fragment is None:
+                fetchGameIDs.append(item['game_id'])
+            else:
+                gameTables[item['game_id']] = fragment
+        self.count('fragmentHits', len(gameTables))
+        self.count('gamesFetched', len(fetchGameIDs))
+
+        gamePayloads = fetch_game_payloads(fetchGameIDs, options.fetchWorkers, responseCache, finalGameIDs, options.singleFeed)
+        gameModels = [build_game_model(payload) for payload in gamePayloads]
+        del gamePayloads
+        builtTime = time.time()
+        for gameModel, tables in zip(gameModels, render_game_models(gameModels, options)):
+            gameTables[gameModel.gameID] = tables
+            self.fragments.put(gameModel.gameID, (gameStatuses[gameModel.gameID], builtTime, tables), get_tables_size(tables))
+
+        for j in range(0,len(pageGames),2):
+            boxScoreDocument.append_html(build_section_html([gameTables[item['game_id']] for item in pageGames[j:j + 2]]))
+        return boxScoreDocument.to_html(), len(finalGameIDs) == len(yesterdaysGames)
+
+    #Builds the last prewarmDays dates' full pages (yesterday first), then again every prewarmInterval seconds,
+    #which only rebuilds the ones that have gone stale. Each pass gets the schedule for all of them (and today,
+    #for "Today's Games") in one request first, and a page whose games changed since the last pass is rebuilt
+    #even if it isn't stale yet.
+    def prewarm(self):
+        while True:
+            changedDates = []
+            try:
+                firstDate = (datetime.now() - timedelta(days=self.prewarmDays)).strftime("%m/%d/%Y")
+                scheduleStore = get_schedule_store(get_response_cache(self.options), self.options.cacheTTL)
+                changedDates = scheduleStore.load_range(firstDate, datetime.now().strftime("%m/%d/%Y"))
+            except Exception as error:
+                print("Loading the schedule for prewarming failed: " + repr(error))
+            for daysBack in range(1, self.prewarmDays + 1):
+                gameDate = (datetime.now() - timedelta(days=daysBack)).strftime("%m/%d/%Y")
+                try:
+                    self.get_page(gameDate, rebuild=gameDate in changedDates)
+                except Exception as error:
+                    print("Prewarming " + gameDate + " failed: " + repr(error))
+            time.sleep(self.prewarmInterval)
+
+    def start_prewarm(self):
+        if self.prewarmDays <= 0:
+            return None
+        thread = threading.Thread(target=self.prewarm, daemon=True)
+        thread.start()
+        return thread
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats.update({'pagesCached': len(self.pages), 'pageBytes': self.pages.totalBytes,
+                      'gamesCached': len(self.fragments), 'gameBytes': self.fragments.totalBytes})
+        return stats
+
+def make_request_handler(boxScoreServer):
+    class BoxScoreRequestHandler(BaseHTTPRequestHandler):
+        def send_text(self, status, contentType, text):
+            body = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', contentType + '; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            path = parts.path.rstrip('/')
+            if path == '/stats':
+                self.send_text(200, 'application/json', json.dumps(boxScoreServer.get_stats(), sort_keys=True))
+                return
+            #Anything that isn't /boxscores/<a date> isn't a page we have; a bad query value is the client's mistake.
+            gameDate = None
+            if path.startswith('/boxscores/'):
+                gameDate = parse_page_date(path[len('/boxscores/'):])
+            if gameDate is None:
+                self.send_text(404, 'text/plain', "Try /boxscores/MM-DD-YYYY or /boxscores/YYYY-MM-DD")
+                return
+            timezone = query.get('tz', 'eastern')
+            if timezone not in timezoneNames:
+                self.send_text(400, 'text/plain', "tz is one of " + ', '.join(sorted(timezoneNames)))
+                return
+            try:
+                html = boxScoreServer.get_page(gameDate, timezone, query.get('team') or None)
+            except Exception as error:
+                #The details stay in our log: they can have internal paths and URLs in them.
+                print("Building " + gameDate + " failed: " + repr(error))
+                self.send_text(502, 'text/plain', "Couldn't build the page right now, try again later")
+                return
+            self.send_text(200, 'text/html', html)
+
+    return BoxScoreRequestHandler
+
+#Runs the server until it's interrupted.
+def serve_box_scores(host='127.0.0.1', port=8000, options=None, cacheMB=64, liveTTL=60, prewarmDays=3):
+    boxScoreServer = BoxScoreServer(options, cacheMB, liveTTL, prewarmDays)
+    httpServer = ThreadingHTTPServer((host, port), make_request_handler(boxScoreServer))
+    httpServer.daemon_threads = True
+    boxScoreServer.start_prewarm()
+    print("Serving box scores on http://" + host + ":" + str(httpServer.server_address[1]) + "/boxscores/MM-DD-YYYY")
+    try:
+        httpServer.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    httpServer.server_close()
+    return boxScoreServer
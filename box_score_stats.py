@@ -0,0 +1,277 @@
+import argparse
+import sqlite3
+import threading
+from datetime import datetime
+from box_score_cache import is_final_status
+from box_score_linescore import get_game_inning_runs, notPlayed
+from box_score_notes import parse_box_score_notes
+
+#A local SQLite store of every game we build a page for: each player's batting and pitching line,
+#the line score and both teams' totals, keyed by game ID and date. Saving a game again replaces it,
+#so reruns, live updates and backfills never leave duplicates behind.
+#Each stat is its own typed column with indexes on date, player and team, so questions like
+#"home run leaders in June" or "the Mets' last 10 games" are answered from the store without the API.
+
+schemaStatements = [
+    '''CREATE TABLE IF NOT EXISTS games (
+        gameID INTEGER PRIMARY KEY, gameDate TEXT NOT NULL,
+        awayTeamID INTEGER, awayTeam TEXT, homeTeamID INTEGER, homeTeam TEXT,
+        awayRuns INTEGER, homeRuns INTEGER, awayHits INTEGER, homeHits INTEGER,
+        awayErrors INTEGER, homeErrors INTEGER, innings INTEGER)''',
+    '''CREATE TABLE IF NOT EXISTS linescore (
+        gameID INTEGER NOT NULL, side TEXT NOT NULL, inning INTEGER NOT NULL, runs INTEGER,
+        PRIMARY KEY (gameID, side, inning)) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS team_totals (
+        gameID INTEGER NOT NULL, side TEXT NOT NULL, gameDate TEXT NOT NULL, teamID INTEGER, team TEXT,
+        ab INTEGER, r INTEGER, h INTEGER, doubles INTEGER, triples INTEGER, hr INTEGER, rbi INTEGER,
+        sb INTEGER, bb INTEGER, k INTEGER, lob INTEGER, errors INTEGER,
+        outs INTEGER, hitsAllowed INTEGER, runsAllowed INTEGER, er INTEGER, walksAllowed INTEGER,
+        strikeouts INTEGER, homeRunsAllowed INTEGER,
+        PRIMARY KEY (gameID, side)) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS batting (
+        gameID INTEGER NOT NULL, playerID INTEGER NOT NULL, gameDate TEXT NOT NULL, side TEXT, teamID INTEGER,
+        name TEXT, battingOrder INTEGER, position TEXT, substitution INTEGER,
+        ab INTEGER, r INTEGER, h INTEGER, doubles INTEGER, triples INTEGER, hr INTEGER, rbi INTEGER,
+        sb INTEGER, bb INTEGER, k INTEGER, lob INTEGER,
+        PRIMARY KEY (gameID, playerID)) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS pitching (
+        gameID INTEGER NOT NULL, playerID INTEGER NOT NULL, gameDate TEXT NOT NULL, side TEXT, teamID INTEGER,
+        name TEXT, pitchOrder INTEGER, note TEXT,
+        outs INTEGER, h INTEGER, r INTEGER, er INTEGER, bb INTEGER, k INTEGER, hr INTEGER, pitches INTEGER, strikes INTEGER,
+        PRIMARY KEY (gameID, playerID)) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS games_by_date ON games (gameDate)',
+    'CREATE INDEX IF NOT EXISTS batting_by_date ON batting (gameDate)',
+    'CREATE INDEX IF NOT EXISTS batting_by_player ON batting (playerID, gameDate)',
+    'CREATE INDEX IF NOT EXISTS pitching_by_date ON pitching (gameDate)',
+    'CREATE INDEX IF NOT EXISTS pitching_by_player ON pitching (playerID, gameDate)',
+    'CREATE INDEX IF NOT EXISTS team_totals_by_team ON team_totals (teamID, gameDate)',
+]
+
+#The columns the leader queries can add up. avg and era are worked out from the sums.
+battingLeaderStats = ('ab', 'r', 'h', 'doubles', 'triples', 'hr', 'rbi', 'sb', 'bb', 'k', 'lob', 'avg')
+pitchingLeaderStats = ('outs', 'h', 'r', 'er', 'bb', 'k', 'hr', 'pitches', 'strikes', 'era')
+
+#Dates are stored as YYYY-MM-DD so they sort and compare as text. The page uses MM/DD/YYYY.
+def get_store_date(gameDate):
+    if '/' in gameDate:
+        return datetime.strptime(gameDate, '%m/%d/%Y').strftime('%Y-%m-%d')
+    return gameDate
+
+#statsapi gives every stat as a string, and '' or '-' when there isn't one.
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+#'5.1' innings pitched is 16 outs.
+def innings_to_outs(inningsPitched):
+    wholeInnings, _, outs = str(inningsPitched).partition('.')
+    if not wholeInnings.isdigit():
+        return None
+    return int(wholeInnings) * 3 + (int(outs) if outs.isdigit() else 0)
+
+#The rows for one game, in the order of the columns above.
+def build_game_rows(gameDate, payload):
+    data = payload['boxscore']
+    gameID = payload['gameID']
+    notes = parse_box_score_notes(data)
+    awayRuns, homeRuns = get_game_inning_runs(payload)
+    rows = {'games': [], 'linescore': [], 'team_totals': [], 'batting': [], 'pitching': []}
+    teamRows = {}
+    for side, inningRuns in (('away', awayRuns), ('home', homeRuns)):
+        team = data['teamInfo'][side]
+        batting = data[side]['teamStats']['batting']
+        pitching = data[side]['teamStats']['pitching']
+        teamRows[side] = (team['id'], team['name'], to_int(batting.get('runs')), to_int(batting.get('hits')), notes[side].errorTotal)
+        rows['team_totals'].append((gameID, side, gameDate, team['id'], team['name'],
+                                    to_int(batting.get('atBats')), to_int(batting.get('runs')), to_int(batting.get('hits')),
+                                    to_int(batting.get('doubles')), to_int(batting.get('triples')), to_int(batting.get('homeRuns')),
+                                    to_int(batting.get('rbi')), to_int(batting.get('stolenBases')), to_int(batting.get('baseOnBalls')),
+                                    to_int(batting.get('strikeOuts')), to_int(batting.get('leftOnBase')), notes[side].errorTotal,
+                                    innings_to_outs(pitching.get('inningsPitched')), to_int(pitching.get('hits')),
+                                    to_int(pitching.get('runs')), to_int(pitching.get('earnedRuns')), to_int(pitching.get('baseOnBalls')),
+                                    to_int(pitching.get('strikeOuts')), to_int(pitching.get('homeRuns'))))
+        for inning in range(len(inningRuns)):
+            runs = inningRuns[inning]
+            if runs == notPlayed:
+                runs = None
+            rows['linescore'].append((gameID, side, inning + 1, runs))
+        #The first row of each list is the column headings and the last is the totals, both with personId 0.
+        for item in data[side + 'Batters']:
+            if not item['personId']:
+                continue
+            rows['batting'].append((gameID, item['personId'], gameDate, side, team['id'], item['name'],
+                                    to_int(item['battingOrder']), item['position'], 1 if item['substitution'] else 0,
+                                    to_int(item['ab']), to_int(item['r']), to_int(item['h']), to_int(item['doubles']),
+                                    to_int(item['triples']), to_int(item['hr']), to_int(item['rbi']), to_int(item['sb']),
+                                    to_int(item['bb']), to_int(item['k']), to_int(item['lob'])))
+        pitchOrder = 0
+        for item in data[side + 'Pitchers']:
+            if not item['personId']:
+                continue
+            pitchOrder += 1
+            rows['pitching'].append((gameID, item['personId'], gameDate, side, team['id'], item['name'], pitchOrder, item['note'],
+                                     innings_to_outs(item['ip']), to_int(item['h']), to_int(item['r']), to_int(item['er']),
+                                     to_int(item['bb']), to_int(item['k']), to_int(item['hr']), to_int(item['p']), to_int(item['s'])))
+    away = teamRows['away']
+    home = teamRows['home']
+    rows['games'].append((gameID, gameDate, away[0], away[1], home[0], home[1], away[2], home[2], away[3], home[3],
+                          away[4], home[4], len(awayRuns)))
+    return rows
+
+class StatStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        #A backfill's processes can all write to the same file, so wait for each other's transactions.
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in schemaStatements:
+                self.connection.execute(statement)
+
+    def save_game(self, gameDate, payload):
+        self.save_games(gameDate, [payload])
+
+    #Saves a date's games in one transaction. Each game's old rows go first, so a game that lost a
+    #player line (a correction, or a live game saved mid-way) doesn't keep the stale one.
+    def save_games(self, gameDate, payloads):
+        storeDate = get_store_date(gameDate)
+        tableRows = {'games': [], 'linescore': [], 'team_totals': [], 'batting': [], 'pitching': []}
+        gameIDs = []
+        for payload in payloads:
+            gameRows = build_game_rows(storeDate, payload)
+            gameIDs.append((payload['gameID'],))
+            for table in tableRows:
+                tableRows[table].extend(gameRows[table])
+        with self.lock, self.connection:
+            for table in tableRows:
+                self.connection.executemany('DELETE FROM ' + table + ' WHERE gameID = ?', gameIDs)
+            for table in tableRows:
+                if tableRows[table]:
+                    marks = ', '.join('?' * len(tableRows[table][0]))
+                    self.connection.executemany('INSERT INTO ' + table + ' VALUES (' + marks + ')', tableRows[table])
+
+    def query(self, statement, parameters=()):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(statement, parameters)]
+
+    #A date range as a WHERE clause. Either end can be left open.
+    def get_date_filter(self, startDate, endDate):
+        clauses = []
+        parameters = []
+        if startDate is not None:
+            clauses.append('gameDate >= ?')
+            parameters.append(get_store_date(startDate))
+        if endDate is not None:
+            clauses.append('gameDate <= ?')
+            parameters.append(get_store_date(endDate))
+        if not clauses:
+            return '', parameters
+        return ' WHERE ' + ' AND '.join(clauses), parameters
+
+    #The players with the most of stat between the two dates. For avg, minAtBats keeps out the 1-for-1s.
+    def get_batting_leaders(self, stat='hr', startDate=None, endDate=None, limit=10, minAtBats=0):
+        if stat not in battingLeaderStats:
+            raise ValueError("Can't rank batters by " + stat)
+        total = 'SUM(h) * 1.0 / SUM(ab)' if stat == 'avg' else 'SUM(' + stat + ')'
+        where, parameters = self.get_date_filter(startDate, endDate)
+        return self.query('SELECT playerID, name, COUNT(*) AS games, SUM(ab) AS ab, ' + total + ' AS value FROM batting' + where +
+                          ' GROUP BY playerID HAVING SUM(ab) >= ? AND value IS NOT NULL ORDER BY value DESC LIMIT ?',
+                          parameters + [minAtBats, limit])
+
+    #Same for pitchers. era is ranked lowest first, and minOuts keeps out the mop-up innings.
+    def get_pitching_leaders(self, stat='k', startDate=None, endDate=None, limit=10, minOuts=0):
+        if stat not in pitchingLeaderStats:
+            raise ValueError("Can't rank pitchers by " + stat)
+        total = 'SUM(er) * 27.0 / SUM(outs)' if stat == 'era' else 'SUM(' + stat + ')'
+        order = 'ASC' if stat == 'era' else 'DESC'
+        where, parameters = self.get_date_filter(startDate, endDate)
+        return self.query('SELECT playerID, name, COUNT(*) AS games, SUM(outs) AS outs, ' + total + ' AS value FROM pitching' + where +
+                          ' GROUP BY playerID HAVING SUM(outs) >= ? AND value IS NOT NULL ORDER BY value ' + order + ' LIMIT ?',
+                          parameters + [minOuts, limit])
+
+    #A team's last lastN games, newest first, by full name ('New York Mets') or team ID.
+    def get_team_games(self, team, lastN=10):
+        column = 'teamID' if str(team).isdigit() else 'team'
+        return self.query('SELECT games.*, team_totals.side AS side FROM team_totals JOIN games USING (gameID)'
+                          ' WHERE team_totals.' + column + ' = ? ORDER BY games.gameDate DESC, gameID DESC LIMIT ?',
+                          [team, lastN])
+
+    #The line score of one game as {'away': [runs...], 'home': [...]}, None for a half inning that wasn't played.
+    def get_linescore(self, gameID):
+        innings = {'away': [], 'home': []}
+        for row in self.query('SELECT side, runs FROM linescore WHERE gameID = ? ORDER BY side, inning', [gameID]):
+            innings[row['side']].append(row['runs'])
+        return innings
+
+    def close(self):
+        self.connection.close()
+
+#Fills the store for a range of dates (MM/DD/YYYY) without building any pages. With the response cache
+#(and offline, nothing leaves the machine) a season comes straight off the disk.
+#The schedule for the whole range is one request, through the schedule store.
+def load_date_range(store, startDate, endDate, options):
+    from box_score_fetch import fetch_game_payloads
+    from box_score_maker import fetch_date_schedule, get_response_cache, get_schedule_store
+    from box_score_schedule import get_dates_between
+    responseCache = get_response_cache(options)
+    get_schedule_store(responseCache, options.cacheTTL).load_range(startDate, endDate)
+    gameCount = 0
+    for gameDate in get_dates_between(startDate, endDate):
+        games, finalGameIDs, dateTTL = fetch_date_schedule(gameDate, responseCache, options.cacheTTL)
+        #Only games that were played to the end: the others would just be replaced later.
+        gameIDs = [item['game_id'] for item in games if is_final_status(item['status'])]
+        store.save_games(gameDate, fetch_game_payloads(gameIDs, options.fetchWorkers, responseCache, finalGameIDs, options.singleFeed))
+        gameCount += len(gameIDs)
+    return gameCount
+
+def print_rows(rows):
+    from tabulate import tabulate
+    print(tabulate(rows, headers='keys'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Loads box score stats into a local SQLite store and asks it questions.")
+    parser.add_argument('database', help="the stats database, e.g. stats.db")
+    commands = parser.add_subparsers(dest='command', required=True)
+    loadParser = commands.add_parser('load', help="load every Final game between two dates (MM/DD/YYYY)")
+    loadParser.add_argument('start_date')
+    loadParser.add_argument('end_date')
+    loadParser.add_argument('--cache-dir', default='statsapi_cache')
+    loadParser.add_argument('--offline', action='store_true', help="only use what is already in the response cache")
+    loadParser.add_argument('--workers', type=int, default=8)
+    leadersParser = commands.add_parser('leaders', help="batting or pitching leaders over a range of dates")
+    leadersParser.add_argument('stat', help="a batting stat (" + ', '.join(battingLeaderStats) + ") or, with --pitching, "
+                               "a pitching stat (" + ', '.join(pitchingLeaderStats) + ")")
+    leadersParser.add_argument('--pitching', action='store_true')
+    leadersParser.add_argument('--start', help="first date, MM/DD/YYYY")
+    leadersParser.add_argument('--end', help="last date, MM/DD/YYYY")
+    leadersParser.add_argument('--limit', type=int, default=10)
+    leadersParser.add_argument('--minimum', type=int, default=0, help="at bats (or outs, for pitchers) needed to qualify")
+    teamParser = commands.add_parser('team', help="a team's most recent games")
+    teamParser.add_argument('team', help="full team name or team ID")
+    teamParser.add_argument('--last', type=int, default=10)
+    arguments = parser.parse_args(argv)
+
+    store = StatStore(arguments.database)
+    try:
+        if arguments.command == 'load':
+            from box_score_maker import FetchOptions, start_transport
+            options = FetchOptions(fetchWorkers=arguments.workers, cacheDir=arguments.cache_dir, offline=arguments.offline)
+            start_transport(options)
+            print("Loaded " + str(load_date_range(store, arguments.start_date, arguments.end_date, options)) + " games")
+        elif arguments.command == 'leaders':
+            if arguments.pitching:
+                print_rows(store.get_pitching_leaders(arguments.stat, arguments.start, arguments.end, arguments.limit, arguments.minimum))
+            else:
+                print_rows(store.get_batting_leaders(arguments.stat, arguments.start, arguments.end, arguments.limit, arguments.minimum))
+        else:
+            print_rows(store.get_team_games(arguments.team, arguments.last))
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
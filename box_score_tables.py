@@ -0,0 +1,118 @@
+import math
+import re
+from html import escape
+
+#This writes our HTML tables directly, in one pass, instead of running tabulate and then
+#re-parsing the result with BeautifulSoup to add notes rows, indentation and alignment.
+#Cells are typed and formatted the way tabulate does it, so the tables read the same as before. The one difference
+#is that tabulate's padding spaces inside each cell are left out; a browser collapses them anyway.
+
+thousandsPattern = re.compile(r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$")
+
+#tabulate formats a whole column by the most general kind of value in it.
+typeRank = {type(None): 0, bool: 1, int: 2, float: 3, str: 5}
+
+def is_int_text(value):
+    try:
+        int(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+def is_float_text(value):
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return False
+    return not (math.isinf(number) or math.isnan(number)) or value.lower() in ['inf', '-inf', 'nan']
+
+#Works out what kind of value a single cell holds. Blank cells don't count towards the column.
+def get_cell_type(value):
+    if value is None or (isinstance(value, str) and not value):
+        return type(None)
+    if type(value) is bool or value in ('True', 'False'):
+        return bool
+    if type(value) is int:
+        return int
+    if type(value) is float:
+        return float
+    if isinstance(value, str):
+        if is_int_text(value) or (thousandsPattern.match(value) and '.' not in value):
+            return int
+        if is_float_text(value) or thousandsPattern.match(value):
+            return float
+    return str
+
+def get_column_type(values):
+    columnType = bool
+    for value in values:
+        cellType = get_cell_type(value)
+        if typeRank.get(cellType, 5) > typeRank[columnType]:
+            columnType = cellType
+    return columnType
+
+#Numbers come out the way tabulate prints them, so '.250' is shown as 0.25 just like it always has been.
+def format_cell(value, columnType):
+    if value is None:
+        return ''
+    if isinstance(value, str) and not value:
+        return ''
+    if columnType is float:
+        try:
+            return format(float(str(value).replace(',', '')), 'g')
+        except (ValueError, TypeError):
+            return f"{value}"
+    if columnType is int:
+        return format(value, '')
+    #Text columns are left-aligned, and tabulate strips them.
+    return f"{value}".strip()
+
+#Builds one HTML table from a list of lists, with the first row as the header.
+#Numeric columns are right-aligned. Extra options cover what our old BeautifulSoup passes used to do:
+#  indentMarker - name cells starting with this lose the marker and get the indented-cell class (substitutes).
+#  alignNumbers - every cell holding a number or an 'x' gets right-aligned (the line score).
+#  notesRows - text rows added at the bottom, spanning notesColspan columns.
+def render_html_table(rows, indentMarker=None, alignNumbers=False, notesRows=(), notesColspan=10):
+    headers = rows[0]
+    bodyRows = rows[1:]
+    columnCount = len(headers)
+    columnTypes = []
+    for i in range(columnCount):
+        columnTypes.append(get_column_type([row[i] for row in bodyRows]))
+
+    rightStyle = ' style="text-align: right;"'
+    columnStyles = []
+    for columnType in columnTypes:
+        if columnType is int or columnType is float:
+            columnStyles.append(rightStyle)
+        else:
+            columnStyles.append('')
+
+    html = ['<table>\n<thead>\n<tr>']
+    for i in range(columnCount):
+        headerText = f"{headers[i]}"
+        style = columnStyles[i]
+        if alignNumbers and (headerText.strip().isnumeric() or headerText.strip() == 'x'):
+            style = rightStyle
+        html.append(f'<th{style}>{escape(headerText, quote=False)}</th>')
+    html.append('</tr>\n</thead>\n<tbody>\n')
+
+    for row in bodyRows:
+        html.append('<tr>')
+        for i in range(columnCount):
+            cellText = format_cell(row[i], columnTypes[i])
+            style = columnStyles[i]
+            cellClass = ''
+            if alignNumbers and (cellText.strip().isnumeric() or cellText.strip() == 'x'):
+                style = rightStyle
+            if indentMarker is not None and indentMarker in cellText:
+                cellText = cellText.replace(indentMarker, '')
+                cellClass = ' class="indented-cell"'
+            html.append(f'<td{style}{cellClass}>{escape(cellText, quote=False)}</td>')
+        html.append('</tr>\n')
+
+    html.append('</tbody>\n')
+    for notesText in notesRows:
+        html.append(f'<tr><td colspan="{notesColspan}">{escape(str(notesText), quote=False)}</td></tr>')
+    html.append('</table>')
+    return ''.join(html)
@@ -0,0 +1,119 @@
+import os
+import random
+import threading
+import time
+from box_score_metrics import count
+
+#The transport for every API call: statsapi does its GETs through its module-level requests import,
+#so we swap in PooledRequests, which sends them over one keep-alive session with
+#  - a connection pool sized for the fetch workers, so calls reuse connections instead of reconnecting,
+#  - a cap on requests in flight and a rate limit, so big backfills run at a steady pace inside the API's limits,
+#  - a timeout on every request,
+#  - retries with jittered exponential backoff for connection errors, timeouts, 429s and 5xxs.
+#The metrics' CountingRequests (box_score_metrics.py) wraps whatever is there, so the two stack.
+
+#Responses that are worth another try. Anything else (a 404, say) is returned as it is.
+retryStatuses = (429, 500, 502, 503, 504)
+
+#Spaces requests out to ratePerSecond, letting up to burst of them through at once after a quiet spell.
+class RateLimiter:
+    def __init__(self, ratePerSecond, burst=1):
+        self.interval = 1.0 / ratePerSecond
+        self.burst = max(1, burst)
+        self.lock = threading.Lock()
+        self.nextTime = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            earliest = max(self.nextTime, now - (self.burst - 1) * self.interval)
+            startTime = max(now, earliest)
+            self.nextTime = earliest + self.interval
+        delay = startTime - now
+        if delay > 0:
+            time.sleep(delay)
+
+class PooledRequests:
+    def __init__(self, requestsModule, maxConnections=8, timeout=30, retries=3, backoff=0.5, maxBackoff=30, ratePerSecond=None):
+        self.requestsModule = requestsModule
+        self.maxConnections = maxConnections
+        self.ratePerSecond = ratePerSecond
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.session = requestsModule.Session()
+        #We do our own retries, so the adapter makes just the one attempt.
+        adapter = requestsModule.adapters.HTTPAdapter(pool_connections=maxConnections, pool_maxsize=maxConnections, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.slots = threading.BoundedSemaphore(maxConnections)
+        self.rateLimiter = None
+        if ratePerSecond:
+            self.rateLimiter = RateLimiter(ratePerSecond, maxConnections)
+        #A forked worker process mustn't share the parent's open connections (see install_transport).
+        self.processID = os.getpid()
+
+    #Whether this transport was built with these settings (see install_transport).
+    def has_settings(self, maxConnections, timeout, retries, ratePerSecond):
+        return (self.maxConnections, self.timeout, self.retries, self.ratePerSecond) == (maxConnections, timeout, retries, ratePerSecond)
+
+    #How long to wait before attempt number attempt (1 for the first retry). A Retry-After header wins if there is one.
+    def get_retry_delay(self, attempt, response=None):
+        if response is not None:
+            retryAfter = response.headers.get('Retry-After', '')
+            if retryAfter.isdigit():
+                return min(float(retryAfter), self.maxBackoff)
+        return random.uniform(0, min(self.maxBackoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        exceptions = self.requestsModule.exceptions
+        attempt = 0
+        while True:
+            if self.rateLimiter is not None:
+                self.rateLimiter.wait()
+            response = None
+            try:
+                with self.slots:
+                    response = self.session.get(url, **kwargs)
+            except (exceptions.ConnectionError, exceptions.Timeout, exceptions.ChunkedEncodingError):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if response.status_code not in retryStatuses or attempt >= self.retries:
+                    return response
+            attempt += 1
+            count('httpRetries')
+            delay = self.get_retry_delay(attempt, response)
+            print("Retrying " + url + " in " + str(round(delay, 1)) + "s (attempt " + str(attempt + 1) + ")")
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+    def __getattr__(self, name):
+        return getattr(self.requestsModule, name)
+
+#Swaps PooledRequests in underneath statsapi (and underneath the metrics, if they're on). Safe to call again:
+#in the same process it keeps the session it has if the settings are the same, and otherwise (a backfill's share
+#of the rate limit, say) replaces it with one built for the new settings. In a forked worker it starts a fresh one.
+def install_transport(maxConnections=8, timeout=30, retries=3, ratePerSecond=None):
+    import statsapi
+    from box_score_metrics import CountingRequests
+    holder = statsapi
+    attribute = 'requests'
+    current = statsapi.requests
+    if isinstance(current, CountingRequests):
+        holder = current
+        attribute = 'requestsModule'
+        current = current.requestsModule
+    if isinstance(current, PooledRequests):
+        if current.processID == os.getpid():
+            if current.has_settings(maxConnections, timeout, retries, ratePerSecond):
+                return current
+            current.close()
+        current = current.requestsModule
+    transport = PooledRequests(current, maxConnections, timeout, retries, ratePerSecond=ratePerSecond)
+    setattr(holder, attribute, transport)
+    return transport
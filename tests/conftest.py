@@ -0,0 +1,41 @@
+#The tests run against the stand-in API and the made-up slates in benchmarks/, so they need no network.
+#Run them from the repository root with: python -m pytest tests
+import os
+import sys
+
+import pytest
+
+rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, rootDir)
+sys.path.insert(0, os.path.join(rootDir, 'benchmarks'))
+
+import statsapi
+import box_score_maker
+from stub_api import Slate, install_stub
+
+#Puts a StubStatsAPI in as statsapi's requests for one test, and afterwards puts back the real one and forgets
+#everything the maker kept in memory (schedules, caches, render pools), so no test sees another's slate.
+@pytest.fixture
+def install_api():
+    realRequests = statsapi.requests
+    def install(api):
+        return install_stub(api)
+    yield install
+    statsapi.requests = realRequests
+    box_score_maker.openSchedules.clear()
+    box_score_maker.openCaches.clear()
+    box_score_maker.openStores.clear()
+    for renderPool in box_score_maker.renderPools.values():
+        renderPool.shutdown()
+    box_score_maker.renderPools.clear()
+
+#Makes the same games as Slate(gameDate, gameCount, seed), stopped part of the way through and still in progress.
+@pytest.fixture
+def make_in_progress_slate():
+    def make(gameDate, gameCount, seed):
+        slate = Slate(gameDate, gameCount, seed=seed, suspended=gameCount)
+        for item in slate.scheduleGames:
+            item['status']['detailedState'] = 'In Progress'
+            item['linescore']['currentInningOrdinal'] = str(item['linescore']['currentInning']) + 'th'
+        return slate
+    return make
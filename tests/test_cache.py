@@ -0,0 +1,97 @@
+import os
+import pickle
+import time
+
+import pytest
+
+import box_score_maker
+from box_score_cache import CacheMissError, ResponseCache, is_final_status, is_over_status
+from box_score_maker import FetchOptions, build_box_score_page, start_transport
+from stub_api import Slate, StubStatsAPI
+
+#Every entry in a cache directory, as (call name, arguments, ttl).
+def get_cache_entries(cacheDir):
+    entries = []
+    for name in os.listdir(cacheDir):
+        if name.endswith('.pickle'):
+            with open(os.path.join(cacheDir, name), 'rb') as file:
+                entry = pickle.load(file)
+            entries.append((entry['name'], entry['kwargs'], entry['ttl']))
+    return entries
+
+def test_only_played_games_are_final():
+    for status in ('Final', 'Game Over', 'Completed Early: Rain', 'Final: Tied'):
+        assert is_final_status(status)
+        assert is_over_status(status)
+    for status in ('Postponed', 'Cancelled'):
+        assert not is_final_status(status)
+        assert is_over_status(status)
+    assert not is_over_status('In Progress')
+
+#A postponed game's responses get the normal TTL, so a make-up or a corrected status shows up; the rest are kept for good.
+def test_postponed_game_is_not_cached_for_good(install_api, tmp_path):
+    slate = Slate('07/30/2024', 4, seed=3)
+    postponedID = slate.get_game_ids()[1]
+    slate.scheduleGames[1]['status']['detailedState'] = 'Postponed'
+    options = FetchOptions(fetchWorkers=2, cacheDir=str(tmp_path), cacheTTL=120)
+    start_transport(options)
+    install_api(StubStatsAPI([slate]))
+    build_box_score_page(slate.gameDate, options=options)
+    gameTTLs = {}
+    for name, kwargs, ttl in get_cache_entries(str(tmp_path)):
+        if 'gamePk' in kwargs:
+            gameTTLs.setdefault(kwargs['gamePk'], set()).add(ttl)
+    assert gameTTLs[postponedID] == {120}
+    assert all(gameTTLs[gameID] == {None} for gameID in gameTTLs if gameID != postponedID)
+    #The date isn't over for good either, so neither are its schedule and standings.
+    assert all(ttl == 120 for name, kwargs, ttl in get_cache_entries(str(tmp_path)) if name in ('schedule', 'standings_data'))
+    assert ResponseCache(str(tmp_path)).load('boxscore_data', {'gamePk': postponedID}, 120)[0]
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    responseCache = ResponseCache(str(tmp_path))
+    responseCache.save('linescore', {'gamePk': 1}, 'live', 0)
+    responseCache.save('linescore', {'gamePk': 2}, 'final', None)
+    time.sleep(0.01)
+    assert responseCache.load('linescore', {'gamePk': 1}, 300) == (False, None)
+    assert responseCache.load('linescore', {'gamePk': 2}, 300) == (True, 'final')
+
+#A game cached while it was going and asked for again once it's Final (ttl=None) gets fetched again, even inside
+#the short TTL, and the new copy is kept for good. A copy kept for good does for any caller.
+def test_entry_saved_with_a_ttl_is_a_miss_for_a_final_game(tmp_path):
+    responseCache = ResponseCache(str(tmp_path))
+    responseCache.save('linescore', {'gamePk': 1}, 'live', 300)
+    assert responseCache.call('linescore', {'gamePk': 1}, lambda: 'final', None) == 'final'
+    assert get_cache_entries(str(tmp_path)) == [('linescore', {'gamePk': 1}, None)]
+    assert responseCache.call('linescore', {'gamePk': 1}, lambda: pytest.fail("fetched"), None) == 'final'
+    assert responseCache.call('linescore', {'gamePk': 1}, lambda: pytest.fail("fetched"), 300) == 'final'
+
+#A caller's own TTL counts too, if it's shorter than the one the entry was saved with.
+def test_caller_ttl_limits_the_entry_age(tmp_path):
+    responseCache = ResponseCache(str(tmp_path))
+    responseCache.save('linescore', {'gamePk': 1}, 'live', 300)
+    time.sleep(0.01)
+    assert responseCache.load('linescore', {'gamePk': 1}, 300) == (True, 'live')
+    assert responseCache.load('linescore', {'gamePk': 1}, 0) == (False, None)
+
+#Offline, anything in the cache counts, expired or not, and a miss raises instead of fetching.
+def test_offline_uses_expired_entries_and_never_fetches(tmp_path):
+    ResponseCache(str(tmp_path)).save('linescore', {'gamePk': 1}, 'live', 0)
+    time.sleep(0.01)
+    offlineCache = ResponseCache(str(tmp_path), offline=True)
+    assert offlineCache.call('linescore', {'gamePk': 1}, lambda: pytest.fail("fetched"), 0) == 'live'
+    with pytest.raises(CacheMissError):
+        offlineCache.call('linescore', {'gamePk': 2}, lambda: pytest.fail("fetched"), 0)
+
+#A page built once with the cache on can be built again offline, with the API gone, and comes out the same.
+def test_offline_page_matches_the_online_one(install_api, tmp_path):
+    slate = Slate('07/30/2024', 5, seed=8)
+    options = FetchOptions(fetchWorkers=2, cacheDir=str(tmp_path))
+    start_transport(options)
+    install_api(StubStatsAPI([slate]))
+    onlinePage = build_box_score_page(slate.gameDate, options=options)
+    box_score_maker.openSchedules.clear()
+    box_score_maker.openCaches.clear()
+    api = install_api(StubStatsAPI([], errorRate=1.0)).api
+    offlinePage = build_box_score_page(slate.gameDate, options=FetchOptions(fetchWorkers=2, cacheDir=str(tmp_path), offline=True))
+    assert offlinePage == onlinePage
+    assert api.counters.get('requests', 0) == 0
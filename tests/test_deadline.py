@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from box_score_maker import FetchOptions, build_box_score_page, start_transport
+from stub_api import Slate, StubStatsAPI
+
+#A stub where every request for one game hangs, and everything else answers right away.
+class HangingStatsAPI(StubStatsAPI):
+    def __init__(self, slates, hungGameID, hangSeconds):
+        super().__init__(slates, hangSeconds=hangSeconds)
+        self.hungGameID = hungGameID
+
+    def respond(self, url):
+        if '/game/' + str(self.hungGameID) + '/' in url:
+            self.count('requests')
+            return 504, {}, b'', 0.0, True
+        return super().respond(url)
+
+def get_placeholder_count(page):
+    return page.count('Box score unavailable')
+
+#One hung game gets a placeholder; the games that came in on time are all on the page, rendered here or on the pool.
+@pytest.mark.parametrize('renderWorkers', [0, 2])
+def test_one_hung_game_keeps_the_rest(install_api, renderWorkers):
+    slate = Slate('07/30/2024', 7, seed=1)
+    hungGameID = slate.get_game_ids()[3]
+    options = FetchOptions(fetchWorkers=4, httpRetries=0, httpTimeout=3, deadline=3, renderWorkers=renderWorkers)
+    start_transport(options)
+    install_api(HangingStatsAPI([slate], hungGameID, 10))
+    startTime = time.monotonic()
+    page = build_box_score_page(slate.gameDate, options=options)
+    assert time.monotonic() - startTime < 3.5
+    assert get_placeholder_count(page) == 1
+    assert 'Box score unavailable: missed the deadline' in page
+
+#Without a deadline nothing gets a placeholder.
+def test_no_placeholders_without_a_deadline(install_api):
+    slate = Slate('07/30/2024', 4, seed=2)
+    options = FetchOptions(fetchWorkers=4)
+    start_transport(options)
+    install_api(StubStatsAPI([slate]))
+    assert get_placeholder_count(build_box_score_page(slate.gameDate, options=options)) == 0
+
+#A stub that answers every request for one game with a 503.
+class FailingGameStatsAPI(StubStatsAPI):
+    def __init__(self, slates, failedGameID):
+        super().__init__(slates)
+        self.failedGameID = failedGameID
+
+    def respond(self, url):
+        if '/game/' + str(self.failedGameID) + '/' in url:
+            self.count('errors')
+            return 503, {}, b'{"message": "Service Unavailable"}', 0.0, False
+        return super().respond(url)
+
+#A game that fails gets a placeholder with the teams and score from the schedule, and the reason.
+def test_failed_game_placeholder(install_api):
+    slate = Slate('07/30/2024', 4, seed=10)
+    failedGame = slate.scheduleGames[2]
+    options = FetchOptions(fetchWorkers=2, httpRetries=0, deadline=10)
+    start_transport(options)
+    install_api(FailingGameStatsAPI([slate], failedGame['gamePk']))
+    page = build_box_score_page(slate.gameDate, options=options)
+    assert get_placeholder_count(page) == 1
+    assert 'Box score unavailable: fetch failed (HTTPError)' in page
+    assert failedGame['teams']['away']['team']['name'] in page
+
+#With no time at all, every game is a placeholder, and the page still goes out.
+def test_every_game_misses_a_tiny_deadline(install_api):
+    slate = Slate('07/30/2024', 4, seed=11)
+    options = FetchOptions(fetchWorkers=2, deadline=0.001)
+    start_transport(options)
+    install_api(StubStatsAPI([slate], latency=0.2))
+    page = build_box_score_page(slate.gameDate, options=options)
+    assert get_placeholder_count(page) == 4
@@ -0,0 +1,68 @@
+import random
+import re
+
+from box_score_divisions import build_division_model, build_division_model_from_standings, get_league_abbreviation, get_league_name
+from box_score_maker import build_standings_tables, render_page_header
+from fixtures import make_standings
+from stub_api import make_divisions_response, make_leagues_response
+
+#The group headers in a standings table, in order.
+def get_headers(standingsTable):
+    return re.findall(r'<tr class="special-row">\n<td>([^<]*)</td>', standingsTable)
+
+def test_league_names():
+    assert get_league_abbreviation('American League') == 'AL'
+    assert get_league_abbreviation('Pacific Coast League') == 'PCL'
+    assert get_league_abbreviation('NL') == 'NL'
+    assert get_league_name('International League East') == 'International League'
+    assert get_league_name('Florida State League') == 'Florida State League'
+
+#Each league's table has its divisions East, Central, West, then its own wild card.
+def test_mlb_tables_from_the_api():
+    standingsData = make_standings(random.Random(1))
+    divisionModel = build_division_model(make_divisions_response(), make_leagues_response())
+    alTable, nlTable = build_standings_tables(standingsData, divisionModel)
+    assert get_headers(alTable) == ['AL East', 'AL Central', 'AL West', 'AL Wild Card']
+    assert get_headers(nlTable) == ['NL East', 'NL Central', 'NL West', 'NL Wild Card']
+
+#Without the divisions endpoint the same tables come from the division names.
+def test_fallback_matches_the_api_model():
+    standingsData = make_standings(random.Random(2))
+    divisionModel = build_division_model(make_divisions_response(), make_leagues_response())
+    assert build_standings_tables(standingsData) == build_standings_tables(standingsData, divisionModel)
+    #A model that doesn't know these divisions is ignored rather than dropping them.
+    assert build_standings_tables(standingsData, build_division_model({'divisions': []})) == build_standings_tables(standingsData)
+
+#Division leaders are left out of the wild card, and everybody else is in it, best record first.
+def test_wild_card_leaves_out_division_leaders():
+    standingsData = make_standings(random.Random(3))
+    alTable = build_standings_tables(standingsData)[0]
+    leaders = [standingsData[division]['teams'][0]['name'] for division in (200, 201, 202)]
+    wildCardTeams = [team['name'] for division in (200, 201, 202) for team in standingsData[division]['teams'][1:]]
+    rows = re.findall(r'<tr><td>([^<]*)</td>\n<td>[^<]*</td>\n<td>[^<]*</td>\n<td>([^<]*)</td>', alTable.split('AL Wild Card')[1])
+    assert sorted(row[0] for row in rows) == sorted(wildCardTeams)
+    assert not set(leaders) & set(row[0] for row in rows)
+    assert [row[1] for row in rows] == sorted([row[1] for row in rows], reverse=True)
+
+#A minor league with no wild card ranks gets no wild card table, and its divisions are named after the league.
+def test_minor_league_without_a_wild_card():
+    standingsData = {}
+    for divisionID, divisionName in [(221, 'International League West'), (222, 'International League East')]:
+        standingsData[divisionID] = {'div_name': divisionName, 'teams': [
+            {'name': 'Club ' + str(divisionID) + str(k), 'div_rank': str(k + 1), 'w': 10 - k, 'l': k, 'gb': '-' if k == 0 else str(k),
+             'wc_rank': '-', 'wc_gb': '-', 'team_id': divisionID * 10 + k} for k in range(3)]}
+    standingsTables = build_standings_tables(standingsData)
+    assert len(standingsTables) == 1
+    assert get_headers(standingsTables[0]) == ['IL East', 'IL West']
+    assert build_division_model_from_standings(standingsData).get_team_leagues(standingsData)[2210] == 0
+
+#Before opening day nobody has a record, and that isn't a division by zero.
+def test_standings_before_anyone_has_played():
+    standingsData = {230: {'div_name': 'Carolina League North', 'teams': [
+        {'name': 'Club A', 'div_rank': '1', 'w': 0, 'l': 0, 'gb': '-', 'wc_rank': '-', 'wc_gb': '-', 'team_id': 1}]}}
+    assert '<td>.000</td>' in build_standings_tables(standingsData)[0]
+
+def test_page_header_has_a_table_per_league():
+    header = render_page_header('07/30/2024', ['<table>A</table>', '<table>B</table>', '<table>C</table>'], '', 'Triple-A')
+    assert '<h2>Triple-A Standings - 07/31/2024</h2>' in header
+    assert header.count('nested-standings-table') == 3
@@ -0,0 +1,100 @@
+import gzip
+import os
+import re
+
+import pytest
+
+from bench_page_assembly import pageHead, make_fake_section
+from box_score_document import BoxScoreDocument, StreamingBoxScoreDocument, merge_html, minify_css, precompress_file
+from box_score_maker import FetchOptions, make_box_scores, start_transport
+from stub_api import Slate, StubStatsAPI
+
+def normalize_whitespace(html):
+    return re.sub(r'\s+', ' ', html).strip()
+
+#A section that ends in loose text, and one that starts with it, so the text joins merge_html makes between sections get tested too.
+textSections = ['<html><body><p>Game 1</p>\n  trailing words\n</body></html>',
+                '<html><body>\nleading words <b>bold</b>\n</body></html>',
+                '<html><body>   </body></html>']
+
+def get_sections(sectionCount):
+    sections = [make_fake_section()] + textSections
+    return [sections[i % len(sections)] for i in range(sectionCount)]
+
+def build_with_merge_html(sections):
+    boxScoreHTML = pageHead
+    for section in sections:
+        boxScoreHTML = merge_html(boxScoreHTML, section)
+    return boxScoreHTML
+
+@pytest.mark.parametrize('sectionCount', [1, 2, 3, 5, 8])
+def test_document_matches_merge_html(sectionCount):
+    sections = get_sections(sectionCount)
+    boxScoreDocument = BoxScoreDocument(pageHead)
+    for section in sections:
+        boxScoreDocument.append_html(section)
+    expectedHTML = build_with_merge_html(sections)
+    assert normalize_whitespace(boxScoreDocument.to_html()) == normalize_whitespace(expectedHTML)
+    assert boxScoreDocument.to_html() == expectedHTML
+
+@pytest.mark.parametrize('sectionCount', [1, 3, 8])
+def test_streamed_page_matches_merge_html(sectionCount, tmp_path):
+    sections = get_sections(sectionCount)
+    outputPath = str(tmp_path / 'page.html')
+    boxScoreDocument = StreamingBoxScoreDocument(pageHead, outputPath)
+    for section in sections:
+        boxScoreDocument.append_html(section)
+    boxScoreDocument.close()
+    with open(outputPath) as file:
+        assert file.read() == build_with_merge_html(sections)
+
+#Every table as rows of cell text, and all the text on the page, with blank space squeezed the way a browser shows it.
+def get_page_content(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    tables = [[[normalize_whitespace(cell.get_text(' ')) for cell in row.find_all(['td', 'th'], recursive=False)] for row in table.find_all('tr')]
+              for table in soup.find_all('table')]
+    return tables, normalize_whitespace(soup.body.get_text(' '))
+
+def make_page(install_api, tmp_path, monkeypatch, **optionValues):
+    monkeypatch.chdir(tmp_path)
+    slate = Slate('07/30/2024', 5, seed=14, suspended=1)
+    options = FetchOptions(fetchWorkers=2, **optionValues)
+    start_transport(options)
+    install_api(StubStatsAPI([slate]))
+    return make_box_scores(slate.gameDate, options=options)
+
+def read_bytes(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+#Minifying only takes out blank space and swaps the right-aligned style for a class: the tables and text are the same.
+def test_minified_page_has_the_same_tables_and_text(install_api, tmp_path, monkeypatch):
+    plainPage = read_bytes(make_page(install_api, tmp_path, monkeypatch)).decode('utf-8')
+    minifiedPage = read_bytes(make_page(install_api, tmp_path, monkeypatch, minify=True)).decode('utf-8')
+    assert len(minifiedPage) < len(plainPage)
+    assert get_page_content(minifiedPage) == get_page_content(plainPage)
+    assert 'style="text-align: right;"' not in minifiedPage
+    assert minifiedPage.count(' class="r"') == plainPage.count(' style="text-align: right;"')
+    assert '.r{text-align:right}</style>' in minifiedPage
+    assert '\n' not in minifiedPage
+
+def test_minify_css():
+    assert minify_css('/* note */\n table { border-collapse: collapse; width: 100% }\n .a , .b { color : red; }') == \
+        'table{border-collapse:collapse;width:100%}.a,.b{color:red}'
+
+#The .gz copy is the page, and has no timestamp in it, so building the same page twice gives the same file.
+def test_precompressed_copy_is_the_page_and_deterministic(install_api, tmp_path, monkeypatch):
+    pagePath = make_page(install_api, tmp_path, monkeypatch, minify=True, precompress=True)
+    compressed = read_bytes(pagePath + '.gz')
+    assert gzip.decompress(compressed) == read_bytes(pagePath)
+    assert compressed[4:8] == b'\0\0\0\0'
+    sizes = precompress_file(pagePath)
+    assert read_bytes(pagePath + '.gz') == compressed
+    assert sizes['gz'] == len(compressed)
+    if sizes['br'] is not None:
+        import brotli
+        assert brotli.decompress(read_bytes(pagePath + '.br')) == read_bytes(pagePath)
+    #A page written without precompress takes its old copies with it.
+    make_page(install_api, tmp_path, monkeypatch)
+    assert not os.path.exists(pagePath + '.gz')
@@ -0,0 +1,33 @@
+import pytest
+import statsapi
+
+from box_score_feed import boxscore_data_from_feed, get_feed_params, scoring_play_data_from_feed
+from box_score_maker import FetchOptions, build_box_score_page, start_transport
+from stub_api import Slate, StubStatsAPI
+
+#Long games, suspended games and a doubleheader, so the odd line scores and substitutions are in there too.
+def make_slate():
+    return Slate('07/30/2024', 8, seed=15, longGames=1, longInnings=13, suspended=1, doubleheaders=1, subRate=0.4)
+
+#The feed is built into the same data statsapi's own calls return, so box_score_feed.py can't drift from statsapi.
+def test_feed_data_matches_statsapi(install_api):
+    slate = make_slate()
+    start_transport(FetchOptions())
+    install_api(StubStatsAPI([slate]))
+    for gameID in slate.get_game_ids():
+        feed = statsapi.get(**get_feed_params(gameID))
+        assert boxscore_data_from_feed(feed) == statsapi.boxscore_data(gameID)
+        assert scoring_play_data_from_feed(feed) == statsapi.game_scoring_play_data(gameID)
+
+#One live feed per game makes the very same page as the three calls per game.
+@pytest.mark.parametrize('fetchWorkers', [1, 4])
+def test_single_feed_page_matches_the_three_call_page(install_api, fetchWorkers):
+    slate = make_slate()
+    start_transport(FetchOptions(fetchWorkers=fetchWorkers))
+    api = install_api(StubStatsAPI([slate])).api
+    threeCallPage = build_box_score_page(slate.gameDate, options=FetchOptions(fetchWorkers=fetchWorkers))
+    threeCallFeeds = api.counters['feeds']
+    api = install_api(StubStatsAPI([slate])).api
+    singleFeedPage = build_box_score_page(slate.gameDate, options=FetchOptions(fetchWorkers=fetchWorkers, singleFeed=True))
+    assert singleFeedPage == threeCallPage
+    assert api.counters['feeds'] == threeCallFeeds // 3 == 8
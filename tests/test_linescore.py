@@ -0,0 +1,55 @@
+from box_score_linescore import count_innings_batted, build_inning_runs, get_game_inning_runs, make_linescore_table, notPlayed
+
+#A scoring play as game_scoring_play_data has it: the score after the play.
+def make_play(inning, halfInning, awayScore, homeScore):
+    return {'about': {'inning': inning, 'halfInning': halfInning}, 'result': {'awayScore': awayScore, 'homeScore': homeScore}}
+
+def make_payload(plays, homeInningsPitched, awayInningsPitched):
+    return {'boxscore': {'homePitchingTotals': {'ip': homeInningsPitched}, 'awayPitchingTotals': {'ip': awayInningsPitched}},
+            'scoring': {'plays': plays}}
+
+def test_count_innings_batted():
+    assert count_innings_batted('9.0') == 9
+    assert count_innings_batted('8.2') == 9
+    assert count_innings_batted('6.1') == 7
+    assert count_innings_batted('') == 0
+
+#Home team ahead after the top of the ninth: no bottom of the ninth.
+def test_home_team_does_not_bat_in_the_ninth():
+    plays = [make_play(2, 'bottom', 0, 2), make_play(5, 'top', 1, 2)]
+    awayRuns, homeRuns = get_game_inning_runs(make_payload(plays, '9.0', '8.0'))
+    assert list(awayRuns) == [0, 0, 0, 0, 1, 0, 0, 0, 0]
+    assert list(homeRuns) == [0, 2, 0, 0, 0, 0, 0, 0, notPlayed]
+
+#Called in the middle of the seventh: seven columns, and the half inning nobody batted is an x.
+def test_rain_shortened_game():
+    plays = [make_play(1, 'top', 1, 0), make_play(4, 'bottom', 1, 3)]
+    awayRuns, homeRuns = get_game_inning_runs(make_payload(plays, '7.0', '6.0'))
+    assert len(awayRuns) == len(homeRuns) == 7
+    assert list(awayRuns) == [1, 0, 0, 0, 0, 0, 0]
+    assert list(homeRuns) == [0, 0, 0, 3, 0, 0, notPlayed]
+
+#A walk-off with nobody out in the ninth: the road pitchers only got 24 outs, but the scoring play shows the inning.
+def test_walk_off_with_nobody_out():
+    plays = [make_play(3, 'top', 2, 0), make_play(6, 'bottom', 2, 1), make_play(9, 'bottom', 2, 3)]
+    awayRuns, homeRuns = get_game_inning_runs(make_payload(plays, '9.0', '8.0'))
+    assert list(awayRuns) == [0, 0, 2, 0, 0, 0, 0, 0, 0]
+    assert list(homeRuns) == [0, 0, 0, 0, 0, 1, 0, 0, 2]
+
+#Extra innings make the arrays longer; a run in the top of the eleventh and nothing in the bottom.
+def test_extra_innings():
+    plays = [make_play(2, 'top', 1, 0), make_play(7, 'bottom', 1, 1), make_play(11, 'top', 2, 1)]
+    awayRuns, homeRuns = get_game_inning_runs(make_payload(plays, '11.0', '11.0'))
+    assert len(awayRuns) == len(homeRuns) == 11
+    assert sum(awayRuns) == 2 and awayRuns[10] == 1
+    assert sum(homeRuns) == 1 and homeRuns[10] == 0
+
+#A scoring play with a score lower than one before it (a later play in a big inning) doesn't undo runs.
+def test_runs_are_differences_between_innings():
+    plays = [make_play(1, 'top', 3, 0), make_play(1, 'top', 2, 0), make_play(3, 'top', 4, 0)]
+    awayRuns, homeRuns = build_inning_runs(plays, 9, 8)
+    assert list(awayRuns)[:3] == [3, 0, 1]
+
+def test_linescore_table_marks_unplayed_innings():
+    table = make_linescore_table([1, 0, 0], [0, 2, notPlayed], 'Aces', 'Bears')
+    assert table == [['', 1, 2, 3], ['Aces', 1, 0, 0], ['Bears', 0, 2, 'x']]
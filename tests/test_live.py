@@ -0,0 +1,31 @@
+import box_score_maker
+from box_score_fetch import fetch_game_payload
+from box_score_live import LiveBoxScorePage
+from box_score_maker import FetchOptions, build_box_score_page, get_stat_store, render_game_tables, start_transport
+from stub_api import Slate, StubStatsAPI
+
+#A game cached by an earlier run while it was still going, then seen going Final by the live page, is fetched
+#again: the page and the stat store get the final box score, not the cached one.
+def test_game_going_final_is_not_served_from_the_cache(install_api, make_in_progress_slate, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    liveSlate = make_in_progress_slate('07/30/2024', 2, 12)
+    finalSlate = Slate('07/30/2024', 2, seed=12)
+    options = FetchOptions(fetchWorkers=2, cacheDir=str(tmp_path / 'cache'), statsPath=str(tmp_path / 'stats.db'))
+    start_transport(options)
+    install_api(StubStatsAPI([liveSlate]))
+    build_box_score_page(liveSlate.gameDate, options=options)
+    liveTables = {gameID: render_game_tables(fetch_game_payload(gameID)) for gameID in liveSlate.get_game_ids()}
+
+    box_score_maker.openSchedules.clear()
+    install_api(StubStatsAPI([finalSlate]))
+    livePage = LiveBoxScorePage(finalSlate.gameDate, options=options)
+    livePage.refresh()
+    assert livePage.is_finished()
+    statStore = get_stat_store(options)
+    for item in finalSlate.scheduleGames:
+        gameID = item['gamePk']
+        finalTables = render_game_tables(fetch_game_payload(gameID))
+        assert finalTables != liveTables[gameID]
+        assert livePage.gameTables[gameID] == finalTables
+        gameRow = statStore.query('SELECT awayRuns, homeRuns FROM games WHERE gameID = ?', [gameID])[0]
+        assert (gameRow['awayRuns'], gameRow['homeRuns']) == (item['teams']['away']['score'], item['teams']['home']['score'])
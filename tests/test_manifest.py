@@ -0,0 +1,78 @@
+import os
+import pickle
+
+import box_score_maker
+from box_score_maker import FetchOptions, make_box_scores, start_transport
+from box_score_manifest import GameManifest
+from stub_api import Slate, StubStatsAPI
+
+def read_page(fileName):
+    with open(fileName) as file:
+        return file.read()
+
+#Deletes the cache entries for the named calls, as if they had expired.
+def forget_cached_calls(cacheDir, names):
+    for fileName in os.listdir(cacheDir):
+        path = os.path.join(cacheDir, fileName)
+        with open(path, 'rb') as file:
+            entry = pickle.load(file)
+        if entry['name'] in names:
+            os.remove(path)
+
+def test_manifest_reuses_only_final_games_with_the_same_status(tmp_path):
+    manifest = GameManifest(str(tmp_path / 'manifest.json'))
+    manifest.games = {'1': {'status': 'Final', 'hash': 'a', 'tables': ['t'], 'model': None},
+                      '2': {'status': 'In Progress', 'hash': 'b', 'tables': ['u'], 'model': None}}
+    assert manifest.can_reuse(1, 'Final')
+    assert not manifest.can_reuse(1, 'Final: Tied')
+    assert not manifest.can_reuse(2, 'In Progress')
+    assert not manifest.can_reuse(3, 'Final')
+    assert manifest.get_tables(1, 'a') == ['t']
+    assert manifest.get_tables(1, 'changed') is None
+
+def test_manifest_round_trip_and_old_versions(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    manifest = GameManifest(path)
+    manifest.games = {'1': {'status': 'Final', 'hash': 'a', 'tables': ['t'], 'model': None}}
+    manifest.keep_only([1, 2])
+    manifest.save()
+    assert GameManifest(path).can_reuse(1, 'Final')
+    with open(path, 'w') as file:
+        file.write('{"version": 0, "games": {"1": {}}}')
+    assert GameManifest(path).games == {}
+
+#A rerun only fetches the games that weren't Final last time, and the page comes out the same.
+def test_incremental_rerun_refetches_only_unfinished_games(install_api, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    slate = Slate('07/30/2024', 6, seed=9, suspended=1)
+    options = FetchOptions(fetchWorkers=2, incremental=True)
+    start_transport(options)
+    firstAPI = install_api(StubStatsAPI([slate])).api
+    firstPage = read_page(make_box_scores(slate.gameDate, options=options))
+    assert firstAPI.counters['feeds'] == 3 * 6
+    secondAPI = install_api(StubStatsAPI([slate])).api
+    secondPage = read_page(make_box_scores(slate.gameDate, options=options))
+    assert secondAPI.counters['feeds'] == 3 * 1
+    assert secondPage == firstPage
+
+#A game cached while it was in progress and Final by the next run gets fetched again, not read back from the cache,
+#so the manifest never keeps its in-progress tables under a Final status and later reruns show the final box score.
+def test_incremental_rerun_rebuilds_a_game_that_went_final(install_api, make_in_progress_slate, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    liveSlate = make_in_progress_slate('07/30/2024', 4, 13)
+    finalSlate = Slate('07/30/2024', 4, seed=13)
+    start_transport(FetchOptions())
+    install_api(StubStatsAPI([finalSlate]))
+    expectedPage = read_page(make_box_scores(finalSlate.gameDate, options=FetchOptions(fetchWorkers=2)))
+
+    options = FetchOptions(fetchWorkers=2, cacheDir=str(tmp_path / 'cache'), incremental=True)
+    box_score_maker.openSchedules.clear()
+    install_api(StubStatsAPI([liveSlate]))
+    livePage = read_page(make_box_scores(liveSlate.gameDate, options=options))
+    assert livePage != expectedPage
+    #The schedule and standings were cached first, so their TTL runs out first: the next run sees the games Final.
+    forget_cached_calls(str(tmp_path / 'cache'), ('schedule', 'standings_data'))
+    for k in range(2):
+        box_score_maker.openSchedules.clear()
+        install_api(StubStatsAPI([finalSlate]))
+        assert read_page(make_box_scores(finalSlate.gameDate, options=options)) == expectedPage
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import box_score_model
+from box_score_fetch import fetch_game_payloads
+from box_score_maker import FetchOptions, build_box_score_page, start_transport
+from box_score_model import DateModel, build_game_model, load_date_model, pack_model, save_date_model, unpack_model
+from fixtures import make_standings
+from stub_api import Slate, StubStatsAPI
+
+def make_date_model(install_api):
+    slate = Slate('07/30/2024', 3, seed=10, suspended=1)
+    start_transport(FetchOptions())
+    install_api(StubStatsAPI([slate]))
+    gameModels = [build_game_model(payload) for payload in fetch_game_payloads(slate.get_game_ids(), 2)]
+    return DateModel(slate.gameDate, make_standings(random.Random(1)), [{'game_id': 1, 'status': 'Scheduled'}], gameModels)
+
+#Each way of packing gets the model back exactly: msgpack when it's installed, pickle when it isn't.
+@pytest.mark.parametrize('packing', ['pickle', 'msgpack'])
+def test_model_round_trip(packing, install_api, tmp_path, monkeypatch):
+    if packing == 'msgpack':
+        pytest.importorskip('msgpack')
+    else:
+        monkeypatch.setattr(box_score_model, 'msgpack', None)
+    dateModel = make_date_model(install_api)
+    data = pack_model(dateModel)
+    assert data[:5] == b'BSM1' + packing[0].encode()
+    assert unpack_model(data).to_list() == dateModel.to_list()
+    save_date_model(str(tmp_path), dateModel)
+    loadedModel = load_date_model(str(tmp_path), dateModel.gameDate)
+    assert loadedModel.to_list() == dateModel.to_list()
+    assert repr(loadedModel.games[0]) == repr(dateModel.games[0])
+
+def test_bad_header_is_rejected(install_api, monkeypatch):
+    monkeypatch.setattr(box_score_model, 'msgpack', None)
+    data = pack_model(make_date_model(install_api))
+    with pytest.raises(ValueError):
+        unpack_model(b'BSM2' + data[4:])
+    with pytest.raises(ValueError):
+        unpack_model(b'')
+    with pytest.raises(RuntimeError):
+        unpack_model(data[:4] + b'm' + data[5:])
+
+#A page rendered from the saved models is the same page, with no API at all.
+def test_page_from_models_matches_the_fetched_page(install_api, tmp_path):
+    slate = Slate('07/30/2024', 5, seed=11, suspended=1)
+    options = FetchOptions(fetchWorkers=2, modelDir=str(tmp_path))
+    start_transport(options)
+    install_api(StubStatsAPI([slate]))
+    fetchedPage = build_box_score_page(slate.gameDate, options=options)
+    api = install_api(StubStatsAPI([], errorRate=1.0)).api
+    modelPage = build_box_score_page(slate.gameDate, options=FetchOptions(modelDir=str(tmp_path), fromModels=True))
+    assert modelPage == fetchedPage
+    assert api.counters.get('requests', 0) == 0
@@ -0,0 +1,81 @@
+from box_score_notes import parse_box_score_notes, parse_game_notes, parse_note_entries, parse_team_notes
+
+#One team's info lists the way boxscore_data() has them.
+teamInfo = [{'title': 'BATTING', 'fieldList': [{'label': '2B', 'value': 'Semien (21, Lopez); Lowe, N 2 (30, Ragans, Lugo).'},
+                                               {'label': 'HR', 'value': 'Seager 2 (25, 1st inning off Ragans, 1 on, 0 out; 6th inning off Lugo, 0 on, 2 out).'},
+                                               {'label': 'TB', 'value': 'Seager 8; Semien 2; Lowe, N 4.'},
+                                               {'label': 'Team LOB', 'value': '7.'}]},
+            {'title': 'BASERUNNING', 'fieldList': [{'label': 'SB', 'value': 'Taveras (12, 2nd base off Ragans/Perez).'}]},
+            {'title': 'FIELDING', 'fieldList': [{'label': 'E', 'value': 'Seager 2 (5, throw, fielding), Semien (3, fielding).'},
+                                                {'label': 'DP', 'value': '2 (Semien-Lowe-Garver, Seager-Semien-Lowe).'}]}]
+
+def test_entries_keep_counts_and_details():
+    entries = parse_note_entries('Seager 2 (5, throw, fielding), Semien (3, fielding).')
+    assert [(entry.name, entry.count, entry.details) for entry in entries] == [('Seager', 2, ['5', 'throw', 'fielding']),
+                                                                                ('Semien', 1, ['3', 'fielding'])]
+
+def test_names_with_commas_and_lists_without_parentheses():
+    assert [(entry.name, entry.count) for entry in parse_note_entries('Semien (21, Lopez); Lowe, N 2 (30, Ragans, Lugo).')] == \
+        [('Semien', 1), ('Lowe, N', 2)]
+    assert [(entry.name, entry.count) for entry in parse_note_entries('Seager 8; Semien 2; Lowe, N 4.')] == \
+        [('Seager', 8), ('Semien', 2), ('Lowe, N', 4)]
+    assert [(entry.name, entry.count) for entry in parse_note_entries('7.')] == [('7', 1)]
+
+#A team list like DP starts with the count, and has no name of its own.
+def test_team_list_starts_with_the_count():
+    entries = parse_note_entries('2 (Semien-Lowe-Garver, Seager-Semien-Lowe).')
+    assert [(entry.name, entry.count, entry.details) for entry in entries] == [('', 2, ['Semien-Lowe-Garver', 'Seager-Semien-Lowe'])]
+
+def test_team_notes():
+    notes = parse_team_notes({'1': 'a-Singled for Heim in the 7th.'}, teamInfo, {'fielding': {'errors': '3'}})
+    assert notes.battingNotes == ['a-Singled for Heim in the 7th.']
+    assert notes.fields[0] == ('BATTING', '2B', 'Semien (21, Lopez); Lowe, N 2 (30, Ragans, Lugo).')
+    assert len(notes.fields) == 7
+    assert notes.get_errors() == {'Seager': 2, 'Semien': 1}
+    assert [(entry.name, entry.count) for entry in notes.get_home_runs()] == [('Seager', 2)]
+    assert [entry.name for entry in notes.get_doubles()] == ['Semien', 'Lowe, N']
+    assert notes.get_stolen_bases()[0].details == ['12', '2nd base off Ragans/Perez']
+    assert notes.get_double_plays()[0].count == 2
+    assert notes.get_entries('3B') == []
+    assert notes.errorTotal == 3
+
+#Without the fielding errors in teamStats, the total is the E list added up, counts and all.
+def test_error_total_falls_back_to_the_e_list():
+    assert parse_team_notes({}, teamInfo, {'batting': {}}).errorTotal == 3
+    assert parse_team_notes({}, teamInfo).errorTotal == 3
+    assert parse_team_notes({}, teamInfo[:1]).errorTotal == 0
+
+def test_game_notes():
+    notes = parse_game_notes([{'label': 'WP', 'value': 'Lugo.'},
+                              {'label': 'Umpires', 'value': 'HP: Dan Bellino. 1B: Ryan Wills. 2B: Jeremie Rehak. 3B: Adrian Johnson.'},
+                              {'label': 'Weather', 'value': '87 degrees, Partly Cloudy.'},
+                              {'label': 'Wind', 'value': '9 mph, Out To CF.'},
+                              {'label': 'T', 'value': '2:41.'},
+                              {'label': 'Att', 'value': '41,235.'},
+                              {'label': 'July 30, 2024'}])
+    assert notes.umpires == {'HP': 'Dan Bellino', '1B': 'Ryan Wills', '2B': 'Jeremie Rehak', '3B': 'Adrian Johnson'}
+    assert (notes.temperature, notes.condition) == (87, 'Partly Cloudy')
+    assert notes.wind == '9 mph, Out To CF'
+    assert notes.attendance == 41235
+    assert notes.date == 'July 30, 2024'
+    assert notes.fields[0] == ('WP', 'Lugo.')
+    assert notes.values['T'] == '2:41.'
+
+#Anything we can't read is just left unset, and the fields still go on the page as they are.
+def test_game_notes_we_cant_read():
+    notes = parse_game_notes([{'label': 'Weather', 'value': 'Roof Closed.'}, {'label': 'Att', 'value': ''}, {'label': 'July 30, 2024'}])
+    assert notes.temperature is None
+    assert notes.attendance is None
+    assert notes.umpires == {}
+    assert notes.fields == [('Weather', 'Roof Closed.'), ('Att', '')]
+    assert parse_game_notes([]).date == ''
+
+def test_box_score_notes():
+    data = {'awayBattingNotes': {}, 'homeBattingNotes': {'1': 'a-Walked for Kirk in the 9th.'},
+            'away': {'info': teamInfo, 'teamStats': {'fielding': {'errors': 1}}}, 'home': {'info': []},
+            'gameBoxInfo': [{'label': 'Att', 'value': '977.'}, {'label': 'July 30, 2024'}]}
+    notes = parse_box_score_notes(data)
+    assert notes['away'].errorTotal == 1
+    assert notes['home'].battingNotes == ['a-Walked for Kirk in the 9th.']
+    assert notes['home'].errorTotal == 0
+    assert notes['game'].attendance == 977
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from box_score_schedule import ScheduleStore
+from stub_api import Slate, StubStatsAPI
+
+#A stub whose schedule requests take scheduleSeconds and everything else answers right away.
+class SlowScheduleStatsAPI(StubStatsAPI):
+    def __init__(self, slates, scheduleSeconds):
+        super().__init__(slates)
+        self.scheduleSeconds = scheduleSeconds
+
+    def respond(self, url):
+        status, headers, body, delay, hang = super().respond(url)
+        if '/schedule' in url:
+            delay = self.scheduleSeconds
+        return status, headers, body, delay, hang
+
+def run_threads(function, threadCount):
+    threads = [threading.Thread(target=function) for k in range(threadCount)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+#Pages asking for the same date at the same time share one schedule request.
+def test_concurrent_loads_make_one_request(install_api):
+    slate = Slate('07/30/2024', 6, seed=5)
+    api = SlowScheduleStatsAPI([slate], 0.5)
+    install_api(api)
+    scheduleStore = ScheduleStore()
+    results = []
+    run_threads(lambda: results.append(len(scheduleStore.get_games(slate.gameDate))), 4)
+    assert results == [6, 6, 6, 6]
+    assert api.counters['schedules'] == 1
+
+#Waiting callers get the same changed dates as the one that made the request.
+def test_coalesced_loads_see_the_changes(install_api):
+    slate = Slate('07/30/2024', 2, seed=6)
+    install_api(SlowScheduleStatsAPI([slate], 0.5))
+    scheduleStore = ScheduleStore()
+    results = []
+    run_threads(lambda: results.append(scheduleStore.load_range('07/30/2024', '07/31/2024')), 3)
+    assert results == [['07/30/2024', '07/31/2024']] * 3
+
+#A slow schedule request doesn't hold up standings, or games the store already has.
+def test_slow_schedule_does_not_block_the_store(install_api):
+    slate = Slate('07/30/2024', 4, seed=7)
+    install_api(SlowScheduleStatsAPI([slate], 0.0))
+    scheduleStore = ScheduleStore()
+    scheduleStore.get_games(slate.gameDate)
+    install_api(SlowScheduleStatsAPI([slate], 2.0))
+    loader = threading.Thread(target=scheduleStore.load_range, args=('07/28/2024', '07/29/2024'))
+    loader.start()
+    time.sleep(0.2)
+    startTime = time.monotonic()
+    assert len(scheduleStore.get_games(slate.gameDate)) == 4
+    assert scheduleStore.get_standings(slate.gameDate)
+    assert time.monotonic() - startTime < 1.0
+    loader.join()
@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+import box_score_maker
+from box_score_maker import FetchOptions, start_transport
+from box_score_server import BoxScoreServer, make_request_handler
+from stub_api import Slate, StubStatsAPI
+
+#A server on a free local port, with no prewarming, against api. Yields its base URL.
+def run_server(install_api, api, options):
+    start_transport(options)
+    install_api(api)
+    httpServer = ThreadingHTTPServer(('127.0.0.1', 0), make_request_handler(BoxScoreServer(options, prewarmDays=0)))
+    thread = threading.Thread(target=httpServer.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:' + str(httpServer.server_address[1])
+    httpServer.shutdown()
+    httpServer.server_close()
+
+@pytest.fixture
+def server_url(install_api):
+    yield from run_server(install_api, StubStatsAPI([Slate('07/30/2024', 4, seed=4)]), FetchOptions(fetchWorkers=2))
+
+@pytest.fixture
+def failing_server_url(install_api):
+    yield from run_server(install_api, StubStatsAPI([], errorRate=1.0), FetchOptions(fetchWorkers=2, httpRetries=0))
+
+def get_status(url):
+    return get_response(url)[0]
+
+def get_response(url):
+    try:
+        with urlopen(url, timeout=30) as response:
+            return response.status, response.read().decode('utf-8')
+    except HTTPError as error:
+        return error.code, error.read().decode('utf-8')
+
+@pytest.mark.parametrize('path, status', [
+    ('/boxscores/07-30-2024', 200),
+    ('/boxscores/2024-07-30?tz=pacific', 200),
+    ('/boxscores/07-30-2024?tz=bogus', 400),
+    ('/boxscores/07-30-2024/x', 404),
+    ('/boxscores/not-a-date', 404),
+    ('/nope', 404),
+    ('/stats', 200),
+])
+def test_routes(server_url, path, status):
+    assert get_status(server_url + path) == status
+
+#The error goes in the server's log, not to the client.
+def test_failed_page_sends_a_generic_message(failing_server_url, capsys):
+    status, body = get_response(failing_server_url + '/boxscores/07-30-2024')
+    assert status == 502
+    assert body == "Couldn't build the page right now, try again later"
+    assert 'HTTPError' in capsys.readouterr().out
+
+#Many first requests at once still open just one of each store and pool.
+def test_concurrent_first_requests_share_one_store(install_api, tmp_path, monkeypatch):
+    opened = []
+    realStatStore = box_score_maker.StatStore
+    def open_slowly(path):
+        opened.append(path)
+        time.sleep(0.05)
+        return realStatStore(path)
+    monkeypatch.setattr(box_score_maker, 'StatStore', open_slowly)
+    options = FetchOptions(statsPath=str(tmp_path / 'stats.db'), cacheDir=str(tmp_path / 'cache'))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statStores = list(executor.map(lambda k: box_score_maker.get_stat_store(options), range(8)))
+        responseCaches = list(executor.map(lambda k: box_score_maker.get_response_cache(options), range(8)))
+        scheduleStores = list(executor.map(lambda k: box_score_maker.get_schedule_store(responseCaches[0], 300), range(8)))
+    assert len(opened) == 1
+    for objects in (statStores, responseCaches, scheduleStores):
+        assert all(item is objects[0] for item in objects)
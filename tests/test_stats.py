@@ -0,0 +1,74 @@
+from box_score_fetch import fetch_game_payloads
+from box_score_maker import FetchOptions, start_transport
+from box_score_stats import StatStore, load_date_range
+from stub_api import Slate, StubStatsAPI
+
+def get_row_counts(statStore):
+    return {table: statStore.query('SELECT COUNT(*) AS n FROM ' + table)[0]['n'] for table in ('games', 'linescore', 'team_totals', 'batting', 'pitching')}
+
+def fetch_slate_payloads(install_api, slate):
+    start_transport(FetchOptions())
+    install_api(StubStatsAPI([slate]))
+    return fetch_game_payloads(slate.get_game_ids(), 2)
+
+#Saving a date again replaces its games' rows, and a player line that's gone from the new payload goes from the store.
+def test_saving_a_date_twice_replaces_its_rows(install_api, tmp_path):
+    slate = Slate('07/30/2024', 3, seed=4)
+    payloads = fetch_slate_payloads(install_api, slate)
+    statStore = StatStore(str(tmp_path / 'stats.db'))
+    statStore.save_games(slate.gameDate, payloads)
+    firstCounts = get_row_counts(statStore)
+    assert firstCounts['games'] == 3
+    statStore.save_games(slate.gameDate, payloads)
+    assert get_row_counts(statStore) == firstCounts
+
+    boxscore = payloads[0]['boxscore']
+    droppedID = boxscore['awayBatters'][1]['personId']
+    boxscore['awayBatters'] = [item for item in boxscore['awayBatters'] if item['personId'] != droppedID]
+    statStore.save_game(slate.gameDate, payloads[0])
+    assert statStore.query('SELECT * FROM batting WHERE playerID = ?', [droppedID]) == []
+    assert get_row_counts(statStore)['batting'] == firstCounts['batting'] - 1
+    statStore.close()
+
+#The leaders are the sums over the date range, worked out here straight from the payloads.
+def test_home_run_leaders(install_api, tmp_path):
+    slate = Slate('07/30/2024', 4, seed=5)
+    payloads = fetch_slate_payloads(install_api, slate)
+    statStore = StatStore(str(tmp_path / 'stats.db'))
+    statStore.save_games(slate.gameDate, payloads)
+    homeRuns = {}
+    for payload in payloads:
+        for side in ('away', 'home'):
+            for item in payload['boxscore'][side + 'Batters']:
+                if item['personId']:
+                    homeRuns[item['personId']] = homeRuns.get(item['personId'], 0) + int(item['hr'])
+    leaders = statStore.get_batting_leaders('hr', '07/30/2024', '07/30/2024', limit=5)
+    assert [row['value'] for row in leaders] == sorted(homeRuns.values(), reverse=True)[:5]
+    assert all(homeRuns[row['playerID']] == row['value'] for row in leaders)
+    assert statStore.get_batting_leaders('hr', '07/31/2024', None) == []
+    statStore.close()
+
+def test_team_games_and_line_score(install_api, tmp_path):
+    slate = Slate('07/30/2024', 2, seed=6)
+    payloads = fetch_slate_payloads(install_api, slate)
+    statStore = StatStore(str(tmp_path / 'stats.db'))
+    statStore.save_games(slate.gameDate, payloads)
+    item = slate.scheduleGames[0]
+    games = statStore.get_team_games(item['teams']['home']['team']['id'])
+    assert [(game['gameID'], game['side'], game['homeRuns']) for game in games] == [(item['gamePk'], 'home', item['teams']['home']['score'])]
+    assert games == statStore.get_team_games(item['teams']['home']['team']['name'])
+    linescore = statStore.get_linescore(item['gamePk'])
+    assert sum(runs or 0 for runs in linescore['away']) == item['teams']['away']['score']
+    statStore.close()
+
+#A range load saves every Final game of every date, and leaves out the ones that weren't finished.
+def test_load_date_range(install_api, tmp_path):
+    slates = [Slate('07/29/2024', 2, seed=7), Slate('07/31/2024', 3, seed=8, suspended=1)]
+    options = FetchOptions(fetchWorkers=2)
+    start_transport(options)
+    install_api(StubStatsAPI(slates))
+    statStore = StatStore(str(tmp_path / 'stats.db'))
+    assert load_date_range(statStore, '07/29/2024', '07/31/2024', options) == 4
+    assert [row['gameDate'] for row in statStore.query('SELECT gameDate FROM games ORDER BY gameDate')] == \
+        ['2024-07-29', '2024-07-29', '2024-07-31', '2024-07-31']
+    statStore.close()
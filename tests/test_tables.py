@@ -0,0 +1,45 @@
+import re
+
+import pytest
+from tabulate import tabulate
+
+from box_score_maker import build_model_hitter_rows, build_model_pitcher_rows
+from box_score_model import build_game_model
+from box_score_tables import render_html_table
+from fixtures import make_fixture
+
+#render_html_table drops the spaces tabulate pads each cell with (a browser collapses them anyway),
+#so the two are compared with the whitespace next to every tag taken out.
+def normalize_whitespace(html):
+    return re.sub(r'\s+(?=<)|(?<=>)\s+', '', html)
+
+def get_tabulate_html(rows):
+    return tabulate(rows, tablefmt='html', headers="firstrow")
+
+def get_fixture_tables():
+    tables = []
+    for game in make_fixture('tables', '07/30/2024', 1, 4, {2: 12})['dates'][0]['games']:
+        gameModel = build_game_model(game)
+        for team in (gameModel.away, gameModel.home):
+            tables.append(build_model_hitter_rows(team))
+            tables.append(build_model_pitcher_rows(team))
+    return tables
+
+@pytest.mark.parametrize('rows', get_fixture_tables())
+def test_box_score_tables_match_tabulate(rows):
+    assert normalize_whitespace(render_html_table(rows)) == normalize_whitespace(get_tabulate_html(rows))
+
+#The cases tabulate has its own rules for: averages shown as 0.25, blanks, thousands, mixed columns, escaping.
+@pytest.mark.parametrize('rows', [
+    [['Name', 'AVG', 'OBP'], ['Smith  SS', '.250', '.333'], ['Totals', '', '1.000']],
+    [['Team', 'Att'], ['Aces', '41,235'], ['Bears', 977]],
+    [['Name', 'Note'], ['Jones', 3], ['Lee', 'DNP']],
+    [['Name', 'IP'], ['A & B <P>', 6.1], ['Totals', 9.0]],
+])
+def test_tricky_columns_match_tabulate(rows):
+    assert normalize_whitespace(render_html_table(rows)) == normalize_whitespace(get_tabulate_html(rows))
+
+#Only the padding goes: the text in every cell is the same.
+def test_only_whitespace_differs():
+    rows = get_fixture_tables()[0]
+    assert render_html_table(rows) != get_tabulate_html(rows)
@@ -0,0 +1,104 @@
+import pytest
+import requests
+import statsapi
+
+import box_score_transport
+from box_score_transport import PooledRequests, install_transport
+
+class ScriptedResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+#Stands in for the requests module. Each GET takes the next answer off script: a status code, a
+#(status code, headers) pair, or an exception to raise.
+class ScriptedRequests:
+    exceptions = requests.exceptions
+    adapters = requests.adapters
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.calls = []
+        self.sessions = []
+
+    def Session(self):
+        session = ScriptedSession(self)
+        self.sessions.append(session)
+        return session
+
+class ScriptedSession:
+    def __init__(self, scriptedRequests):
+        self.scriptedRequests = scriptedRequests
+        self.closed = False
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, **kwargs):
+        self.scriptedRequests.calls.append((url, kwargs))
+        answer = self.scriptedRequests.script.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        if isinstance(answer, tuple):
+            return ScriptedResponse(*answer)
+        return ScriptedResponse(answer)
+
+    def close(self):
+        self.closed = True
+
+#The transport's sleeps, recorded instead of slept.
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(box_score_transport.time, 'sleep', delays.append)
+    return delays
+
+def test_retries_server_errors_then_succeeds(sleeps):
+    scriptedRequests = ScriptedRequests([503, 500, 200])
+    response = PooledRequests(scriptedRequests, retries=3).get('http://stats/x')
+    assert response.status_code == 200
+    assert len(scriptedRequests.calls) == 3
+    assert len(sleeps) == 2
+    assert all(kwargs['timeout'] == 30 for url, kwargs in scriptedRequests.calls)
+
+#Out of retries, the last answer comes back as it is; a 404 isn't worth retrying at all.
+def test_gives_up_after_the_retries(sleeps):
+    scriptedRequests = ScriptedRequests([503, 503, 503])
+    assert PooledRequests(scriptedRequests, retries=2).get('http://stats/x').status_code == 503
+    assert len(scriptedRequests.calls) == 3
+    scriptedRequests = ScriptedRequests([404])
+    assert PooledRequests(scriptedRequests, retries=2).get('http://stats/x').status_code == 404
+    assert len(sleeps) == 2
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    scriptedRequests = ScriptedRequests([requests.exceptions.ConnectionError(), requests.exceptions.ReadTimeout(), 200])
+    assert PooledRequests(scriptedRequests, retries=2).get('http://stats/x').status_code == 200
+    scriptedRequests = ScriptedRequests([requests.exceptions.ConnectionError(), requests.exceptions.ConnectionError()])
+    with pytest.raises(requests.exceptions.ConnectionError):
+        PooledRequests(scriptedRequests, retries=1).get('http://stats/x')
+
+#A 429's Retry-After says how long to wait, up to maxBackoff.
+def test_retry_after_is_honored(sleeps):
+    scriptedRequests = ScriptedRequests([(429, {'Retry-After': '2'}), (429, {'Retry-After': '90'}), 200])
+    PooledRequests(scriptedRequests, retries=3, maxBackoff=30).get('http://stats/x')
+    assert sleeps == [2.0, 30]
+
+#Without Retry-After the wait is jittered, anywhere up to backoff * 2 ** attempt, capped at maxBackoff.
+def test_backoff_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(box_score_transport.random, 'uniform', lambda low, high: high)
+    transport = PooledRequests(ScriptedRequests(), backoff=0.5, maxBackoff=3)
+    assert [transport.get_retry_delay(attempt) for attempt in (1, 2, 3, 4)] == [1.0, 2.0, 3, 3]
+    assert transport.get_retry_delay(1, ScriptedResponse(503, {'Retry-After': 'soon'})) == 1.0
+
+#Installing again with the same settings keeps the transport; different settings get a new one built for them.
+def test_install_transport_follows_the_settings(install_api):
+    scriptedRequests = ScriptedRequests()
+    statsapi.requests = scriptedRequests
+    transport = install_transport(4, 10, 2, None)
+    assert install_transport(4, 10, 2, None) is transport
+    slowerTransport = install_transport(4, 10, 2, 5.0)
+    assert slowerTransport is not transport
+    assert transport.session.closed
+    assert slowerTransport.requestsModule is scriptedRequests
+    assert slowerTransport.rateLimiter.interval == 0.2
+    assert (slowerTransport.timeout, slowerTransport.retries, slowerTransport.slots._value) == (10, 2, 4)